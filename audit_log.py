@@ -0,0 +1,458 @@
+"""
+Consultation Audit Log
+Append-only JSONL log of consultation actions. Logging an action appends one
+line to the active file. The active file is rotated into a gzip-compressed
+segment when it grows past a size limit or its first entry gets too old.
+The most recent entries are kept in a bounded in-memory window, indexed by
+time and by status, and older ranges are streamed from the segments instead
+of being loaded at startup.
+"""
+
+import glob
+import gzip
+import json
+import math
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from metrics import timed
+
+try:
+    import fcntl  # Serializes appends and rotation between worker processes
+except ImportError:
+    fcntl = None
+
+_SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+# Sort key of an entry: (epoch seconds, log id); also used as a page cursor
+LogKey = Tuple[float, str]
+
+def epoch_key(timestamp: str) -> float:
+    """Epoch seconds of an ISO timestamp, parsed once per entry"""
+    return datetime.fromisoformat(timestamp).timestamp()
+
+def log_key(entry: Dict[str, Any]) -> LogKey:
+    return (epoch_key(entry["timestamp"]), entry.get("id", ""))
+
+def _matches(key: LogKey, entry: Dict[str, Any], start: Optional[float], end: Optional[float],
+             status: Optional[str], before: Optional[LogKey]) -> bool:
+    return (
+        (start is None or key[0] >= start)
+        and (end is None or key[0] <= end)
+        and (before is None or key < before)
+        and (status is None or entry["status"] == status)
+    )
+
+class LogIndex:
+    """
+    Bounded, time-ordered index of recent log entries with a secondary index
+    by status. Keys are (epoch, id, arrival sequence) kept sorted, so range
+    lookups are a bisect plus a walk over the results. When full, the entry
+    that arrived first is evicted.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._keys: List[Tuple[float, str, int]] = []
+        self._by_status: Dict[str, List[Tuple[float, str, int]]] = {}
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._arrival: Deque[Tuple[Tuple[float, str, int], str]] = deque()
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """Index an entry; returns True if an older entry had to be evicted"""
+        self._seq += 1
+        key = (*log_key(entry), self._seq)
+        self._entries[self._seq] = entry
+        insort(self._keys, key)
+        insort(self._by_status.setdefault(entry["status"], []), key)
+        self._arrival.append((key, entry["status"]))
+
+        if len(self._entries) <= self.capacity:
+            return False
+        old_key, old_status = self._arrival.popleft()
+        for keys in (self._keys, self._by_status[old_status]):
+            del keys[bisect_left(keys, old_key)]
+        del self._entries[old_key[2]]
+        return True
+
+    def oldest_key(self) -> Optional[LogKey]:
+        return self._keys[0][:2] if self._keys else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Indexed entries, oldest first"""
+        return [self._entries[key[2]] for key in self._keys]
+
+    def _bounds(self, start: Optional[float], end: Optional[float], status: Optional[str],
+                before: Optional[LogKey]) -> Tuple[List[Tuple[float, str, int]], int, int]:
+        """The sorted keys to use and the [low, high) positions of the matching ones"""
+        keys = self._by_status.get(status, []) if status is not None else self._keys
+        low = 0 if start is None else bisect_left(keys, (start,))
+        high = len(keys) if end is None else bisect_left(keys, (math.nextafter(end, math.inf),))
+        if before is not None:
+            high = min(high, bisect_left(keys, before))
+        return keys, low, high
+
+    def count(self, start: float = None, end: float = None, status: str = None, before: LogKey = None) -> int:
+        """Number of entries query would return without a limit"""
+        _, low, high = self._bounds(start, end, status, before)
+        return max(high - low, 0)
+
+    def query(self, start: float = None, end: float = None, status: str = None,
+              before: LogKey = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Entries with start <= epoch <= end and key < before, newest first"""
+        keys, low, high = self._bounds(start, end, status, before)
+
+        results = []
+        for position in range(high - 1, low - 1, -1):
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(self._entries[keys[position][2]])
+        return results
+
+class AuditLog:
+    """Rotating JSONL log with a bounded window of recent entries"""
+
+    def __init__(
+        self,
+        path: str = Config.AUDIT_LOG_PATH,
+        max_bytes: int = Config.AUDIT_LOG_MAX_BYTES,
+        max_age: timedelta = timedelta(hours=Config.AUDIT_LOG_MAX_AGE_HOURS),
+        window_size: int = Config.AUDIT_LOG_WINDOW
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.window_size = window_size
+        self._base, _ = os.path.splitext(path)
+        self._lock = threading.RLock()
+
+        # Recent entries; _window_complete means nothing older exists on disk
+        self._window = LogIndex(window_size)
+        self._window_complete = True
+        self._segment_statuses: Dict[str, set] = {}
+        self._active_inode: Optional[int] = None
+        self._active_offset = 0
+        self._active_head = b""  # First line of the active file, to tell a recreated file apart
+        self._active_started: Optional[str] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._reload_window()
+
+    # File locking
+
+    def _file_lock(self):
+        lock_file = open(f"{self.path}.lock", "a")
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _file_unlock(self, lock_file):
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    # Segments
+
+    def segment_paths(self) -> List[str]:
+        """Rotated segments, oldest first"""
+        return sorted(glob.glob(f"{glob.escape(self._base)}-*.jsonl.gz"))
+
+    def _segment_range(self, segment: str) -> Tuple[str, str]:
+        """(first, last) ISO timestamps encoded in a segment file name"""
+        name = os.path.basename(segment)[len(os.path.basename(self._base)) + 1:-len(".jsonl.gz")]
+        first, last = name.split("_")[:2]
+        return (
+            datetime.strptime(first, _SEGMENT_TIME_FORMAT).isoformat(timespec="microseconds"),
+            datetime.strptime(last, _SEGMENT_TIME_FORMAT).isoformat(timespec="microseconds")
+        )
+
+    def _read_lines(self, path: str) -> Iterator[Dict[str, Any]]:
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def _rotate(self):
+        """Compress the active file into a segment named by its time range (caller holds the file lock)"""
+        first = last = None
+        for entry in self._read_lines(self.path):
+            first = first or entry["timestamp"]
+            last = entry["timestamp"]
+        if first is None:
+            return
+
+        stamp = lambda value: datetime.fromisoformat(value).strftime(_SEGMENT_TIME_FORMAT)
+        segment = f"{self._base}-{stamp(first)}_{stamp(last)}.jsonl.gz"
+        suffix = 1
+        while os.path.exists(segment):
+            segment = f"{self._base}-{stamp(first)}_{stamp(last)}_{suffix}.jsonl.gz"
+            suffix += 1
+
+        with open(self.path, "rb") as source, gzip.open(f"{segment}.tmp", "wb") as target:
+            target.writelines(source)
+        os.replace(f"{segment}.tmp", segment)
+        os.remove(self.path)
+        self._active_inode = None
+        self._active_offset = 0
+        self._active_head = b""
+        self._active_started = None
+
+    def _needs_rotation(self, entry_timestamp: str, line_size: int) -> bool:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return False
+        if size and size + line_size > self.max_bytes:
+            return True
+        if self._active_started is None:
+            first = next(self._read_lines(self.path), None)
+            self._active_started = first["timestamp"] if first else None
+        return bool(self._active_started) and (
+            datetime.fromisoformat(entry_timestamp) - datetime.fromisoformat(self._active_started) > self.max_age
+        )
+
+    # Window
+
+    def _reload_window(self):
+        """Rebuild the window from the tail of the newest data"""
+        self._window.clear()
+        self._window_complete = True
+        self._active_inode = None
+        self._active_offset = 0
+        self._active_head = b""
+        self._active_started = None
+
+        # Most recent segments first fill the window from the end backwards
+        newest: List[Dict[str, Any]] = []
+        for segment in reversed(self.segment_paths()):
+            if len(newest) >= self.window_size:
+                self._window_complete = False
+                break
+            entries = list(self._read_lines(segment))
+            room = self.window_size - len(newest)
+            if len(entries) > room:
+                self._window_complete = False
+            newest[:0] = entries[-room:]
+        for entry in newest:
+            self._window.add(entry)
+        self._tail_active()
+
+    def _tail_active(self):
+        """Read lines appended to the active file (possibly by other processes) since our last read"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._active_inode is not None:
+                # Rotated by another process: the newest segment holds what we may have missed
+                self._reload_window()
+            return
+
+        if self._active_inode is not None and (stat.st_ino != self._active_inode or stat.st_size < self._active_offset):
+            self._reload_window()
+            return
+
+        if stat.st_size == self._active_offset and self._active_inode is not None:
+            return
+
+        with open(self.path, "rb") as f:
+            if self._active_head and f.read(len(self._active_head)) != self._active_head:
+                # Rotated by another process and recreated under a reused inode number
+                self._reload_window()
+                return
+            f.seek(self._active_offset)
+            data = f.read()
+        # Only consume complete lines
+        end = data.rfind(b"\n") + 1
+        if self._active_offset == 0 and end:
+            self._active_head = data[:data.find(b"\n") + 1]
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._push(json.loads(line))
+        self._active_inode = stat.st_ino
+        self._active_offset += end
+
+    def _push(self, entry: Dict[str, Any]):
+        if self._window.add(entry):
+            self._window_complete = False
+        if self._active_started is None:
+            self._active_started = entry["timestamp"]
+
+    # Public API
+
+    def append(self, entry: Dict[str, Any]):
+        """Append one entry (must have an ISO "timestamp")"""
+        with timed("json_write"):
+            self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            lock_file = self._file_lock()
+            try:
+                self._tail_active()
+                if self._needs_rotation(entry["timestamp"], len(line)):
+                    self._rotate()
+                # One write call per line keeps concurrent appends whole
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+                self._tail_active()
+            finally:
+                self._file_unlock(lock_file)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Entries in the in-memory window, oldest first"""
+        with self._lock:
+            self._tail_active()
+            return self._window.entries()
+
+    def window_covers(self, start: str) -> bool:
+        """Whether every entry at or after start is in the window"""
+        with self._lock:
+            self._tail_active()
+            return self._covers(None if start is None else epoch_key(start))
+
+    def _covers(self, start: Optional[float]) -> bool:
+        if self._window_complete:
+            return True
+        oldest = self._window.oldest_key()
+        return oldest is not None and start is not None and oldest[0] <= start
+
+    def iter_entries(self, start: str = None, end: str = None) -> Iterator[Dict[str, Any]]:
+        """Stream entries with start <= timestamp <= end, oldest first, skipping segments outside the range"""
+        for segment in self.segment_paths():
+            first, last = self._segment_range(segment)
+            if (end is not None and first > end) or (start is not None and last < start):
+                continue
+            for entry in self._read_lines(segment):
+                if (start is None or entry["timestamp"] >= start) and (end is None or entry["timestamp"] <= end):
+                    yield entry
+        for entry in self._read_lines(self.path):
+            if (start is None or entry["timestamp"] >= start) and (end is None or entry["timestamp"] <= end):
+                yield entry
+
+    def _segment_ranges(self) -> List[Tuple[float, float, str]]:
+        """(first epoch, last epoch, path) of each segment, oldest first"""
+        ranges = []
+        for segment in self.segment_paths():
+            first, last = self._segment_range(segment)
+            ranges.append((epoch_key(first), epoch_key(last), segment))
+        return ranges
+
+    def _stream_newest_first(self, start: Optional[float], end: Optional[float], status: Optional[str],
+                             before: Optional[LogKey]) -> Iterator[Dict[str, Any]]:
+        """Matching entries from the files on disk, newest first, reading only segments that can match"""
+        ranges = self._segment_ranges()
+        upper = end if before is None else (before[0] if end is None else min(end, before[0]))
+        # Segments starting after the upper bound cannot match
+        candidates = ranges[:bisect_left([r[0] for r in ranges], math.nextafter(upper, math.inf))] if upper is not None else ranges
+        files = [self.path] + [segment for _, _, segment in reversed(candidates)]
+        last_epochs = {segment: last for _, last, segment in ranges}
+
+        for path in files:
+            if start is not None and path in last_epochs and last_epochs[path] < start:
+                break  # Every older segment ends before the range
+            if status is not None and status not in self._segment_statuses.get(path, {status}):
+                continue
+            entries = list(self._read_lines(path))
+            if path != self.path:
+                self._segment_statuses[path] = {entry["status"] for entry in entries}
+            for entry in reversed(entries):
+                if _matches(log_key(entry), entry, start, end, status, before):
+                    yield entry
+
+    def query(self, start: str = None, end: str = None, status: str = None,
+              before: LogKey = None, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Entries with start <= timestamp <= end (ISO strings), optionally of one
+        status and strictly before a cursor key, newest first. Served from the
+        window index when it covers the range, otherwise the part older than
+        the window is streamed from disk.
+        """
+        start_epoch = None if start is None else epoch_key(start)
+        end_epoch = None if end is None else epoch_key(end)
+        with self._lock:
+            self._tail_active()
+            results = self._window.query(start_epoch, end_epoch, status, before, limit)
+            if self._covers(start_epoch) or (limit is not None and len(results) >= limit):
+                return results
+
+            # Continue below the oldest indexed entry
+            remaining = None if limit is None else limit - len(results)
+            older = self._stream_newest_first(start_epoch, end_epoch, status, self._below_window(before))
+            return results + list(islice(older, remaining))
+
+    def _below_window(self, before: Optional[LogKey]) -> Optional[LogKey]:
+        """Cursor key for the part of a query older than the window (caller holds the lock)"""
+        oldest = self._window.oldest_key()
+        return before if oldest is None else (oldest if before is None else min(before, oldest))
+
+    def count(self, start: str = None, end: str = None, status: str = None) -> int:
+        """
+        Number of entries query would return without a limit or cursor.
+        Counted in the window index when it covers the range; older entries
+        are counted by streaming the segments that can hold them.
+        """
+        start_epoch = None if start is None else epoch_key(start)
+        end_epoch = None if end is None else epoch_key(end)
+        with self._lock:
+            self._tail_active()
+            total = self._window.count(start_epoch, end_epoch, status)
+            if not self._covers(start_epoch):
+                older = self._stream_newest_first(start_epoch, end_epoch, status, self._below_window(None))
+                total += sum(1 for _ in older)
+            return total
+
+    def range(self, start: str = None, end: str = None) -> List[Dict[str, Any]]:
+        """Entries in a time range, oldest first"""
+        return self.query(start, end)[::-1]
+
+    def clear(self) -> int:
+        """Delete the active file and every segment; returns the number of entries removed"""
+        with self._lock:
+            lock_file = self._file_lock()
+            try:
+                removed = sum(1 for _ in self.iter_entries())
+                for path in self.segment_paths() + [self.path]:
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._segment_statuses.clear()
+                self._reload_window()
+            finally:
+                self._file_unlock(lock_file)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._tail_active()
+            segments = self.segment_paths()
+            return {
+                "active_file": self.path,
+                "active_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                "segments": len(segments),
+                "segment_bytes": sum(os.path.getsize(segment) for segment in segments),
+                "window_entries": len(self._window),
+                "window_complete": self._window_complete
+            }
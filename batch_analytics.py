@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Offline Batch Analytics
+Re-scores chat interaction history with the LocalDataProcessor rules as
+vectorized pandas/numpy operations instead of one interaction at a time,
+then writes daily rollups. Run it after a rule change to re-score history:
+
+    python batch_analytics.py interactions.jsonl [more.csv ...] --out analytics_out
+
+Input files are JSON Lines, JSON arrays or CSV. Records are either flat
+(query, response, confidence, processing_time, source_count, session_id,
+timestamp) or n8n webhook payloads ({"input": ..., "rag_response": ...}).
+History can also be streamed from the chat transcript store:
+
+    python batch_analytics.py --transcripts ./transcripts --start 2025-10-01
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from keyword_automaton import KEYWORD_GROUPS
+
+COLUMNS = ["session_id", "timestamp", "query", "response", "confidence", "processing_time", "source_count"]
+
+# Rule order matches LocalDataProcessor: the first matching group wins
+QUERY_TYPE_RULES = [
+    ("query_type.definition", "definition"), ("query_type.how_to", "how_to"),
+    ("query_type.benefits", "benefits"), ("query_type.services", "services"),
+    ("query_type.pricing", "pricing"), ("query_type.contact", "contact"),
+]
+TOPIC_RULES = [
+    ("topic.agentic_ai", "agentic_ai"), ("topic.services", "services"),
+    ("topic.implementation", "implementation"), ("topic.pricing", "pricing"),
+    ("topic.contact", "contact"),
+]
+INTENT_RULES = [
+    ("intent.purchase", "purchase"), ("intent.learn", "learn"),
+    ("intent.support", "support"), ("intent.demo", "demo"),
+]
+
+# Loading
+
+def _flatten(record: Dict[str, Any]) -> Dict[str, Any]:
+    """One flat row from a flat record or an n8n webhook payload"""
+    if "input" in record and "rag_response" in record:
+        request, response = record["input"] or {}, record["rag_response"] or {}
+        return {
+            "session_id": request.get("session_id"),
+            "timestamp": request.get("timestamp"),
+            "query": request.get("query"),
+            "response": response.get("response"),
+            "confidence": response.get("confidence"),
+            "processing_time": response.get("processing_time"),
+            "source_count": len(response.get("sources") or [])
+        }
+    row = {column: record.get(column) for column in COLUMNS}
+    if row["source_count"] is None and isinstance(record.get("sources"), list):
+        row["source_count"] = len(record["sources"])
+    return row
+
+def _read_records(path: Path) -> Iterable[Dict[str, Any]]:
+    if path.suffix == ".csv":
+        yield from pd.read_csv(path).to_dict("records")
+        return
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".json":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def load_interactions(paths: Iterable[str]) -> pd.DataFrame:
+    """Load interaction history into one DataFrame with the COLUMNS schema"""
+    rows = [_flatten(record) for path in paths for record in _read_records(Path(path))]
+    return normalize(pd.DataFrame(rows, columns=COLUMNS))
+
+def load_transcripts(directory: str, start: str = None, end: str = None) -> pd.DataFrame:
+    """Load question/answer pairs from the chat transcript store"""
+    from transcript_store import TranscriptStore
+
+    store = TranscriptStore(directory=directory)
+    return normalize(pd.DataFrame(list(store.iter_interactions(start, end)), columns=COLUMNS))
+
+def normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill missing values and fix dtypes the way the per-row code treats them"""
+    df = df.reindex(columns=COLUMNS).copy()
+    df["query"] = df["query"].fillna("").astype(str)
+    df["response"] = df["response"].fillna("").astype(str)
+    for column in ("confidence", "processing_time"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0.0).astype(float)
+    df["source_count"] = pd.to_numeric(df["source_count"], errors="coerce").fillna(0).astype(int)
+    df["session_id"] = df["session_id"].fillna("default")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", format="mixed")
+    return df
+
+# Scoring
+
+def keyword_matrix(queries: pd.Series) -> pd.DataFrame:
+    """
+    Boolean column per keyword: substring of the lowercased query, the same
+    rule as the keyword automaton. Each distinct query is scanned once.
+
+    Instead of a Python-level test per row and keyword, the distinct queries
+    are joined into one NUL-separated array of code points and sorted once,
+    so every character's positions are a slice. Each keyword starts from
+    the positions of its rarest character, is narrowed down one character
+    at a time, and the hits are mapped back to rows by offset.
+    """
+    # A dict, not pd.factorize: some pandas versions merge strings that start with NUL
+    lowered = queries.str.lower().tolist()
+    index_of = {query: code for code, query in enumerate(dict.fromkeys(lowered))}
+    uniques = list(index_of)
+    codes = np.fromiter(map(index_of.__getitem__, lowered), dtype=np.int64, count=len(lowered))
+    lengths = np.fromiter(map(len, uniques), dtype=np.int64, count=len(uniques))
+    keywords = list(dict.fromkeys(word.lower() for words in KEYWORD_GROUPS.values() for word in words))
+    padding = max(map(len, keywords))  # Lets candidate +/- offset index past either end
+    starts = padding + np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))  # +1 for each separator
+    text = "\0" * padding + "\0".join(uniques) + "\0" * padding
+    chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+    # A stable sort keeps each character's positions in text order (radix sort for 16-bit keys)
+    keys = chars.astype(np.uint16) if chars.max() < 1 << 16 else chars
+    order = np.argsort(keys, kind="stable")
+    counts = np.bincount(keys)
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+
+    def positions(char: str) -> np.ndarray:
+        code = ord(char)
+        return order[bounds[code]:bounds[code + 1]] if code < len(counts) else order[:0]
+
+    matrix = np.zeros((len(uniques), len(keywords)), dtype=bool)
+    for i, word in enumerate(keywords):
+        anchor = min(range(len(word)), key=lambda j: len(positions(word[j])))
+        candidates = positions(word[anchor])
+        for offset, char in enumerate(word):
+            if offset != anchor and len(candidates):
+                candidates = candidates[keys[candidates + (offset - anchor)] == ord(char)]
+        matrix[np.searchsorted(starts, candidates - anchor, side="right") - 1, i] = True
+    return pd.DataFrame(matrix[codes], columns=keywords, index=queries.index)
+
+def _group_any(matrix: pd.DataFrame, group: str) -> np.ndarray:
+    return matrix[list(dict.fromkeys(word.lower() for word in KEYWORD_GROUPS[group]))].to_numpy().any(axis=1)
+
+def _group_count(matrix: pd.DataFrame, group: str) -> np.ndarray:
+    return matrix[list(dict.fromkeys(word.lower() for word in KEYWORD_GROUPS[group]))].to_numpy().sum(axis=1)
+
+def _first_match(matrix: pd.DataFrame, rules, default: str) -> np.ndarray:
+    return np.select([_group_any(matrix, group) for group, _ in rules], [label for _, label in rules], default)
+
+def score_interactions(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the LocalDataProcessor analysis columns to a normalized interaction frame"""
+    matrix = keyword_matrix(df["query"])
+    query_length = df["query"].str.len().to_numpy()
+    confidence = df["confidence"].to_numpy()
+    has_question = df["query"].str.contains("?", regex=False).to_numpy(dtype=bool)
+
+    scored = df.copy()
+    scored["query_length"] = query_length
+    scored["query_type"] = _first_match(matrix, QUERY_TYPE_RULES, "general")
+    scored["topic_category"] = _first_match(matrix, TOPIC_RULES, "general")
+    scored["user_intent"] = _first_match(matrix, INTENT_RULES, "explore")
+
+    positive = _group_count(matrix, "sentiment.positive")
+    negative = _group_count(matrix, "sentiment.negative")
+    scored["sentiment"] = np.select([positive > negative, negative > positive], ["positive", "negative"], "neutral")
+
+    # Additions in the same order as the per-row code so the floats match exactly
+    complexity = np.select([query_length > 100, query_length > 50, query_length > 20], [0.3, 0.2, 0.1], 0.0)
+    complexity = np.where(has_question, complexity + 0.2, complexity)
+    complexity = np.where(_group_any(matrix, "complexity.technical"), complexity + 0.3, complexity)
+    complexity = np.minimum(complexity, 1.0)
+    scored["complexity_score"] = complexity
+
+    engagement = np.select([query_length > 50, query_length > 20], [0.5 + 0.2, 0.5 + 0.1], 0.5)
+    engagement = np.where(confidence != 0, engagement + confidence * 0.3, engagement)
+    source_count = df["source_count"].to_numpy()
+    engagement = np.where(source_count > 0, engagement + np.minimum(source_count * 0.1, 0.2), engagement)
+    engagement = engagement + complexity * 0.2
+    scored["engagement_score"] = np.minimum(engagement, 1.0)
+
+    query_type = scored["query_type"].to_numpy()
+    scored["lead_quality"] = np.select(
+        [np.isin(query_type, ["pricing", "services"]) & (complexity > 0.5),
+         np.isin(query_type, ["how_to", "benefits"]) & (complexity > 0.3)],
+        ["high", "medium"], "low"
+    )
+    scored["conversion_potential"] = np.select(
+        [confidence == 0, (confidence > 0.8) & (query_length > 30), confidence > 0.6],
+        ["unknown", "high", "medium"], "low"
+    )
+    scored["response_quality"] = np.select(
+        [confidence == 0, confidence > 0.8, confidence > 0.6], ["unknown", "high", "medium"], "low"
+    )
+    scored["follow_up_needed"] = np.isin(query_type, ["pricing", "services", "how_to", "contact"])
+    return scored
+
+# Rollups
+
+def build_rollups(scored: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Daily rollups of volume, engagement and lead signals"""
+    scored = scored.assign(date=scored["timestamp"].dt.strftime("%Y-%m-%d").fillna("unknown"))
+    daily = scored.groupby("date").agg(
+        interactions=("query", "size"),
+        sessions=("session_id", "nunique"),
+        avg_engagement=("engagement_score", "mean"),
+        avg_confidence=("confidence", "mean"),
+        p95_processing_time=("processing_time", lambda values: values.quantile(0.95)),
+        follow_ups=("follow_up_needed", "sum"),
+    ).reset_index()
+    rollups = {"daily": daily}
+    for column in ("query_type", "sentiment", "lead_quality", "conversion_potential", "topic_category", "user_intent"):
+        rollups[f"daily_{column}"] = (
+            scored.groupby(["date", column]).size().unstack(fill_value=0).reset_index()
+        )
+    return rollups
+
+def write_rollups(scored: pd.DataFrame, rollups: Dict[str, pd.DataFrame], out_dir: str) -> List[str]:
+    """Write the scored rows and every rollup as CSV, plus a JSON summary"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    written = [str(out / "scored_interactions.csv")]
+    scored.to_csv(written[0], index=False)
+    for name, frame in rollups.items():
+        path = out / f"{name}.csv"
+        frame.to_csv(path, index=False)
+        written.append(str(path))
+    summary = {
+        "interactions": int(len(scored)),
+        "sessions": int(scored["session_id"].nunique()),
+        "average_engagement_score": float(scored["engagement_score"].mean()) if len(scored) else 0.0,
+        **{
+            f"{column}_distribution": {key: int(value) for key, value in scored[column].value_counts().items()}
+            for column in ("query_type", "sentiment", "lead_quality", "conversion_potential")
+        }
+    }
+    with open(out / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    written.append(str(out / "summary.json"))
+    return written
+
+# Verification against the per-row rules
+
+def per_row_scores(df: pd.DataFrame) -> pd.DataFrame:
+    """Score rows one at a time with LocalDataProcessor (the reference implementation)"""
+    from data_processor import LocalDataProcessor
+    from models import ChatRequest, ChatResponse
+
+    processor = LocalDataProcessor()
+    rows = []
+    for record in df.itertuples(index=False):
+        request = ChatRequest(message=record.query, session_id=str(record.session_id))
+        response = ChatResponse(
+            response=record.response, sources=[{"source": "history"}] * record.source_count,
+            session_id=str(record.session_id), confidence=record.confidence, processing_time=record.processing_time
+        )
+        query_analysis = processor._analyze_query(record.query)
+        insights = processor._calculate_business_insights(request, response, query_analysis)
+        rows.append({
+            "query_type": query_analysis["query_type"],
+            "sentiment": query_analysis["sentiment"],
+            "complexity_score": query_analysis["complexity_score"],
+            "engagement_score": insights["engagement_score"],
+            "topic_category": insights["topic_category"],
+            "user_intent": insights["user_intent"],
+            "lead_quality": insights["lead_quality"],
+            "conversion_potential": insights["conversion_potential"],
+            "follow_up_needed": insights["follow_up_needed"],
+            "response_quality": processor._assess_response_quality(response),
+        })
+    return pd.DataFrame(rows, index=df.index)
+
+def verify(df: pd.DataFrame, scored: pd.DataFrame, sample: int = 1000, seed: int = 0) -> List[str]:
+    """Compare a sample of vectorized scores with the per-row rules; returns mismatching columns"""
+    rows = df.sample(min(sample, len(df)), random_state=seed) if len(df) > sample else df
+    expected = per_row_scores(rows)
+    actual = scored.loc[rows.index, expected.columns]
+    return [
+        column for column in expected.columns
+        if not (expected[column].to_numpy() == actual[column].to_numpy()).all()
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score chat interaction history and write rollups")
+    parser.add_argument("inputs", nargs="*", help="JSONL, JSON or CSV interaction files")
+    parser.add_argument("--transcripts", metavar="DIR", help="Read history from a chat transcript store directory")
+    parser.add_argument("--start", help="First ISO date/time to read from the transcript store")
+    parser.add_argument("--end", help="Last ISO date/time to read from the transcript store")
+    parser.add_argument("--out", default="analytics_out", help="Output directory (default: analytics_out)")
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="Check N sampled rows against the per-row LocalDataProcessor rules")
+    args = parser.parse_args()
+    if not args.inputs and not args.transcripts:
+        parser.error("give interaction files or --transcripts DIR")
+
+    print("📊 Loading interaction history...")
+    frames = []
+    if args.inputs:
+        frames.append(load_interactions(args.inputs))
+    if args.transcripts:
+        frames.append(load_transcripts(args.transcripts, args.start, args.end))
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    print(f"   {len(df)} interactions")
+
+    started = time.perf_counter()
+    scored = score_interactions(df)
+    rollups = build_rollups(scored)
+    elapsed = time.perf_counter() - started
+    print(f"⚡ Scored and rolled up in {elapsed:.2f}s ({len(df) / max(elapsed, 1e-9):,.0f} interactions/s)")
+
+    if args.verify:
+        mismatches = verify(df, scored, args.verify)
+        if mismatches:
+            print(f"❌ Vectorized scores differ from the per-row rules in: {', '.join(mismatches)}")
+            sys.exit(1)
+        print(f"✅ {min(args.verify, len(df))} sampled rows match the per-row rules")
+
+    for path in write_rollups(scored, rollups, args.out):
+        print(f"   wrote {path}")
+
+if __name__ == "__main__":
+    main()
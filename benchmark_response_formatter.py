@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single-pass response formatter vs. the original regex cascade
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from response_formatter import format_response
+from response_formatter_reference import GOLDEN_CORPUS, legacy_format_response
+
+def benchmark(number: int = 2000):
+    """Time both formatters over the golden corpus and a long answer"""
+    long_answer = "\n\n".join(GOLDEN_CORPUS) * 4
+    cases = {
+        "golden corpus": GOLDEN_CORPUS,
+        f"long answer ({len(long_answer)} chars)": [long_answer],
+    }
+
+    print("⏱️  Response formatter micro-benchmark")
+    print("=" * 60)
+    for name, samples in cases.items():
+        legacy = timeit.timeit(lambda: [legacy_format_response(s) for s in samples], number=number)
+        single_pass = timeit.timeit(lambda: [format_response(s) for s in samples], number=number)
+        per_call = 1e6 / (number * len(samples))
+        print(f"{name}:")
+        print(f"  regex cascade: {legacy * per_call:8.1f} µs/response")
+        print(f"  single pass:   {single_pass * per_call:8.1f} µs/response")
+        print(f"  speedup:       {legacy / single_pass:8.2f}x")
+
+if __name__ == "__main__":
+    benchmark()
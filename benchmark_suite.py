@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the hot paths, at realistic data sizes.
+
+Reports throughput (ops/s) and memory for:
+- SimpleVectorStore.add_documents and similarity_search_with_score at 1k-1M chunks
+- RAGSystem._format_response and _extract_consultation_details
+- the LocalDataProcessor classifiers
+- ConsultationScheduler booking and availability with many stored requests
+- ConsultationLogger range queries over the resulting audit log
+
+Everything runs in a temporary directory with deterministic fake embeddings,
+so no API key, network or existing data is needed. Each run is appended to a
+JSON history file and compared with the previous run on the same machine.
+
+Usage:
+    python benchmark_suite.py                                  # 1k,10k,100k chunks; 100k bookings
+    python benchmark_suite.py --scales 1k,10k,100k,1m          # add 1M chunks (needs several GB of RAM)
+    python benchmark_suite.py --only vector_store --scales 10k
+    python benchmark_suite.py --quick                          # small sizes, for a smoke run
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+DEFAULT_SCALES = "1k,10k,100k"
+DEFAULT_BOOKINGS = "100k"
+DEFAULT_HISTORY = "benchmark_history.json"
+GROUPS = ("vector_store", "formatting", "classifiers", "scheduler")
+
+def parse_count(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '500' -> 500"""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+def isolate_environment(directory: str):
+    """Point every store the app opens on import at a scratch directory (before importing it)"""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")  # Models are constructed but never called
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = os.path.join(directory, "chroma_db")
+    os.environ["DATABASE_PATH"] = os.path.join(directory, "chatbot.db")
+    os.environ["AUDIT_LOG_PATH"] = os.path.join(directory, "consultation_audit.jsonl")
+    os.environ["TRANSCRIPT_ENABLED"] = "false"
+    os.environ["TRACE_EXPORTER"] = "none"
+    os.environ["HTTP_WARMUP_ON_STARTUP"] = "false"
+
+class FakeEmbeddings:
+    """Deterministic unit-length vectors derived from the text, at no API cost"""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+
+    def embed_query(self, text: str) -> List[float]:
+        rng = random.Random(zlib.crc32(text.encode("utf-8")))
+        vector = [rng.gauss(0, 1) for _ in range(self.dim)]
+        norm = sum(value * value for value in vector) ** 0.5 or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+# Measurement
+
+def measure(func: Callable[[], Any], items: int = 1, min_time: float = 0.3, max_runs: int = 100000,
+            memory: bool = True) -> Dict[str, Any]:
+    """
+    Call func repeatedly for at least min_time seconds; items is how many
+    operations one call performs. Peak memory comes from one extra call under
+    tracemalloc, kept out of the timing.
+    """
+    func()  # Warm-up
+    gc.collect()
+    runs = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while runs < max_runs and (elapsed < min_time or runs == 0):
+        func()
+        runs += 1
+        elapsed = time.perf_counter() - started
+    result = {
+        "ops_per_sec": items * runs / elapsed if elapsed else None,
+        "seconds_per_op": elapsed / (items * runs),
+        "runs": runs
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def measure_once(func: Callable[[], Any], items: int) -> Dict[str, Any]:
+    """Time a single call that performs `items` operations (for work that changes state)"""
+    gc.collect()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    return {"ops_per_sec": items / elapsed if elapsed else None, "seconds_per_op": elapsed / items, "runs": 1}
+
+def traced_memory(func: Callable[[], Any]):
+    """(result, retained bytes, peak bytes) of one call under tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, current - before, peak - before
+
+# Corpora
+
+TOPICS = [
+    "AI agents", "chatbots", "machine learning pipelines", "computer vision", "document processing",
+    "predictive analytics", "recommendation engines", "voice assistants", "data engineering", "MLOps"
+]
+QUESTION_TEMPLATES = [
+    "What does {topic} cost for a team of {n}?",
+    "How long does it take to build {topic}?",
+    "Can you explain how {topic} would work for order {n}?",
+    "I want to schedule a consultation about {topic}",
+    "We are unhappy with our current {topic} vendor, ticket {n}",
+    "What is the difference between {topic} and RPA?",
+    "Do you have case studies on {topic} for healthcare? ref {n}",
+    "Great work on the {topic} demo, can we book a call for next week?",
+]
+
+def make_queries(count: int, seed: int = 7) -> List[str]:
+    """Distinct, realistic chat messages (distinct so per-message caches do not flatter results)"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(QUESTION_TEMPLATES).format(topic=rng.choice(TOPICS), n=i)
+        for i in range(count)
+    ]
+
+def make_chunks(count: int, chars: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    words = " ".join(TOPICS).split() + ["solutions", "custom", "enterprise", "integration", "support", "model"]
+    chunks = []
+    for i in range(count):
+        text = f"chunk {i}: "
+        while len(text) < chars:
+            text += rng.choice(words) + " "
+        chunks.append(text[:chars])
+    return chunks
+
+def make_llm_answers(count: int) -> List[str]:
+    from response_formatter_reference import GOLDEN_CORPUS
+    answers = [answer for answer in GOLDEN_CORPUS if answer.strip()]
+    return [answers[i % len(answers)] + f"\n\nReference {i}." for i in range(count)]
+
+# Benchmarks
+
+def bench_vector_store(scales: List[int], directory: str, dim: int = 64, chunk_chars: int = 200,
+                       memory: bool = True) -> List[Dict[str, Any]]:
+    from langchain.schema import Document
+    from simple_knowledge_base import SimpleVectorStore
+
+    results = []
+    queries = make_queries(64)
+    for scale in scales:
+        print(f"  vector store at {scale:,} chunks...")
+        documents = [Document(page_content=text, metadata={"source": f"doc_{i // 10}"})
+                     for i, text in enumerate(make_chunks(scale, chunk_chars))]
+
+        def build(path: str):
+            store = SimpleVectorStore(FakeEmbeddings(dim), persist_directory=path)
+            store.add_documents(documents)  # Embeds every chunk and persists once
+            return store
+
+        add = measure_once(lambda: build(os.path.join(directory, f"timed_{scale}")), scale)
+        if memory:
+            store, retained, peak = traced_memory(lambda: build(os.path.join(directory, f"store_{scale}")))
+            add.update(retained_bytes=retained, peak_bytes=peak)
+        else:
+            store = build(os.path.join(directory, f"store_{scale}"))
+        results.append({"benchmark": "SimpleVectorStore.add_documents", "scale": scale, **add})
+
+        query_iter = iter(range(10 ** 9))
+        search = measure(
+            lambda: store.similarity_search_with_score(queries[next(query_iter) % len(queries)], k=5),
+            min_time=1.0 if scale < 100_000 else 0.1, memory=memory
+        )
+        results.append({"benchmark": "SimpleVectorStore.similarity_search_with_score", "scale": scale, **search})
+        del store, documents
+        gc.collect()
+    return results
+
+def bench_formatting(count: int, memory: bool = True) -> List[Dict[str, Any]]:
+    from keyword_automaton import message_features
+    from rag_system import rag_system
+
+    answers = make_llm_answers(count)
+    queries = make_queries(count)
+    results = [{
+        "benchmark": "RAGSystem._format_response", "scale": count,
+        **measure(lambda: [rag_system._format_response(answer) for answer in answers], items=count, memory=memory)
+    }]
+
+    def extract():
+        message_features.cache_clear()  # Every real message is new
+        return [rag_system._extract_consultation_details(query) for query in queries]
+
+    results.append({"benchmark": "RAGSystem._extract_consultation_details", "scale": count,
+                    **measure(extract, items=count, memory=memory)})
+    return results
+
+def bench_classifiers(count: int, memory: bool = True) -> List[Dict[str, Any]]:
+    from data_processor import LocalDataProcessor
+    from keyword_automaton import message_features
+    from models import ChatRequest, ChatResponse
+
+    processor = LocalDataProcessor()
+    queries = make_queries(count)
+    classifiers = [
+        "_classify_query_type", "_analyze_sentiment", "_extract_keywords",
+        "_calculate_complexity", "_categorize_topic", "_determine_user_intent"
+    ]
+    results = []
+    for name in classifiers:
+        method = getattr(processor, name)
+
+        def run(method=method):
+            message_features.cache_clear()
+            return [method(query) for query in queries]
+
+        results.append({"benchmark": f"LocalDataProcessor.{name}", "scale": count,
+                        **measure(run, items=count, memory=memory)})
+
+    pairs = [
+        (ChatRequest(message=query, session_id=f"bench-{i % 50}"),
+         ChatResponse(response="We build custom AI solutions.", session_id=f"bench-{i % 50}", confidence=0.8,
+                      processing_time=0.5, sources=[]))
+        for i, query in enumerate(queries)
+    ]
+
+    def process():
+        message_features.cache_clear()
+        return [processor.process_chat_interaction(request, response) for request, response in pairs]
+
+    results.append({"benchmark": "LocalDataProcessor.process_chat_interaction", "scale": count,
+                    **measure(process, items=count, memory=memory)})
+    return results
+
+def bench_scheduler(bookings: int, directory: str, memory: bool = True) -> List[Dict[str, Any]]:
+    from audit_log import AuditLog
+    from consultation_logger import ConsultationLogger
+    from notification_dispatcher import NotificationDispatcher, SMTPSession
+    from scheduling_system import ConsultationScheduler
+    from storage import Database, NotificationOutbox
+
+    path = os.path.join(directory, "scheduler")
+    os.makedirs(path, exist_ok=True)
+    db = Database(os.path.join(path, "chatbot.db"))
+    audit_log = AuditLog(os.path.join(path, "consultation_audit.jsonl"))
+    logger = ConsultationLogger(
+        log_file=os.path.join(path, "consultation_logs.json"),
+        team_file=os.path.join(path, "team_members.json"),
+        db=db, audit_log=audit_log,
+        dispatcher=NotificationDispatcher(NotificationOutbox(db), SMTPSession())  # Worker never started
+    )
+    scheduler = ConsultationScheduler(os.path.join(path, "consultation_requests.json"), db=db, logger=logger)
+
+    # One booking per distinct slot, spread over as many future days as needed
+    first_day = datetime.now() + timedelta(days=1)
+    slots = [
+        ((first_day + timedelta(days=i // len(scheduler.available_slots))).strftime("%Y-%m-%d"),
+         scheduler.available_slots[i % len(scheduler.available_slots)])
+        for i in range(bookings)
+    ]
+    marks = {}
+
+    def book_all():
+        for i, (day, slot) in enumerate(slots):
+            if i == bookings // 10:
+                marks["old_start"] = datetime.now().isoformat(timespec="microseconds")
+            if i == bookings // 5:
+                marks["old_end"] = datetime.now().isoformat(timespec="microseconds")
+            scheduler.schedule_consultation(
+                name=f"Lead {i}", email=f"lead{i}@example.com", company="Example Inc",
+                preferred_date=day, preferred_time=slot, message="Interested in AI agents"
+            )
+
+    print(f"  booking {bookings:,} consultations...")
+    results = [{"benchmark": "ConsultationScheduler.schedule_consultation", "scale": bookings,
+                **measure_once(book_all, bookings)}]
+
+    taken = iter(range(10 ** 9))
+    results.append({
+        "benchmark": "ConsultationScheduler.schedule_consultation (slot taken)", "scale": bookings,
+        **measure(lambda: scheduler.schedule_consultation(
+            name="Late", email="late@example.com", preferred_date=slots[next(taken) % bookings][0],
+            preferred_time=slots[0][1]
+        ), memory=memory)
+    })
+    results.append({"benchmark": "ConsultationScheduler.get_available_slots", "scale": bookings,
+                    **measure(scheduler.get_available_slots, memory=memory)})
+    probe = iter(range(10 ** 9))
+    results.append({
+        "benchmark": "ConsultationScheduler.is_time_slot_available", "scale": bookings,
+        **measure(lambda: scheduler.is_time_slot_available(*slots[next(probe) % bookings]), memory=memory)
+    })
+
+    # Range queries: the last hour (served from the in-memory window) and an older range read from disk segments
+    recent_start = logger.recent_cutoff(1)
+    results.append({"benchmark": "ConsultationLogger.query_logs (last hour, page of 100)", "scale": bookings,
+                    **measure(lambda: logger.query_logs(start=recent_start, limit=100), memory=memory)})
+    if "old_start" in marks and "old_end" in marks:
+        results.append({
+            "benchmark": "ConsultationLogger.get_logs_by_date_range (10% of history)", "scale": bookings,
+            **measure(lambda: logger.get_logs_by_date_range(marks["old_start"], marks["old_end"]),
+                      min_time=0.5, memory=memory)
+        })
+    results.append({"benchmark": "ConsultationLogger.query_logs (status, page of 100)", "scale": bookings,
+                    **measure(lambda: logger.query_logs(status="pending", limit=100), memory=memory)})
+    return results
+
+# History
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=str(Path(__file__).parent)
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def load_history(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_run(path: str, run: Dict[str, Any]) -> Dict[str, Any]:
+    """Append a run to the history file; returns the previous run, if any"""
+    history = load_history(path)
+    previous = history["runs"][-1] if history["runs"] else None
+    history["runs"].append(run)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(temporary, path)
+    return previous
+
+def compare(run: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-benchmark change in ops/s against the previous run (same benchmark and scale)"""
+    before = {(result["benchmark"], result["scale"]): result for result in (previous or {}).get("results", [])}
+    rows = []
+    for result in run["results"]:
+        old = before.get((result["benchmark"], result["scale"]))
+        change = None
+        if old and old.get("ops_per_sec") and result.get("ops_per_sec"):
+            change = result["ops_per_sec"] / old["ops_per_sec"] - 1
+        rows.append({**result, "change": change})
+    return rows
+
+def _bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def print_report(rows: List[Dict[str, Any]], previous: Optional[Dict[str, Any]]):
+    print()
+    print(f"{'benchmark':<62} {'scale':>9} {'ops/s':>12} {'peak mem':>10} {'retained':>10} {'vs prev':>8}")
+    print("-" * 116)
+    for row in rows:
+        change = f"{row['change'] * 100:+.0f}%" if row["change"] is not None else "-"
+        print(
+            f"{row['benchmark']:<62} {row['scale'] or '-':>9} {row['ops_per_sec'] or 0:>12,.1f} "
+            f"{_bytes(row.get('peak_bytes')):>10} {_bytes(row.get('retained_bytes')):>10} {change:>8}"
+        )
+    if previous:
+        print(f"\nCompared with run {previous['timestamp']} (commit {previous.get('commit')})")
+
+def run_suite(
+    scales: List[int], bookings: int, classifier_count: int = 5000, only: Optional[List[str]] = None,
+    dim: int = 64, chunk_chars: int = 200, memory: bool = True, directory: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the selected benchmark groups and return the run record"""
+    only = only or list(GROUPS)
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        results = []
+        if "vector_store" in only:
+            print("⏱️  Vector store")
+            results += bench_vector_store(scales, scratch, dim, chunk_chars, memory)
+        if "formatting" in only:
+            print("⏱️  Response formatting and consultation detection")
+            results += bench_formatting(classifier_count, memory)
+        if "classifiers" in only:
+            print("⏱️  Local data processor classifiers")
+            results += bench_classifiers(classifier_count, memory)
+        if "scheduler" in only:
+            print("⏱️  Scheduler and consultation logger")
+            results += bench_scheduler(bookings, scratch, memory)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"scales": scales, "bookings": bookings, "classifier_count": classifier_count,
+                     "dim": dim, "chunk_chars": chunk_chars, "groups": only},
+        "results": results
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the chatbot's hot paths")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Vector store sizes, e.g. 1k,10k,100k,1m")
+    parser.add_argument("--bookings", default=DEFAULT_BOOKINGS, help="Consultations booked before the scheduler queries")
+    parser.add_argument("--messages", default="5k", help="Messages per formatter/classifier pass")
+    parser.add_argument("--only", help=f"Comma-separated groups: {','.join(GROUPS)}")
+    parser.add_argument("--dim", type=int, default=64, help="Fake embedding dimensions")
+    parser.add_argument("--chunk-chars", type=int, default=200, help="Characters per synthetic chunk")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file that collects every run")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc memory measurements")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a fast smoke run")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.scales, args.bookings, args.messages = "1k", "2k", "1k"
+    only = [group.strip() for group in args.only.split(",")] if args.only else None
+    unknown = set(only or []) - set(GROUPS)
+    if unknown:
+        parser.error(f"Unknown groups: {', '.join(sorted(unknown))}")
+
+    scratch = tempfile.mkdtemp(prefix="chatbot-bench-")
+    isolate_environment(scratch)
+    # Each booking logs (and warns when SMTP is not configured); the output would dominate the scheduler numbers
+    logging.disable(logging.WARNING)
+
+    try:
+        run = run_suite(
+            [parse_count(scale) for scale in args.scales.split(",")], parse_count(args.bookings),
+            parse_count(args.messages), only, args.dim, args.chunk_chars, not args.no_memory, scratch
+        )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    previous = save_run(args.history, run)
+    print_report(compare(run, previous), previous)
+    print(f"\nSaved to {args.history}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
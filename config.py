@@ -19,6 +19,80 @@ class Config:
     
     # Database Configuration
     CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
+    DATABASE_PATH = os.getenv("DATABASE_PATH", "./chatbot.db")  # SQLite store for consultations and team
+    
+    # Consultation audit log (append-only JSONL, rotated into gzip segments)
+    AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "./consultation_audit.jsonl")
+    AUDIT_LOG_MAX_BYTES = int(os.getenv("AUDIT_LOG_MAX_BYTES", 5 * 1024 * 1024))
+    AUDIT_LOG_MAX_AGE_HOURS = float(os.getenv("AUDIT_LOG_MAX_AGE_HOURS", 24))
+    AUDIT_LOG_WINDOW = int(os.getenv("AUDIT_LOG_WINDOW", 1000))  # Recent entries kept in memory
+    
+    # Email notifications (sent by a background worker from a durable queue)
+    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+    SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))  # Close the pooled connection when idle
+    FROM_EMAIL = os.getenv("FROM_EMAIL", "ask@softtechniques.com")
+    NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 6))
+    NOTIFICATION_BACKOFF_SECONDS = float(os.getenv("NOTIFICATION_BACKOFF_SECONDS", 30))  # Doubles per attempt
+    NOTIFICATION_BACKOFF_MAX_SECONDS = float(os.getenv("NOTIFICATION_BACKOFF_MAX_SECONDS", 3600))
+    NOTIFICATION_POLL_INTERVAL = float(os.getenv("NOTIFICATION_POLL_INTERVAL", 5))
+    NOTIFICATION_DIGEST_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", 0))  # 0 sends each event at once
+    NOTIFICATION_URGENT_ACTIONS = [
+        action.strip() for action in os.getenv("NOTIFICATION_URGENT_ACTIONS", "cancelled").split(",") if action.strip()
+    ]
+    NOTIFICATION_URGENT_WITHIN_HOURS = float(os.getenv("NOTIFICATION_URGENT_WITHIN_HOURS", 24))  # Bookings this soon skip the digest
+    
+    # Lazy services (RAG system, knowledge base, scheduler, logger, n8n) and startup warm-up
+    SERVICE_WARMUP_ON_STARTUP = os.getenv("SERVICE_WARMUP_ON_STARTUP", "true").lower() == "true"  # Build them in the background at startup
+    
+    # Shared outbound HTTP connection pools (OpenAI, n8n)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", 30))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 30))
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # Used when the h2 package is installed
+    HTTP_WARMUP_ON_STARTUP = os.getenv("HTTP_WARMUP_ON_STARTUP", "true").lower() == "true"
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    
+    # Post-response work (analytics, n8n dispatch, session context updates)
+    POST_RESPONSE_WORKERS = int(os.getenv("POST_RESPONSE_WORKERS", 2))
+    POST_RESPONSE_QUEUE_SIZE = int(os.getenv("POST_RESPONSE_QUEUE_SIZE", 1000))
+    POST_RESPONSE_SUBMIT_TIMEOUT_SECONDS = float(os.getenv("POST_RESPONSE_SUBMIT_TIMEOUT_SECONDS", 0))  # Wait this long for room, then shed
+    
+    # Chat transcripts (append-only, zstd-compressed, partitioned by day)
+    TRANSCRIPT_ENABLED = os.getenv("TRANSCRIPT_ENABLED", "true").lower() == "true"
+    TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", "./transcripts")
+    TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", 256))  # Messages per compressed frame
+    TRANSCRIPT_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_SECONDS", 2))
+    TRANSCRIPT_SEGMENT_MAX_BYTES = int(os.getenv("TRANSCRIPT_SEGMENT_MAX_BYTES", 64 * 1024 * 1024))
+    TRANSCRIPT_QUEUE_SIZE = int(os.getenv("TRANSCRIPT_QUEUE_SIZE", 10000))  # Oldest unwritten messages dropped past this
+    TRANSCRIPT_COMPRESSION_LEVEL = int(os.getenv("TRANSCRIPT_COMPRESSION_LEVEL", 3))
+    
+    # Prometheus metrics (GET /metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_LATENCY_BUCKETS = [
+        float(bound) for bound in os.getenv(
+            "METRICS_LATENCY_BUCKETS", "0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30"
+        ).split(",") if bound.strip()
+    ]  # Histogram bucket upper bounds in seconds
+    
+    # Request tracing (spans per chat, head-sampled)
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.05))  # Share of requests traced; 0 disables tracing
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()  # jsonl, otlp or none
+    TRACE_FILE = os.getenv("TRACE_FILE", "./traces/spans.jsonl")
+    TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", 64 * 1024 * 1024))  # Rotated to <file>.1 past this
+    TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "chatbot-backend")
+    TRACE_BATCH_SIZE = int(os.getenv("TRACE_BATCH_SIZE", 512))  # Spans per export
+    TRACE_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACE_FLUSH_INTERVAL_SECONDS", 2))
+    TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", 10000))  # Spans dropped past this
+    
+    # List endpoint pagination
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 100))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 1000))
     
     # Server Configuration
     HOST = os.getenv("HOST", "0.0.0.0")
@@ -27,9 +101,20 @@ class Config:
     # N8N Configuration (Optional - will use local processing if not configured)
     N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL")  # Optional
     N8N_API_KEY = os.getenv("N8N_API_KEY")  # Optional
+    N8N_TIMEOUT_SECONDS = float(os.getenv("N8N_TIMEOUT_SECONDS", 10))
+    N8N_WORKERS = int(os.getenv("N8N_WORKERS", 4))  # Concurrent deliveries
+    N8N_QUEUE_SIZE = int(os.getenv("N8N_QUEUE_SIZE", 1000))
+    N8N_QUEUE_POLICY = os.getenv("N8N_QUEUE_POLICY", "spill")  # When full: spill (process locally), drop_oldest, drop_newest
+    N8N_MAX_RETRIES = int(os.getenv("N8N_MAX_RETRIES", 2))
+    N8N_RETRY_BACKOFF_SECONDS = float(os.getenv("N8N_RETRY_BACKOFF_SECONDS", 0.5))  # Doubles per retry
+    N8N_BREAKER_FAILURES = int(os.getenv("N8N_BREAKER_FAILURES", 5))  # Consecutive failures that open the circuit
+    N8N_BREAKER_RESET_SECONDS = float(os.getenv("N8N_BREAKER_RESET_SECONDS", 30))  # Before a trial request
+    N8N_BATCH_SIZE = int(os.getenv("N8N_BATCH_SIZE", 1))  # Records per webhook call; 1 sends each on its own
+    N8N_BATCH_MAX_WAIT_SECONDS = float(os.getenv("N8N_BATCH_MAX_WAIT_SECONDS", 0.5))  # Flush a partial batch after this
     
     # Model Configuration
     EMBEDDING_MODEL = "text-embedding-3-small"
+    EMBEDDING_CHECK_CTX_LENGTH = os.getenv("EMBEDDING_CHECK_CTX_LENGTH", "true").lower() == "true"  # Token-split long inputs (needs tiktoken data)
     CHAT_MODEL = "gpt-4o-mini"
     TEMPERATURE = 0.7
     MAX_TOKENS = 1000
@@ -38,3 +123,16 @@ class Config:
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
     TOP_K_RESULTS = 5
+    
+    # Session Configuration
+    SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 3600))  # Idle time before a session expires
+    MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 1000))
+    MAX_MESSAGES_PER_SESSION = int(os.getenv("MAX_MESSAGES_PER_SESSION", 50))
+    SESSION_SWEEP_INTERVAL = int(os.getenv("SESSION_SWEEP_INTERVAL", 60))
+    
+    # Shared session backend ("memory" for a single worker, "redis" for several workers)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    SESSION_KEY_PREFIX = os.getenv("SESSION_KEY_PREFIX", "chatbot")
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 256))  # In-process read-through cache entries
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 2))  # Seconds a cached session may be reused
@@ -0,0 +1,26 @@
+"""
+Shared pytest setup. pytest imports this before collecting any test
+module, so the settings below are in place when Config and the module
+singletons are created.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# The chat pipeline builds real OpenAI clients, which refuse to start without a key; tests never reach the API
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+# Tests that drive /chat or the scheduler go through the module singletons, which would otherwise
+# write transcripts, spans, the SQLite database, the audit log and the vector store into the tree
+_scratch = tempfile.mkdtemp(prefix="chatbot-tests-")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+for name, relative in [
+    ("TRANSCRIPT_DIR", "transcripts"),
+    ("TRACE_FILE", os.path.join("traces", "spans.jsonl")),
+    ("DATABASE_PATH", "chatbot.db"),
+    ("AUDIT_LOG_PATH", "consultation_audit.jsonl"),
+    ("CHROMA_PERSIST_DIRECTORY", "chroma_db"),
+]:
+    os.environ.setdefault(name, os.path.join(_scratch, relative))
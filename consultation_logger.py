@@ -2,15 +2,17 @@
 Consultation Logging and Notification System
 """
 
-import json
 import os
-import smtplib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import logging
+from audit_log import AuditLog, log_key
+from config import Config
+from notification_dispatcher import NotificationDispatcher, notification_dispatcher
+from pagination import decode_cursor, encode_cursor
+from services import LazyService
+from storage import Database, TeamMemberRepository, database
 
 # Configure logging
 logging.basicConfig(
@@ -51,52 +53,43 @@ class TeamMember:
 class ConsultationLogger:
     """Handles logging and notifications for consultation requests"""
     
-    def __init__(self, log_file: str = "consultation_logs.json", team_file: str = "team_members.json"):
+    def __init__(
+        self,
+        log_file: str = "consultation_logs.json",
+        team_file: str = "team_members.json",
+        db: Database = None,
+        audit_log: AuditLog = None,
+        dispatcher: NotificationDispatcher = None
+    ):
         self.log_file = log_file
         self.team_file = team_file
-        self.logs = self._load_logs()
-        self.team_members = self._load_team_members()
+        self.audit_log = audit_log or AuditLog()
+        self.team_repository = TeamMemberRepository(db or database)
         
-        # Email configuration (you can set these in environment variables)
-        self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        self.smtp_username = os.getenv("SMTP_USERNAME", "")
-        self.smtp_password = os.getenv("SMTP_PASSWORD", "")
-        self.from_email = os.getenv("FROM_EMAIL", "ask@softtechniques.com")
+        # One-shot import of logs and team members saved by earlier JSON-file versions
+        (db or database).migrate_json(f"consultation_logs:{os.path.basename(log_file)}", log_file, self._import_logs)
+        self.team_repository.migrate_from_json(team_file)
+        
+        # Emails are queued and sent by the dispatcher's background worker (SMTP settings in Config)
+        self.dispatcher = dispatcher or notification_dispatcher
         
         # Initialize default team members if none exist
-        if not self.team_members:
+        if not self.team_repository.count():
             self._initialize_default_team()
     
-    def _load_logs(self) -> List[Dict]:
-        """Load existing consultation logs from file"""
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-    
-    def _save_logs(self):
-        """Save consultation logs to file"""
-        with open(self.log_file, 'w') as f:
-            json.dump(self.logs, f, indent=2)
+    def _import_logs(self, conn, rows: List[Dict]):
+        for row in rows:
+            self.audit_log.append({"ip_address": "", "user_agent": "", **row})
     
-    def _load_team_members(self) -> List[Dict]:
-        """Load team members from file"""
-        if os.path.exists(self.team_file):
-            try:
-                with open(self.team_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+    @property
+    def logs(self) -> List[Dict]:
+        """All consultation logs, oldest first (streams every segment)"""
+        return list(self.audit_log.iter_entries())
     
-    def _save_team_members(self):
-        """Save team members to file"""
-        with open(self.team_file, 'w') as f:
-            json.dump(self.team_members, f, indent=2)
+    @property
+    def team_members(self) -> List[Dict]:
+        """All team members"""
+        return self.team_repository.all()
     
     def _initialize_default_team(self):
         """Initialize default team members"""
@@ -114,8 +107,7 @@ class ConsultationLogger:
                 "phone": "(888) 324-6560"
             }
         ]
-        self.team_members = default_team
-        self._save_team_members()
+        self.team_repository.add_many(default_team)
     
     def log_consultation_action(self, 
                                action: str,
@@ -144,14 +136,13 @@ class ConsultationLogger:
             preferred_time=preferred_time,
             message=message,
             status=status,
-            timestamp=datetime.now().isoformat(),
+            timestamp=datetime.now().isoformat(timespec="microseconds"),
             ip_address=ip_address,
             user_agent=user_agent
         )
         
         # Add to logs
-        self.logs.append(asdict(log_entry))
-        self._save_logs()
+        self.audit_log.append(asdict(log_entry))
         
         # Log to file
         logging.info(f"Consultation {action}: {consultation_id} - {user_name} ({user_email})")
@@ -168,14 +159,25 @@ class ConsultationLogger:
     def _send_notifications(self, log_entry: ConsultationLog):
         """Send notifications to team members"""
         try:
+            urgent = self._is_urgent(log_entry)
             if log_entry.action == "scheduled":
-                self._send_new_consultation_notification(log_entry)
+                self._send_new_consultation_notification(log_entry, urgent)
             elif log_entry.action in ["confirmed", "cancelled"]:
-                self._send_status_update_notification(log_entry)
+                self._send_status_update_notification(log_entry, urgent)
         except Exception as e:
             logging.error(f"Error sending notifications: {e}")
     
-    def _send_new_consultation_notification(self, log_entry: ConsultationLog):
+    def _is_urgent(self, log_entry: ConsultationLog) -> bool:
+        """Urgent events bypass digest mode: configured actions and consultations booked for very soon"""
+        if log_entry.action in Config.NOTIFICATION_URGENT_ACTIONS:
+            return True
+        try:
+            preferred = datetime.fromisoformat(log_entry.preferred_date)
+        except ValueError:
+            return False
+        return preferred - datetime.now() <= timedelta(hours=Config.NOTIFICATION_URGENT_WITHIN_HOURS)
+    
+    def _send_new_consultation_notification(self, log_entry: ConsultationLog, urgent: bool = True):
         """Send notification for new consultation request"""
         subject = f"New Consultation Request - {log_entry.user_name}"
         
@@ -202,9 +204,9 @@ Contact Information:
 This is an automated notification from your consultation scheduling system.
         """
         
-        self._send_email_to_team(subject, body)
+        self._send_email_to_team(subject, body, urgent)
     
-    def _send_status_update_notification(self, log_entry: ConsultationLog):
+    def _send_status_update_notification(self, log_entry: ConsultationLog, urgent: bool = True):
         """Send notification for status updates"""
         subject = f"Consultation Status Update - {log_entry.consultation_id}"
         
@@ -223,70 +225,64 @@ Please follow up as needed.
 This is an automated notification from your consultation scheduling system.
         """
         
-        self._send_email_to_team(subject, body)
+        self._send_email_to_team(subject, body, urgent)
     
-    def _send_email_to_team(self, subject: str, body: str):
-        """Send email to all team members"""
-        if not self.smtp_username or not self.smtp_password:
+    def _send_email_to_team(self, subject: str, body: str, urgent: bool = True):
+        """
+        Queue one email to all team members; the request does not wait for SMTP.
+        Non-urgent emails wait for the next digest when digest mode is on.
+        """
+        if not self.dispatcher.enabled:
             logging.warning("Email credentials not configured. Skipping email notification.")
             return
         
         try:
-            for member in self.team_members:
-                self._send_email(member["email"], subject, body)
-        except Exception as e:
-            logging.error(f"Error sending email to team: {e}")
-    
-    def _send_email(self, to_email: str, subject: str, body: str):
-        """Send individual email"""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            text = msg.as_string()
-            server.sendmail(self.from_email, to_email, text)
-            server.quit()
-            
-            logging.info(f"Email sent to {to_email}")
+            recipients = [member["email"] for member in self.team_members]
+            if urgent:
+                self.dispatcher.enqueue(subject, body, recipients)
+            else:
+                self.dispatcher.add_to_digest(subject, body, recipients)
         except Exception as e:
-            logging.error(f"Error sending email to {to_email}: {e}")
+            logging.error(f"Error queueing email to team: {e}")
     
+    def query_logs(self, start: Optional[str] = None, end: Optional[str] = None, status: Optional[str] = None,
+                   limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """
+        One page of logs, newest first. Pass the returned next_cursor back to
+        get the following page; it is None on the last page.
+        """
+        before = None
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            before = (float(values[0]), str(values[1]))
+
+        logs = self.audit_log.query(start, end, status=status, before=before, limit=limit)
+        next_cursor = None
+        if limit is not None and logs and len(logs) == limit:
+            next_cursor = encode_cursor(list(log_key(logs[-1])))
+        return {"logs": logs, "next_cursor": next_cursor}
+
+    def count_logs(self, start: Optional[str] = None, end: Optional[str] = None, status: Optional[str] = None) -> int:
+        """Number of logs matching a query, across every page"""
+        return self.audit_log.count(start, end, status)
+
+    def recent_cutoff(self, hours: int) -> str:
+        return (datetime.now() - timedelta(hours=hours)).isoformat(timespec="microseconds")
+
     def get_recent_logs(self, hours: int = 24) -> List[Dict]:
-        """Get recent consultation logs"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_logs = []
-        
-        for log in self.logs:
-            log_time = datetime.fromisoformat(log["timestamp"])
-            if log_time >= cutoff_time:
-                recent_logs.append(log)
-        
-        return sorted(recent_logs, key=lambda x: x["timestamp"], reverse=True)
-    
+        """Get recent consultation logs, newest first"""
+        return self.query_logs(start=self.recent_cutoff(hours))["logs"]
+
     def get_logs_by_status(self, status: str) -> List[Dict]:
-        """Get logs by status"""
-        return [log for log in self.logs if log["status"] == status]
-    
+        """Get logs by status, newest first"""
+        return self.query_logs(status=status)["logs"]
+
     def get_logs_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
-        """Get logs by date range"""
-        start = datetime.fromisoformat(start_date)
-        end = datetime.fromisoformat(end_date)
-        
-        filtered_logs = []
-        for log in self.logs:
-            log_time = datetime.fromisoformat(log["timestamp"])
-            if start <= log_time <= end:
-                filtered_logs.append(log)
-        
-        return sorted(filtered_logs, key=lambda x: x["timestamp"], reverse=True)
-    
+        """Get logs by date range, newest first"""
+        return self.query_logs(start=start_date, end=end_date)["logs"]
+
     def add_team_member(self, name: str, email: str, role: str, phone: str = "") -> Dict:
         """Add a new team member"""
         team_member = {
@@ -296,8 +292,7 @@ This is an automated notification from your consultation scheduling system.
             "phone": phone
         }
         
-        self.team_members.append(team_member)
-        self._save_team_members()
+        self.team_repository.add(team_member)
         
         return {
             "success": True,
@@ -306,11 +301,7 @@ This is an automated notification from your consultation scheduling system.
     
     def remove_team_member(self, email: str) -> Dict:
         """Remove a team member"""
-        original_count = len(self.team_members)
-        self.team_members = [member for member in self.team_members if member["email"] != email]
-        
-        if len(self.team_members) < original_count:
-            self._save_team_members()
+        if self.team_repository.remove(email):
             return {"success": True, "message": f"Team member {email} removed successfully"}
         else:
             return {"success": False, "message": "Team member not found"}
@@ -325,43 +316,34 @@ This is an automated notification from your consultation scheduling system.
         from scheduling_system import consultation_scheduler
         
         # Get actual consultation requests, not logs
-        requests = consultation_scheduler.get_all_requests()
-        
-        total_requests = len(requests)
-        pending_requests = len([req for req in requests if req["status"] == "pending"])
-        confirmed_requests = len([req for req in requests if req["status"] == "confirmed"])
-        completed_requests = len([req for req in requests if req["status"] == "completed"])
-        cancelled_requests = len([req for req in requests if req["status"] == "cancelled"])
+        repository = consultation_scheduler.repository
+        status_counts = repository.status_counts()
         
         # Recent activity (last 7 days) - count requests created in last 7 days
-        from datetime import datetime, timedelta
         cutoff_time = datetime.now() - timedelta(days=7)
         recent_requests = 0
         
-        for req in requests:
+        for created_at in repository.created_at_values():
             try:
-                created_at = datetime.fromisoformat(req["created_at"])
-                if created_at >= cutoff_time:
+                if datetime.fromisoformat(created_at) >= cutoff_time:
                     recent_requests += 1
             except:
                 # If date parsing fails, skip this request
                 continue
         
         return {
-            "total_requests": total_requests,
-            "pending_requests": pending_requests,
-            "confirmed_requests": confirmed_requests,
-            "completed_requests": completed_requests,
-            "cancelled_requests": cancelled_requests,
+            "total_requests": repository.count(),
+            "pending_requests": status_counts.get("pending", 0),
+            "confirmed_requests": status_counts.get("confirmed", 0),
+            "completed_requests": status_counts.get("completed", 0),
+            "cancelled_requests": status_counts.get("cancelled", 0),
             "recent_requests_7_days": recent_requests,
-            "team_members_count": len(self.team_members)
+            "team_members_count": self.team_repository.count()
         }
     
     def clear_all_logs(self) -> Dict:
         """Clear all consultation logs"""
-        original_count = len(self.logs)
-        self.logs = []
-        self._save_logs()
+        original_count = self.audit_log.clear()
         
         logging.info(f"All consultation logs cleared. {original_count} logs removed.")
         
@@ -372,4 +354,4 @@ This is an automated notification from your consultation scheduling system.
         }
 
 # Initialize the logger
-consultation_logger = ConsultationLogger()
+consultation_logger = LazyService("consultation_logger", ConsultationLogger)
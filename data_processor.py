@@ -9,9 +9,37 @@ import logging
 from typing import Dict, Any, List
 from datetime import datetime
 from models import ChatRequest, ChatResponse
+from keyword_automaton import keyword_automaton, message_features
+from streaming_stats import StreamingMetric
 
 logger = logging.getLogger(__name__)
 
+# Keyword masks, checked in priority order by the classifiers below
+_QUERY_TYPE_RULES = [
+    (keyword_automaton.mask("query_type.definition"), "definition"),
+    (keyword_automaton.mask("query_type.how_to"), "how_to"),
+    (keyword_automaton.mask("query_type.benefits"), "benefits"),
+    (keyword_automaton.mask("query_type.services"), "services"),
+    (keyword_automaton.mask("query_type.pricing"), "pricing"),
+    (keyword_automaton.mask("query_type.contact"), "contact"),
+]
+_TOPIC_RULES = [
+    (keyword_automaton.mask("topic.agentic_ai"), "agentic_ai"),
+    (keyword_automaton.mask("topic.services"), "services"),
+    (keyword_automaton.mask("topic.implementation"), "implementation"),
+    (keyword_automaton.mask("topic.pricing"), "pricing"),
+    (keyword_automaton.mask("topic.contact"), "contact"),
+]
+_INTENT_RULES = [
+    (keyword_automaton.mask("intent.purchase"), "purchase"),
+    (keyword_automaton.mask("intent.learn"), "learn"),
+    (keyword_automaton.mask("intent.support"), "support"),
+    (keyword_automaton.mask("intent.demo"), "demo"),
+]
+_POSITIVE_WORDS = keyword_automaton.mask("sentiment.positive")
+_NEGATIVE_WORDS = keyword_automaton.mask("sentiment.negative")
+_TECHNICAL_TERMS = keyword_automaton.mask("complexity.technical")
+
 class LocalDataProcessor:
     """
     Local data processor that provides the same functionality as N8N workflows
@@ -22,8 +50,9 @@ class LocalDataProcessor:
         self.processing_stats = {
             "total_requests": 0,
             "query_types": {},
-            "engagement_scores": [],
-            "processing_times": []
+            # Constant-memory running aggregates, percentiles and sliding windows
+            "engagement_scores": StreamingMetric(),
+            "processing_times": StreamingMetric()
         }
     
     def process_chat_interaction(self, chat_request: ChatRequest, rag_response: ChatResponse) -> Dict[str, Any]:
@@ -174,32 +203,19 @@ class LocalDataProcessor:
     
     def _classify_query_type(self, query: str) -> str:
         """Classify the type of query"""
-        query_lower = query.lower()
+        features = message_features(query)
         
-        if any(word in query_lower for word in ["what", "define", "explain", "meaning"]):
-            return "definition"
-        elif any(word in query_lower for word in ["how", "process", "steps", "implement", "deploy"]):
-            return "how_to"
-        elif any(word in query_lower for word in ["why", "benefit", "advantage", "purpose"]):
-            return "benefits"
-        elif any(word in query_lower for word in ["service", "offer", "provide", "company", "capabilities"]):
-            return "services"
-        elif any(word in query_lower for word in ["price", "cost", "fee", "rate", "budget"]):
-            return "pricing"
-        elif any(word in query_lower for word in ["contact", "reach", "speak", "talk"]):
-            return "contact"
-        else:
-            return "general"
+        for mask, query_type in _QUERY_TYPE_RULES:
+            if features & mask:
+                return query_type
+        return "general"
     
     def _analyze_sentiment(self, query: str) -> str:
         """Simple sentiment analysis"""
-        positive_words = ["good", "great", "excellent", "amazing", "love", "like", "interested"]
-        negative_words = ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"]
-        
-        query_lower = query.lower()
+        features = message_features(query)
         
-        positive_count = sum(1 for word in positive_words if word in query_lower)
-        negative_count = sum(1 for word in negative_words if word in query_lower)
+        positive_count = (features & _POSITIVE_WORDS).bit_count()
+        negative_count = (features & _NEGATIVE_WORDS).bit_count()
         
         if positive_count > negative_count:
             return "positive"
@@ -233,8 +249,7 @@ class LocalDataProcessor:
             score += 0.2
         
         # Technical terms
-        technical_terms = ["api", "integration", "implementation", "deployment", "architecture", "framework"]
-        if any(term in query.lower() for term in technical_terms):
+        if message_features(query) & _TECHNICAL_TERMS:
             score += 0.3
         
         return min(score, 1.0)
@@ -276,20 +291,12 @@ class LocalDataProcessor:
     
     def _categorize_topic(self, query: str) -> str:
         """Categorize the topic of the query"""
-        query_lower = query.lower()
+        features = message_features(query)
         
-        if any(word in query_lower for word in ["agentic", "ai", "artificial intelligence", "machine learning"]):
-            return "agentic_ai"
-        elif any(word in query_lower for word in ["service", "offer", "provide", "capability"]):
-            return "services"
-        elif any(word in query_lower for word in ["implement", "deploy", "setup", "integration"]):
-            return "implementation"
-        elif any(word in query_lower for word in ["cost", "price", "budget", "pricing"]):
-            return "pricing"
-        elif any(word in query_lower for word in ["contact", "reach", "speak", "demo"]):
-            return "contact"
-        else:
-            return "general"
+        for mask, topic in _TOPIC_RULES:
+            if features & mask:
+                return topic
+        return "general"
     
     def _assess_lead_quality(self, chat_request: ChatRequest, query_analysis: Dict[str, Any]) -> str:
         """Assess lead quality based on query"""
@@ -317,18 +324,12 @@ class LocalDataProcessor:
     
     def _determine_user_intent(self, query: str) -> str:
         """Determine user intent"""
-        query_lower = query.lower()
+        features = message_features(query)
         
-        if any(word in query_lower for word in ["buy", "purchase", "order", "get"]):
-            return "purchase"
-        elif any(word in query_lower for word in ["learn", "understand", "know", "explain"]):
-            return "learn"
-        elif any(word in query_lower for word in ["help", "support", "problem", "issue"]):
-            return "support"
-        elif any(word in query_lower for word in ["demo", "trial", "test", "try"]):
-            return "demo"
-        else:
-            return "explore"
+        for mask, intent in _INTENT_RULES:
+            if features & mask:
+                return intent
+        return "explore"
     
     def _needs_follow_up(self, chat_request: ChatRequest, rag_response: ChatResponse) -> bool:
         """Determine if follow-up is needed"""
@@ -359,23 +360,25 @@ class LocalDataProcessor:
             self.processing_stats["query_types"][query_type] = 1
         
         # Update engagement scores
-        self.processing_stats["engagement_scores"].append(response_analysis.get("confidence", 0.0))
+        self.processing_stats["engagement_scores"].add(response_analysis.get("confidence", 0.0))
         
         # Update processing times
         if response_analysis.get("processing_time"):
-            self.processing_stats["processing_times"].append(response_analysis["processing_time"])
+            self.processing_stats["processing_times"].add(response_analysis["processing_time"])
     
     def get_processing_statistics(self) -> Dict[str, Any]:
-        """Get processing statistics"""
-        avg_engagement = sum(self.processing_stats["engagement_scores"]) / len(self.processing_stats["engagement_scores"]) if self.processing_stats["engagement_scores"] else 0
-        avg_processing_time = sum(self.processing_stats["processing_times"]) / len(self.processing_stats["processing_times"]) if self.processing_stats["processing_times"] else 0
+        """Get processing statistics (independent of how many interactions were processed)"""
+        engagement = self.processing_stats["engagement_scores"]
+        processing_times = self.processing_stats["processing_times"]
         
         return {
             "total_requests": self.processing_stats["total_requests"],
-            "query_type_distribution": self.processing_stats["query_types"],
-            "average_engagement_score": avg_engagement,
-            "average_processing_time": avg_processing_time,
-            "most_common_query_type": max(self.processing_stats["query_types"], key=self.processing_stats["query_types"].get) if self.processing_stats["query_types"] else "none"
+            "query_type_distribution": dict(self.processing_stats["query_types"]),
+            "average_engagement_score": engagement.mean,
+            "average_processing_time": processing_times.mean,
+            "most_common_query_type": max(self.processing_stats["query_types"], key=self.processing_stats["query_types"].get) if self.processing_stats["query_types"] else "none",
+            "engagement_score": engagement.snapshot(),
+            "processing_time": processing_times.snapshot()
         }
 
 # Initialize local data processor
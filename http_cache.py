@@ -0,0 +1,108 @@
+"""
+HTTP Response Cache
+ETag support for read-heavy endpoints. Each cached endpoint names the data
+it depends on as a version tuple (usually storage generation counters). The
+ETag is derived from that version, so clients revalidating with
+If-None-Match get a 304 without the payload being rebuilt, and the
+serialized body is reused until the version changes.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+def make_etag(key: str, version: Tuple) -> str:
+    """Strong ETag for a cache key at a data version"""
+    digest = hashlib.sha1(f"{key}:{version!r}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def serialize_json(payload: Any) -> bytes:
+    """Serialize like FastAPI's JSONResponse"""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+class ResponseCache:
+    """Serialized JSON bodies keyed by endpoint, valid while their data version holds"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple, str, bytes]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def respond(self, request: Request, key: str, version: Tuple, build: Callable[[], Any]) -> Response:
+        """
+        Answer a GET for key at data version: 304 if the client already has
+        it, the memoized body if unchanged, otherwise build and serialize once.
+        """
+        headers, not_modified = self.revalidate(request, key, version)
+        if not_modified is not None:
+            return not_modified
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self.stats["hits"] += 1
+            body = entry[2]
+        else:
+            body = serialize_json(build())
+            with self._lock:
+                self.stats["misses"] += 1
+                self._entries[key] = (version, headers["ETag"], body)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def revalidate(self, request: Request, key: str, version: Tuple) -> Tuple[Dict[str, str], Optional[Response]]:
+        """
+        Validator headers for key at data version, plus a 304 if the client
+        already has it. For responses that are streamed rather than memoized.
+        """
+        etag = make_etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return headers, Response(status_code=304, headers=headers)
+        return headers, None
+
+    def invalidate(self, key: str = None):
+        """Drop one memoized body, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "cached_bytes": sum(len(entry[2]) for entry in self._entries.values())
+            }
+
+# Shared response cache
+response_cache = ResponseCache()
@@ -0,0 +1,171 @@
+"""
+Shared HTTP Clients
+One connection-pooled httpx client (sync) and named async clients shared by
+the OpenAI chat and embedding models, the n8n integration and other outbound
+calls, so repeated requests to the same host reuse kept-alive connections
+instead of paying TCP and TLS setup every time. HTTP/2 is used when the h2
+package is installed.
+
+Async clients hold connections bound to the event loop that uses them, so
+each loop gets its own named pool: "default" for the app's event loop and,
+for example, "n8n" for the n8n delivery loop.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import Config
+
+try:
+    import h2  # noqa: F401  (httpx negotiates HTTP/2 only when h2 is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+def origin_of(url: str) -> Optional[str]:
+    """scheme://host[:port] of a URL, or None if it has no host"""
+    parts = urlsplit(url or "")
+    if not parts.scheme or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+class HTTPClients:
+    """Lazily created, shared httpx clients with pool limits and request counters"""
+
+    def __init__(
+        self,
+        max_connections: int = Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = Config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        timeout: float = Config.HTTP_TIMEOUT_SECONDS,
+        http2: bool = Config.HTTP2_ENABLED
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._sync: Optional[httpx.Client] = None
+        self._async: Dict[str, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": {}, "warmed": []}
+
+    def _count(self, pool: str):
+        self.stats["requests"][pool] = self.stats["requests"].get(pool, 0) + 1
+
+    def _client_options(self, pool: str, is_async: bool) -> Dict[str, Any]:
+        if is_async:
+            async def on_request(request):
+                self._count(pool)
+        else:
+            def on_request(request):
+                self._count(pool)
+        return {
+            "limits": self.limits,
+            "timeout": self.timeout,
+            "http2": self.http2,
+            "follow_redirects": True,
+            "event_hooks": {"request": [on_request]}
+        }
+
+    @property
+    def sync(self) -> httpx.Client:
+        """The shared blocking client (thread-safe, used from any thread)"""
+        with self._lock:
+            if self._sync is None or self._sync.is_closed:
+                self._sync = httpx.Client(**self._client_options("sync", is_async=False))
+            return self._sync
+
+    def async_client(self, name: str = "default") -> httpx.AsyncClient:
+        """The async client for one event loop; use a distinct name per loop"""
+        with self._lock:
+            client = self._async.get(name)
+            if client is None or client.is_closed:
+                client = self._async[name] = httpx.AsyncClient(**self._client_options(name, is_async=True))
+            return client
+
+    async def aclose(self, name: str = "default"):
+        """Close one async pool (from the loop that used it)"""
+        with self._lock:
+            client = self._async.pop(name, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the sync pool; async pools are closed by their loops via aclose"""
+        with self._lock:
+            client, self._sync = self._sync, None
+        if client is not None:
+            client.close()
+
+    # Warm-up
+
+    def warm_up(self, urls: Iterable[str]) -> List[str]:
+        """Open a pooled connection to each origin ahead of the first real request"""
+        warmed = []
+        for origin in dict.fromkeys(filter(None, map(origin_of, urls))):
+            try:
+                self.sync.head(origin)  # Any response means the connection is open
+                warmed.append(origin)
+            except httpx.HTTPError as e:
+                logging.warning(f"HTTP warm-up failed for {origin}: {e}")
+        self.stats["warmed"] = sorted(set(self.stats["warmed"]) | set(warmed))
+        return warmed
+
+    async def awarm_up(self, urls: Iterable[str], name: str = "default") -> List[str]:
+        """Async warm-up of one async pool, all origins concurrently"""
+        origins = list(dict.fromkeys(filter(None, map(origin_of, urls))))
+        client = self.async_client(name)
+        results = await asyncio.gather(*(client.head(origin) for origin in origins), return_exceptions=True)
+        warmed = []
+        for origin, result in zip(origins, results):
+            if isinstance(result, Exception):
+                logging.warning(f"HTTP warm-up failed for {origin}: {result}")
+            else:
+                warmed.append(origin)
+        self.stats["warmed"] = sorted(set(self.stats["warmed"]) | set(warmed))
+        return warmed
+
+    # Stats
+
+    @staticmethod
+    def _pool_stats(client: Any) -> Dict[str, Any]:
+        # httpx does not expose pool state publicly; read it from the httpcore pool when present
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "http2_connections": sum(
+                1 for connection in connections
+                if "HTTP/2" in getattr(connection, "info", lambda: "")()
+            )
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = {"sync": self._sync, **self._async}
+        return {
+            "http2": self.http2,
+            "http2_available": HTTP2_AVAILABLE,
+            "limits": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry
+            },
+            "pools": {
+                name: {"requests": self.stats["requests"].get(name, 0), **self._pool_stats(client)}
+                for name, client in pools.items() if client is not None
+            },
+            "warmed_origins": list(self.stats["warmed"])
+        }
+
+# Shared HTTP clients
+http_clients = HTTPClients()
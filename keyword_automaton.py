@@ -0,0 +1,143 @@
+"""
+Shared Keyword Automaton
+One Aho-Corasick automaton over every keyword used by the intent, topic and
+analytics classifiers. A message is scanned once and the result is a bitset
+(one bit per keyword) that all classifiers read from.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List
+
+# Keyword groups used by RAGSystem and LocalDataProcessor. Matching is plain
+# substring matching on the lowercased message, so "ai" also matches "explain".
+KEYWORD_GROUPS: Dict[str, List[str]] = {
+    # RAGSystem._extract_consultation_details
+    "consultation.explicit": [
+        "schedule a consultation", "book a consultation", "schedule consultation",
+        "book consultation", "want to schedule", "want to book", "need consultation",
+        "get consultation", "have consultation", "set up consultation",
+        "arrange consultation", "plan consultation", "organize consultation"
+    ],
+    "consultation.general": [
+        "consultation", "meeting", "appointment", "call", "demo", "discuss", "talk", "consult"
+    ],
+
+    # RAGSystem._extract_topics
+    "topics.pricing": ["pricing", "cost"],
+    "topics.services": ["service", "offer"],
+    "topics.demo": ["demo", "consultation"],
+    "topics.implementation": ["implementation", "deploy"],
+
+    # LocalDataProcessor._classify_query_type
+    "query_type.definition": ["what", "define", "explain", "meaning"],
+    "query_type.how_to": ["how", "process", "steps", "implement", "deploy"],
+    "query_type.benefits": ["why", "benefit", "advantage", "purpose"],
+    "query_type.services": ["service", "offer", "provide", "company", "capabilities"],
+    "query_type.pricing": ["price", "cost", "fee", "rate", "budget"],
+    "query_type.contact": ["contact", "reach", "speak", "talk"],
+
+    # LocalDataProcessor._analyze_sentiment
+    "sentiment.positive": ["good", "great", "excellent", "amazing", "love", "like", "interested"],
+    "sentiment.negative": ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"],
+
+    # LocalDataProcessor._calculate_complexity
+    "complexity.technical": ["api", "integration", "implementation", "deployment", "architecture", "framework"],
+
+    # LocalDataProcessor._categorize_topic
+    "topic.agentic_ai": ["agentic", "ai", "artificial intelligence", "machine learning"],
+    "topic.services": ["service", "offer", "provide", "capability"],
+    "topic.implementation": ["implement", "deploy", "setup", "integration"],
+    "topic.pricing": ["cost", "price", "budget", "pricing"],
+    "topic.contact": ["contact", "reach", "speak", "demo"],
+
+    # LocalDataProcessor._determine_user_intent
+    "intent.purchase": ["buy", "purchase", "order", "get"],
+    "intent.learn": ["learn", "understand", "know", "explain"],
+    "intent.support": ["help", "support", "problem", "issue"],
+    "intent.demo": ["demo", "trial", "test", "try"],
+}
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that maps a text to a bitset of matched keywords"""
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.keywords: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._masks: Dict[str, int] = {}
+
+        for group, words in groups.items():
+            mask = 0
+            for word in words:
+                word = word.lower()
+                if word not in self._keyword_ids:
+                    self._keyword_ids[word] = len(self.keywords)
+                    self.keywords.append(word)
+                mask |= 1 << self._keyword_ids[word]
+            self._masks[group] = mask
+
+        self._build()
+
+    def _build(self):
+        """Build the trie, failure links and the full transition table"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[int] = [0]
+
+        for word, keyword_id in self._keyword_ids.items():
+            state = 0
+            for char in word:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(0)
+                state = next_state
+            output[state] |= 1 << keyword_id
+
+        # Breadth-first pass turns the trie into a DFA: every state gets the
+        # transitions of its failure state, so scanning never backtracks
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            table = dict(transitions[fail[state]])
+            for char, next_state in goto[state].items():
+                fail[next_state] = transitions[fail[state]].get(char, 0)
+                table[char] = next_state
+                queue.append(next_state)
+            transitions[state] = table
+
+        self._transitions = transitions
+        self._output = output
+
+    def scan(self, text: str) -> int:
+        """Scan the lowercased text once and return the matched-keyword bitset"""
+        transitions = self._transitions
+        output = self._output
+        state = 0
+        bits = 0
+        for char in text.lower():
+            state = transitions[state].get(char, 0)
+            if output[state]:
+                bits |= output[state]
+        return bits
+
+    def mask(self, group: str) -> int:
+        """Bitset of all keywords in a group"""
+        return self._masks[group]
+
+    def matched_keywords(self, bits: int) -> List[str]:
+        """Keywords present in a bitset (for debugging and analytics)"""
+        return [word for keyword_id, word in enumerate(self.keywords) if bits >> keyword_id & 1]
+
+# Shared automaton
+keyword_automaton = KeywordAutomaton(KEYWORD_GROUPS)
+
+@lru_cache(maxsize=1024)
+def message_features(text: str) -> int:
+    """Keyword bitset for a message; each message is only scanned once"""
+    return keyword_automaton.scan(text)
@@ -2,31 +2,28 @@ import os
 import json
 import warnings
 from typing import List, Dict, Any
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from config import Config
+from http_clients import http_clients
+from metrics import timed
+from services import LazyService
+from tracing import tracer
 
 # Suppress the Chroma deprecation warning
 warnings.filterwarnings("ignore", message=".*Chroma.*deprecated.*", category=DeprecationWarning)
-# Simplified imports to avoid langchain_community dependency
-try:
-    from langchain_community.document_loaders import TextLoader, PyPDFLoader
-    from langchain_chroma import Chroma
-except ImportError:
-    # Fallback to basic text processing
-    TextLoader = None
-    PyPDFLoader = None
-    try:
-        from langchain_chroma import Chroma
-    except ImportError:
-        from langchain.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_core.documents import Document
-from config import Config
 
 class KnowledgeBase:
     def __init__(self):
+        # langchain and chromadb take seconds to import, so they load with the first KnowledgeBase
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from langchain_openai import OpenAIEmbeddings
+        
         self.embeddings = OpenAIEmbeddings(
             model=Config.EMBEDDING_MODEL,
-            openai_api_key=Config.OPENAI_API_KEY
+            openai_api_key=Config.OPENAI_API_KEY,
+            openai_api_base=Config.OPENAI_BASE_URL,
+            check_embedding_ctx_length=Config.EMBEDDING_CHECK_CTX_LENGTH,
+            http_client=http_clients.sync,
+            http_async_client=http_clients.async_client()
         )
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=Config.CHUNK_SIZE,
@@ -37,6 +34,10 @@ class KnowledgeBase:
     
     def _initialize_vectorstore(self):
         """Initialize or load existing vector store"""
+        try:
+            from langchain_chroma import Chroma
+        except ImportError:
+            from langchain.vectorstores import Chroma
         try:
             self.vectorstore = Chroma(
                 persist_directory=Config.CHROMA_PERSIST_DIRECTORY,
@@ -50,8 +51,15 @@ class KnowledgeBase:
                 embedding_function=self.embeddings
             )
     
+    def _persist(self):
+        """Flush to disk on Chroma versions that need it (newer ones persist on every write)"""
+        if hasattr(self.vectorstore, "persist"):
+            self.vectorstore.persist()
+    
     def add_documents_from_text(self, texts: List[str], metadata: List[Dict[str, Any]] = None):
         """Add documents from text strings"""
+        from langchain_core.documents import Document
+        
         if metadata is None:
             metadata = [{"source": f"text_{i}"} for i in range(len(texts))]
         
@@ -62,12 +70,14 @@ class KnowledgeBase:
         
         chunks = self.text_splitter.split_documents(documents)
         self.vectorstore.add_documents(chunks)
-        self.vectorstore.persist()
+        self._persist()
         print(f"Added {len(chunks)} document chunks to knowledge base")
     
     def add_documents_from_file(self, file_path: str):
         """Add documents from a file"""
-        if TextLoader is None or PyPDFLoader is None:
+        try:
+            from langchain_community.document_loaders import TextLoader, PyPDFLoader
+        except ImportError:
             print("Document loaders not available. Please install langchain-community for file processing.")
             return
         
@@ -84,12 +94,16 @@ class KnowledgeBase:
             chunk.metadata["source"] = file_path
         
         self.vectorstore.add_documents(chunks)
-        self.vectorstore.persist()
+        self._persist()
         print(f"Added {len(chunks)} chunks from {file_path}")
     
     def search(self, query: str, k: int = Config.TOP_K_RESULTS) -> List[Dict[str, Any]]:
         """Search for relevant documents"""
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        # Embed and search as separate steps so each is timed on its own
+        with timed("embedding"), tracer.span("embedding", model=Config.EMBEDDING_MODEL, query_chars=len(query)):
+            embedding = self.embeddings.embed_query(query)
+        with timed("vector_search"), tracer.span("vector_search", k=k):
+            results = self.vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
         
         search_results = []
         for doc, score in results:
@@ -102,6 +116,35 @@ class KnowledgeBase:
         
         return search_results
     
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Load the vector index into memory ahead of the first search. Chroma
+        reads it lazily, so one nearest-neighbour query by a stored vector
+        (no embedding call) pulls it in.
+        """
+        collection = self.vectorstore._collection
+        count = collection.count()
+        if count:
+            sample = collection.peek(1)["embeddings"]
+            if sample is not None and len(sample):
+                collection.query(query_embeddings=[list(sample[0])], n_results=1, include=[])
+        return {"documents": count, "index_loaded": True}
+    
+    def get_version(self) -> tuple:
+        """Data version for HTTP caching; documents are only ever added, so the count changes on every add"""
+        return (self.vectorstore._collection.count(),)
+    
+    def get_knowledge_base_status(self) -> Dict[str, Any]:
+        """Get status information about the knowledge base"""
+        data = self.vectorstore.get(include=["metadatas"])
+        metadatas = [meta or {} for meta in data.get("metadatas") or []]
+        return {
+            "total_documents": len(data["ids"]),
+            "persist_directory": Config.CHROMA_PERSIST_DIRECTORY,
+            "document_sources": list(set(meta.get("source", "unknown") for meta in metadatas)),
+            "document_types": list(set(meta.get("type", "unknown") for meta in metadatas))
+        }
+    
     def initialize_with_agentic_ai_content(self):
         """Initialize knowledge base with agentic AI domain content"""
         agentic_ai_content = [
@@ -201,4 +244,4 @@ class KnowledgeBase:
         print("Initialized knowledge base with agentic AI content")
 
 # Initialize knowledge base
-knowledge_base = KnowledgeBase()
+knowledge_base = LazyService("knowledge_base", KnowledgeBase, warm_up=KnowledgeBase.warm_up)
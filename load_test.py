@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for capacity planning.
+
+Boots the app (uvicorn, as in production) against deterministic local
+stand-ins for everything it calls out to:
+- OpenAI chat completions and embeddings (an HTTP server at OPENAI_BASE_URL)
+- the n8n webhook (same server)
+- SMTP for team notifications (a minimal SMTP server)
+
+Each stand-in answers after a lognormal delay and fails a set share of
+calls, so the app's own cost can be measured under realistic upstream
+latency. A closed loop of concurrent clients then drives a chat-heavy mix
+with booking and dashboard traffic, and the report gives throughput,
+p50/p95/p99 latency and error rates per endpoint.
+
+All data lives in a scratch directory; no API key or network is needed.
+
+Usage:
+    python load_test.py                                   # 20 clients for 60s, default mix
+    python load_test.py --concurrency 50 --duration 120 --workers 2
+    python load_test.py --mix chat=90,dashboard=10 --llm median=1200,sigma=0.6,errors=0.02
+    python load_test.py --requests 500 --output load_report.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from benchmark_suite import FakeEmbeddings
+from streaming_stats import LogHistogram, RunningStats
+
+APP_DIR = Path(__file__).parent
+DEFAULT_MIX = "chat=80,book=5,dashboard=15"
+DEFAULT_PROFILES = {
+    "llm": "median=600,sigma=0.4,errors=0",
+    "embeddings": "median=40,sigma=0.3,errors=0",
+    "n8n": "median=80,sigma=0.5,errors=0",
+    "smtp": "median=50,sigma=0.5,errors=0",
+}
+
+QUESTIONS = [
+    "What services do you offer?",
+    "How do your AI agents integrate with our CRM?",
+    "Can you automate our customer support workflows?",
+    "What does a typical implementation timeline look like?",
+    "How much does a custom AI agent cost?",
+    "Do you have case studies in healthcare?",
+    "How do you handle data privacy and security?",
+    "What makes agentic AI different from a chatbot?",
+    "Can your agents work with our internal documents?",
+    "What support do you provide after launch?",
+    "I'd like to schedule a consultation about AI automation",
+    "Who is on your team?",
+]
+
+ANSWERS = [
+    "We design and build **custom AI agents** that automate multi-step business workflows.\n\n"
+    "- Customer support agents\n- Document processing\n- Sales and CRM automation",
+    "Most projects follow four phases: discovery, prototype, integration and rollout. "
+    "A first production agent usually ships within 6-10 weeks.",
+    "Our agents connect to your existing tools through APIs, so your team keeps working where it already does. "
+    "We handle authentication, retries and audit logging.",
+    "Security is built in: data stays in your cloud, every action is logged, and access follows least privilege. "
+    "Would you like to schedule a consultation to discuss your requirements?",
+]
+
+SEED_DOCUMENTS = [
+    "Softtechniques builds custom agentic AI solutions: autonomous agents that plan and execute multi-step "
+    "business workflows, integrated with CRMs, ticketing systems and internal knowledge bases.",
+    "Implementation follows discovery, prototype, integration and rollout phases. Typical projects deliver a "
+    "first production agent in six to ten weeks, followed by monitoring and continuous improvement.",
+    "Customer support automation: agents triage tickets, draft replies from the knowledge base, escalate to "
+    "humans with full context and learn from resolved cases.",
+    "Security and compliance: deployments run in the customer's cloud, every agent action is audit logged and "
+    "access follows least privilege. We support SOC 2 and HIPAA aligned environments.",
+    "Pricing depends on scope. Discovery workshops are fixed price; build and support are offered as monthly "
+    "engagements. Book a free consultation to get an estimate.",
+]
+
+def percentile_ms(histogram: LogHistogram, stats: RunningStats, q: float) -> Optional[float]:
+    """Percentile in milliseconds, kept within the observed range (buckets report their midpoint)"""
+    value = histogram.percentile(q)
+    return None if value is None else round(min(max(value, stats.min), stats.max) * 1000, 2)
+
+# Upstream stand-ins
+
+@dataclass
+class UpstreamProfile:
+    """Latency and failures of one fake upstream: lognormal delay around a median, plus an error share"""
+    median_ms: float = 100.0
+    sigma: float = 0.5
+    error_rate: float = 0.0
+
+    @classmethod
+    def parse(cls, text: str) -> "UpstreamProfile":
+        """'median=600,sigma=0.4,errors=0.01' (any subset of the keys)"""
+        profile = cls()
+        for part in filter(None, (part.strip() for part in text.split(","))):
+            key, _, value = part.partition("=")
+            if key == "median":
+                profile.median_ms = float(value)
+            elif key == "sigma":
+                profile.sigma = float(value)
+            elif key == "errors":
+                profile.error_rate = float(value)
+            else:
+                raise ValueError(f"Unknown upstream setting: {key}")
+        return profile
+
+    def sample(self, rng: random.Random) -> Tuple[float, bool]:
+        """(delay in seconds, whether this call fails)"""
+        delay = self.median_ms / 1000 * math.exp(rng.gauss(0, self.sigma)) if self.median_ms > 0 else 0.0
+        return delay, rng.random() < self.error_rate
+
+class _UpstreamState:
+    """Profiles, a seeded RNG and call counters shared by the fake servers"""
+
+    def __init__(self, profiles: Dict[str, UpstreamProfile], seed: int, embedding_dim: int):
+        self.profiles = profiles
+        self.embeddings = FakeEmbeddings(dim=embedding_dim)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {name: 0 for name in profiles}
+        self.errors = {name: 0 for name in profiles}
+
+    def decide(self, name: str) -> Tuple[float, bool]:
+        with self._lock:
+            delay, fail = self.profiles[name].sample(self._rng)
+            self.calls[name] += 1
+            self.errors[name] += fail
+        return delay, fail
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: {"calls": self.calls[name], "errors": self.errors[name]} for name in self.calls}
+
+def _usage(prompt_chars: int, completion: str) -> Dict[str, int]:
+    prompt_tokens, completion_tokens = prompt_chars // 4, len(completion) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+class _FakeAPIHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible /chat/completions and /embeddings, plus the n8n webhook"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json(200, {"status": "ok"})  # Connection warm-up
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.endswith("/chat/completions"):
+            route = "llm"
+        elif self.path.endswith("/embeddings"):
+            route = "embeddings"
+        elif self.path.startswith("/n8n"):
+            route = "n8n"
+        else:
+            self._send_json(404, {"error": {"message": f"No route {self.path}"}})
+            return
+
+        state: _UpstreamState = self.server.state
+        delay, fail = state.decide(route)
+        time.sleep(delay)
+        if fail:
+            self._send_json(503, {"error": {"message": "Injected upstream failure", "type": "server_error"}})
+            return
+        self._send_json(200, getattr(self, f"_{route}")(payload, state))
+
+    def _llm(self, payload: Dict[str, Any], state: _UpstreamState) -> Dict[str, Any]:
+        messages = payload.get("messages", [])
+        question = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        answer = ANSWERS[zlib.crc32(str(question).encode("utf-8")) % len(ANSWERS)]
+        return {
+            "id": f"chatcmpl-load-{zlib.crc32(str(question).encode('utf-8')):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake-model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": _usage(sum(len(str(m.get("content", ""))) for m in messages), answer),
+        }
+
+    def _embeddings(self, payload: Dict[str, Any], state: _UpstreamState) -> Dict[str, Any]:
+        inputs = payload.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        data = []
+        for index, text in enumerate(inputs):
+            vector = state.embeddings.embed_query(str(text))
+            if payload.get("encoding_format") == "base64":
+                # The openai client asks for packed float32 by default
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        return {
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": sum(len(str(text)) // 4 for text in inputs),
+                      "total_tokens": sum(len(str(text)) // 4 for text in inputs)},
+        }
+
+    def _n8n(self, payload: Dict[str, Any], state: _UpstreamState) -> Dict[str, Any]:
+        records = payload.get("records") if isinstance(payload.get("records"), list) else [payload]
+        return {
+            "processed_data": {"status": "processed", "records": len(records)},
+            "workflow_id": "load-test",
+            "processing_time": 0,
+        }
+
+class _FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT (no TLS)"""
+
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        state: _UpstreamState = self.server.state
+        self._reply("220 localhost fake SMTP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                delay, fail = state.decide("smtp")
+                time.sleep(delay)
+                self._reply("451 4.3.0 Injected failure" if fail else "250 OK: queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class FakeUpstreams:
+    """Runs the fake API and SMTP servers on free local ports"""
+
+    def __init__(self, profiles: Dict[str, UpstreamProfile], seed: int = 0, embedding_dim: int = 256):
+        self.state = _UpstreamState(profiles, seed, embedding_dim)
+        self.api = ThreadingHTTPServer(("127.0.0.1", 0), _FakeAPIHandler)
+        self.api.daemon_threads = True
+        self.api.state = self.state
+        self.smtp = _ThreadingSMTPServer(("127.0.0.1", 0), _FakeSMTPHandler)
+        self.smtp.state = self.state
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self.api.server_address[1]}"
+
+    @property
+    def smtp_port(self) -> int:
+        return self.smtp.server_address[1]
+
+    def start(self) -> "FakeUpstreams":
+        for server in (self.api, self.smtp):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.api, self.smtp):
+            server.shutdown()
+            server.server_close()
+
+    def app_environment(self, directory: str) -> Dict[str, str]:
+        """Settings that point the app at the fakes and keep all of its data in `directory`"""
+        return {
+            "OPENAI_API_KEY": "sk-load-test",
+            "OPENAI_BASE_URL": f"{self.api_url}/v1",
+            "EMBEDDING_CHECK_CTX_LENGTH": "false",  # Send raw strings; no tiktoken download
+            "N8N_WEBHOOK_URL": f"{self.api_url}/n8n/webhook",
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(self.smtp_port),
+            "SMTP_USERNAME": "load-test",
+            "SMTP_PASSWORD": "load-test",
+            "SMTP_STARTTLS": "false",
+            "CHROMA_PERSIST_DIRECTORY": os.path.join(directory, "chroma_db"),
+            "DATABASE_PATH": os.path.join(directory, "chatbot.db"),
+            "AUDIT_LOG_PATH": os.path.join(directory, "consultation_audit.jsonl"),
+            "TRANSCRIPT_DIR": os.path.join(directory, "transcripts"),
+            "TRACE_EXPORTER": "none",
+            "HTTP_WARMUP_ON_STARTUP": "false",
+            "LANGCHAIN_TRACING_V2": "false",
+        }
+
+# The app under test
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class AppServer:
+    """The real app under uvicorn in a subprocess"""
+
+    def __init__(self, environment: Dict[str, str], workers: int = 1, port: Optional[int] = None, log_path: str = os.devnull):
+        self.environment = environment
+        self.workers = workers
+        self.port = port or _free_port()
+        self.log_path = log_path
+        self.process: Optional[subprocess.Popen] = None
+        self.launched_at: Optional[float] = None  # perf_counter() when the process was started
+        self.healthy_seconds: Optional[float] = None  # Launch to the first healthy /health
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 120, poll_interval: float = 0.25) -> "AppServer":
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                   "--port", str(self.port), "--log-level", "warning", "--no-access-log"]
+        if self.workers > 1:
+            command += ["--workers", str(self.workers)]
+        self._log = open(self.log_path, "ab")
+        self.launched_at = time.perf_counter()
+        self.process = subprocess.Popen(
+            command, cwd=APP_DIR, env={**os.environ, **self.environment},
+            stdout=self._log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App exited during startup (code {self.process.returncode}); see {self.log_path}")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=2).status_code == 200:
+                    self.healthy_seconds = time.perf_counter() - self.launched_at
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(poll_interval)
+        self.stop()
+        raise RuntimeError(f"App did not become healthy within {timeout:.0f}s")
+
+    def stop(self, timeout: float = 30):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        if getattr(self, "_log", None):
+            self._log.close()
+
+def seed_knowledge_base(url: str):
+    response = httpx.post(f"{url}/knowledge-base/add-text", json={"texts": SEED_DOCUMENTS}, timeout=60)
+    response.raise_for_status()
+
+# Load generation
+
+class EndpointStats:
+    """Latency distribution and outcomes of one endpoint"""
+
+    MAX_ERROR_SAMPLES = 3
+
+    def __init__(self):
+        self.latency = RunningStats()
+        self.histogram = LogHistogram(precision=0.005)
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+        self.error_samples: List[str] = []  # First few error bodies, for diagnosis
+
+    def record(self, seconds: float, status: str, error: Optional[str]):
+        self.latency.add(seconds)
+        self.histogram.add(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error is not None:
+            self.errors += 1
+            if len(self.error_samples) < self.MAX_ERROR_SAMPLES:
+                self.error_samples.append(f"{status}: {error[:300]}")
+
+    def merge(self, other: "EndpointStats"):
+        self.latency.merge(other.latency)
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.error_samples = (self.error_samples + other.error_samples)[:self.MAX_ERROR_SAMPLES]
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        count = self.latency.count
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "mean_ms": round(self.latency.mean * 1000, 2),
+            "p50_ms": percentile_ms(self.histogram, self.latency, 0.50),
+            "p95_ms": percentile_ms(self.histogram, self.latency, 0.95),
+            "p99_ms": percentile_ms(self.histogram, self.latency, 0.99),
+            "max_ms": None if self.latency.max is None else round(self.latency.max * 1000, 2),
+            "statuses": dict(sorted(self.statuses.items())),
+            "error_samples": self.error_samples,
+        }
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'chat=80,book=5,dashboard=15' -> relative weights"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in LoadGenerator.SCENARIOS:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(LoadGenerator.SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return mix
+
+class LoadGenerator:
+    """
+    Closed loop: each of `concurrency` clients picks a scenario from the mix,
+    runs it to completion and starts the next. Scenarios:
+    - chat: one POST /chat in a multi-turn session
+    - book: the booking form, available slots then schedule
+    - dashboard: the admin page, its four reads in parallel
+    """
+
+    SCENARIOS = ("chat", "book", "dashboard")
+    TURNS_PER_SESSION = 4
+
+    def __init__(self, url: str, mix: Dict[str, float], concurrency: int = 20, seed: int = 0, timeout: float = 60):
+        self.url = url
+        self.mix = mix
+        self.concurrency = concurrency
+        self.seed = seed
+        self.timeout = timeout
+        self.stats: Dict[str, EndpointStats] = {}
+        self.scenarios: Dict[str, int] = {name: 0 for name in mix}
+        self.recording = False
+        self._issued = 0
+
+    async def _request(self, client: httpx.AsyncClient, method: str, path: str, endpoint: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status = str(response.status_code)
+            error = response.text if response.status_code >= 400 else None
+        except httpx.HTTPError as e:
+            response, status, error = None, type(e).__name__, str(e)
+        if self.recording:
+            self.stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - started, status, error)
+        return response
+
+    async def _chat(self, client: httpx.AsyncClient, rng: random.Random, client_id: int, turn: int):
+        session_id = f"load-{self.seed}-{client_id}-{turn // self.TURNS_PER_SESSION}"
+        await self._request(client, "POST", "/chat", "POST /chat",
+                            json={"message": rng.choice(QUESTIONS), "session_id": session_id})
+
+    async def _book(self, client: httpx.AsyncClient, rng: random.Random, client_id: int, turn: int):
+        response = await self._request(client, "GET", "/consultation/available-slots", "GET /consultation/available-slots")
+        date = time_slot = ""
+        if response is not None and response.status_code == 200:
+            by_day = response.json().get("available_slots", {}).get("available_slots_by_day", {})
+            if by_day:
+                date = rng.choice(sorted(by_day))
+                time_slot = rng.choice(by_day[date])
+        # Once every slot is taken, keep exercising the write path with callback requests (no slot)
+        await self._request(client, "POST", "/consultation/schedule", "POST /consultation/schedule", json={
+            "name": f"Load Client {client_id}",
+            "email": f"load{client_id}.{turn}@example.com",
+            "company": "Load Test Inc",
+            "preferred_date": date,
+            "preferred_time": time_slot,
+            "message": "Interested in AI automation",
+        })
+
+    async def _dashboard(self, client: httpx.AsyncClient, rng: random.Random, client_id: int, turn: int):
+        await asyncio.gather(
+            self._request(client, "GET", "/admin/stats", "GET /admin/stats"),
+            self._request(client, "GET", "/consultation/all", "GET /consultation/all", params={"limit": 50}),
+            self._request(client, "GET", "/admin/team", "GET /admin/team"),
+            self._request(client, "GET", "/admin/logs/recent", "GET /admin/logs/recent", params={"hours": 24}),
+        )
+
+    async def _client(self, client: httpx.AsyncClient, client_id: int, deadline: float, max_requests: Optional[int]):
+        rng = random.Random(self.seed * 100003 + client_id)
+        names, weights = list(self.mix), list(self.mix.values())
+        turn = 0
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                if self._issued >= max_requests:
+                    return
+                self._issued += 1
+            name = rng.choices(names, weights)[0]
+            if self.recording:
+                self.scenarios[name] += 1
+            await getattr(self, f"_{name}")(client, rng, client_id, turn)
+            turn += 1
+
+    async def run(self, duration: Optional[float] = 60, requests: Optional[int] = None, warmup: float = 5) -> float:
+        """Drive load and return the measured (post-warm-up) seconds"""
+        limits = httpx.Limits(max_connections=self.concurrency * 4, max_keepalive_connections=self.concurrency * 4)
+        async with httpx.AsyncClient(base_url=self.url, timeout=self.timeout, limits=limits) as client:
+            if warmup > 0:
+                warmup_end = time.perf_counter() + warmup
+                await asyncio.gather(*(self._client(client, i, warmup_end, None) for i in range(self.concurrency)))
+            self.recording = True
+            deadline = time.perf_counter() + (duration if duration else float("inf"))
+            started = time.perf_counter()
+            await asyncio.gather(*(self._client(client, i, deadline, requests) for i in range(self.concurrency)))
+            return time.perf_counter() - started
+
+# Reporting
+
+def build_report(generator: LoadGenerator, elapsed: float, upstreams: FakeUpstreams, settings: Dict[str, Any]) -> Dict[str, Any]:
+    overall = EndpointStats()
+    for stats in generator.stats.values():
+        overall.merge(stats)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": settings,
+        "elapsed_seconds": round(elapsed, 3),
+        "scenarios": generator.scenarios,
+        "overall": overall.summary(elapsed),
+        "endpoints": {endpoint: stats.summary(elapsed) for endpoint, stats in sorted(generator.stats.items())},
+        "upstreams": upstreams.state.stats(),
+    }
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:,.1f}"
+
+def print_report(report: Dict[str, Any]):
+    settings = report["settings"]
+    print(f"\n🚦 Load test: {settings['concurrency']} clients, {settings['workers']} worker(s), "
+          f"mix {settings['mix']}, {report['elapsed_seconds']:.1f}s measured")
+    print(f"   Scenarios run: {', '.join(f'{name}={count}' for name, count in report['scenarios'].items())}")
+    header = f"{'Endpoint':<38} {'Reqs':>7} {'Req/s':>8} {'Err %':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["overall"])]
+    for endpoint, row in rows:
+        print(f"{endpoint:<38} {row['requests']:>7,} {row['throughput_rps']:>8,.1f} {row['error_rate'] * 100:>6.2f} "
+              f"{_ms(row['p50_ms']):>9} {_ms(row['p95_ms']):>9} {_ms(row['p99_ms']):>9} {_ms(row['max_ms']):>9}")
+    for endpoint, row in report["endpoints"].items():
+        if row["errors"]:
+            print(f"   ⚠️  {endpoint}: {row['statuses']}")
+            for sample in row["error_samples"]:
+                print(f"      {sample}")
+    print("\n   Upstream calls: " + ", ".join(
+        f"{name}={counts['calls']:,} ({counts['errors']:,} failed)" for name, counts in report["upstreams"].items()
+    ))
+
+def run_load_test(
+    concurrency: int = 20,
+    duration: Optional[float] = 60,
+    requests: Optional[int] = None,
+    warmup: float = 5,
+    mix: str = DEFAULT_MIX,
+    workers: int = 1,
+    profiles: Optional[Dict[str, str]] = None,
+    seed: int = 0,
+    embedding_dim: int = 256,
+    keep_data: bool = False,
+) -> Dict[str, Any]:
+    """Start the fakes and the app, drive the mix, and return the report"""
+    weights = parse_mix(mix)
+    parsed = {name: UpstreamProfile.parse(text) for name, text in {**DEFAULT_PROFILES, **(profiles or {})}.items()}
+    directory = tempfile.mkdtemp(prefix="chatbot-load-")
+    upstreams = FakeUpstreams(parsed, seed=seed, embedding_dim=embedding_dim).start()
+    environment = upstreams.app_environment(directory)
+    log_path = os.path.join(directory, "app.log")
+    try:
+        if workers > 1:
+            # Seed through a single process so every worker opens the same index
+            seeder = AppServer(environment, log_path=log_path).start()
+            try:
+                seed_knowledge_base(seeder.url)
+            finally:
+                seeder.stop()
+        app = AppServer(environment, workers=workers, log_path=log_path).start()
+        try:
+            if workers == 1:
+                seed_knowledge_base(app.url)
+            generator = LoadGenerator(app.url, weights, concurrency=concurrency, seed=seed)
+            elapsed = asyncio.run(generator.run(duration=duration, requests=requests, warmup=warmup))
+        finally:
+            app.stop()
+        settings = {
+            "concurrency": concurrency, "workers": workers, "mix": mix, "duration": duration,
+            "requests": requests, "warmup": warmup, "seed": seed,
+            "upstreams": {name: vars(profile) for name, profile in parsed.items()},
+        }
+        return build_report(generator, elapsed, upstreams, settings)
+    finally:
+        upstreams.stop()
+        if keep_data:
+            print(f"   Data and app log kept in {directory}")
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the chatbot against fake OpenAI, n8n and SMTP upstreams")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients (default 20)")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds (default 60)")
+    parser.add_argument("--requests", type=int, help="Stop after this many scenarios instead of after --duration")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring (default 5)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default 1)")
+    for name, default in DEFAULT_PROFILES.items():
+        parser.add_argument(f"--{name}", default=default, help=f"Fake {name} latency and errors (default {default})")
+    parser.add_argument("--embedding-dim", type=int, default=256, help="Fake embedding dimensions (default 256)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the scenario mix and upstream behaviour")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the scratch directory and app log")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        concurrency=args.concurrency,
+        duration=None if args.requests else args.duration,
+        requests=args.requests,
+        warmup=args.warmup,
+        mix=args.mix,
+        workers=args.workers,
+        profiles={name: getattr(args, name) for name in DEFAULT_PROFILES},
+        seed=args.seed,
+        embedding_dim=args.embedding_dim,
+        keep_data=args.keep_data,
+    )
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
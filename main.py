@@ -3,10 +3,12 @@ import os
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
 os.environ["LANGCHAIN_API_KEY"] = ""
 
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Dict, Any, Optional
+import asyncio
 import uuid
 import time
 from datetime import datetime
@@ -17,6 +19,16 @@ from n8n_integration import n8n_integration
 from knowledge_base import knowledge_base
 from scheduling_system import consultation_scheduler
 from consultation_logger import consultation_logger
+from notification_dispatcher import notification_dispatcher
+from session_store import session_store
+from http_cache import response_cache
+from http_clients import http_clients
+from post_response import post_response_worker
+from transcript_store import transcript_store
+import metrics
+import services
+from tracing import tracer
+from pagination import decode_cursor, encode_cursor, stream_page
 from config import Config
 
 # Initialize FastAPI app
@@ -48,19 +60,40 @@ app.add_middleware(
 # Mount static files for admin dashboard
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# In-memory session storage (use Redis or database in production)
-sessions: Dict[str, Dict[str, Any]] = {}
-
+# Sessions and conversation memory share one bounded in-memory store
 def get_session(session_id: str) -> Dict[str, Any]:
     """Get or create a session"""
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "id": session_id,
-            "created_at": datetime.now(),
-            "messages": [],
-            "context": {}
-        }
-    return sessions[session_id]
+    return session_store.get_session(session_id)
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Evict idle sessions and send queued notifications in the background"""
+    session_store.start_sweeper()
+    notification_dispatcher.start()
+    post_response_worker.start()
+    transcript_store.start()
+    if Config.SERVICE_WARMUP_ON_STARTUP:
+        # Build the lazy services and load the vector index while /health already answers
+        services.start_warm_up()
+    if Config.HTTP_WARMUP_ON_STARTUP:
+        # Open pooled connections to OpenAI and n8n without delaying startup
+        origins = [Config.OPENAI_BASE_URL, Config.N8N_WEBHOOK_URL]
+        asyncio.get_running_loop().run_in_executor(None, http_clients.warm_up, origins)
+        asyncio.create_task(http_clients.awarm_up(origins))
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    session_store.stop_sweeper()
+    # n8n's final flush hands results to the post-response worker: drain it first, stop it after n8n
+    post_response_worker.flush()
+    if services.initialized(n8n_integration):
+        n8n_integration.stop()
+    post_response_worker.stop()
+    notification_dispatcher.stop()
+    transcript_store.stop()
+    tracer.stop()
+    http_clients.close()
+    await http_clients.aclose()
 
 @app.get("/")
 async def root():
@@ -72,6 +105,7 @@ async def root():
         "endpoints": {
             "chat": "/chat",
             "health": "/health",
+            "ready": "/ready",
             "docs": "/docs",
             "dashboard": "/dashboard"
         }
@@ -101,103 +135,140 @@ async def health_check():
         }
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 while start-up warm-up is still building services or a build is failing, 200 otherwise"""
+    report = services.readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(chat_request: ChatRequest):
     """
     Main chat endpoint that processes user messages and returns AI responses
     """
+    started = time.perf_counter()
     try:
-        # Generate session ID if not provided
-        session_id = chat_request.session_id or str(uuid.uuid4())
-        
-        # Get or create session
-        session = get_session(session_id)
-        
-        # Add user message to session
-        user_message = ChatMessage(
-            role="user",
-            content=chat_request.message,
-            timestamp=datetime.now()
-        )
-        session["messages"].append(user_message.dict())
-        
-        # Process with RAG system
-        rag_response = rag_system.chat(
-            query=chat_request.message,
-            session_id=session_id,
-            user_context=chat_request.context or session.get("context", {})
-        )
-        
-        # Send to n8n workflow for data structuring (optional component)
-        n8n_result = n8n_integration.send_to_n8n_workflow(chat_request, rag_response)
-        
-        # Process structured data from n8n if available
-        if n8n_result:
-            structured_data = n8n_integration.process_structured_data(n8n_result)
-            # Update session context with structured data
-            session["context"].update(structured_data)
-        
-        # Add assistant message to session
-        assistant_message = ChatMessage(
-            role="assistant",
-            content=rag_response.response,
-            timestamp=datetime.now()
-        )
-        session["messages"].append(assistant_message.dict())
-        
-        # Update session
-        sessions[session_id] = session
-        
-        return rag_response
+        with tracer.span("chat", message_length=len(chat_request.message)) as span:
+            # Generate session ID if not provided
+            session_id = chat_request.session_id or str(uuid.uuid4())
+            
+            # Get or create session
+            session = get_session(session_id)
+            span.set_attributes(session_id=session_id, session_messages=len(session.get("messages", [])))
+            
+            # Add user message to session
+            user_message = ChatMessage(
+                role="user",
+                content=chat_request.message,
+                timestamp=datetime.now()
+            )
+            session_store.add_message(session_id, user_message.dict())
+            transcript_store.append_message(session_id, user_message.dict())
+            
+            # Process with RAG system
+            rag_response = rag_system.chat(
+                query=chat_request.message,
+                session_id=session_id,
+                user_context=chat_request.context or session.get("context", {})
+            )
+            
+            # Structure the exchange (n8n workflow or local analysis) after the reply is sent;
+            # the structured data lands in the session context when it is ready
+            post_response_worker.submit(
+                n8n_integration.dispatch, chat_request, rag_response,
+                on_result=lambda result: post_response_worker.submit(_apply_structured_data, session_id, result)
+            )
+            
+            # Add assistant message to session
+            assistant_message = ChatMessage(
+                role="assistant",
+                content=rag_response.response,
+                timestamp=datetime.now()
+            )
+            session_store.add_message(session_id, assistant_message.dict())
+            transcript_store.append_message(
+                session_id, assistant_message.dict(),
+                confidence=rag_response.confidence,
+                processing_time=rag_response.processing_time,
+                source_count=len(rag_response.sources or []),
+                pipeline_path=rag_response.pipeline_path
+            )
+            
+            metrics.observe_chat(rag_response.pipeline_path, time.perf_counter() - started)
+            span.set_attribute("pipeline_path", rag_response.pipeline_path)
+            if span.sampled:
+                rag_response.trace_id = span.trace_id
+            return rag_response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
+def _apply_structured_data(session_id: str, result: Dict[str, Any]):
+    """Merge structured interaction data into the session context (post-response)"""
+    session_store.update_context(session_id, n8n_integration.process_structured_data(result))
+
+def _cursor_after(cursor: Optional[str], kind: type):
+    """Sort key a single-value cursor points after (None without a cursor); ValueError if malformed"""
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not isinstance(values[0], kind):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values[0]
+
 @app.get("/sessions/{session_id}")
-async def get_session_history(session_id: str):
-    """Get chat history for a specific session"""
-    if session_id not in sessions:
+async def get_session_history(
+    session_id: str,
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get chat history for a specific session, one page of messages at a time"""
+    try:
+        after = _cursor_after(cursor, int) or 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session = session_store.get_session(session_id, create=False)
+    messages = session_store.page_messages(session_id, after, limit) if session is not None else None
+    if messages is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = sessions[session_id]
-    
     # Get conversation summary from RAG system
     conversation_summary = rag_system.get_conversation_summary(session_id)
     
-    return {
-        "session_id": session_id,
-        "created_at": session["created_at"],
-        "message_count": len(session["messages"]),
-        "messages": session["messages"],
-        "context": session["context"],
-        "conversation_summary": conversation_summary
-    }
+    next_cursor = encode_cursor([messages[-1]["seq"]]) if len(messages) == limit else None
+    return stream_page(
+        {
+            "session_id": session_id,
+            "created_at": session["created_at"],
+            "message_count": len(session["messages"]),
+            "context": session["context"],
+            "conversation_summary": conversation_summary
+        },
+        "messages", messages, next_cursor
+    )
 
 @app.delete("/sessions/{session_id}")
 async def delete_session(session_id: str):
     """Delete a chat session"""
-    if session_id not in sessions:
+    # Removes the conversation memory along with the session
+    if not session_store.delete_session(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Clear conversation memory
-    rag_system.clear_conversation_memory(session_id)
-    
-    del sessions[session_id]
     return {"message": "Session deleted successfully"}
 
 @app.get("/sessions")
-async def list_sessions():
-    """List all active sessions"""
-    return {
-        "sessions": [
-            {
-                "session_id": session_id,
-                "created_at": session["created_at"],
-                "message_count": len(session["messages"])
-            }
-            for session_id, session in sessions.items()
-        ]
-    }
+async def list_sessions(
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """List active sessions in session id order, one page at a time"""
+    try:
+        sessions = session_store.page_sessions(_cursor_after(cursor, str), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = encode_cursor([sessions[-1]["session_id"]]) if len(sessions) == limit else None
+    return stream_page({}, "sessions", sessions, next_cursor)
 
 @app.post("/knowledge-base/add-text")
 async def add_text_to_knowledge_base(texts: list[str], metadata: Optional[list[dict]] = None):
@@ -252,14 +323,13 @@ async def search_knowledge_base(query: str, k: int = 5):
         raise HTTPException(status_code=500, detail=f"Error searching knowledge base: {str(e)}")
 
 @app.get("/knowledge-base/status")
-async def get_knowledge_base_status():
+async def get_knowledge_base_status(request: Request):
     """Get knowledge base status and statistics"""
     try:
-        status = knowledge_base.get_knowledge_base_status()
-        return {
+        return response_cache.respond(request, "knowledge-base/status", knowledge_base.get_version(), lambda: {
             "status": "success",
-            "knowledge_base": status
-        }
+            "knowledge_base": knowledge_base.get_knowledge_base_status()
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting knowledge base status: {str(e)}")
 
@@ -279,9 +349,60 @@ async def get_n8n_status():
         "configured": bool(Config.N8N_WEBHOOK_URL),
         "webhook_url": Config.N8N_WEBHOOK_URL,
         "api_key_configured": bool(Config.N8N_API_KEY),
-        "fallback_mode": "local_data_processing" if not Config.N8N_WEBHOOK_URL else "n8n_workflow"
+        "fallback_mode": "local_data_processing" if not Config.N8N_WEBHOOK_URL else "n8n_workflow",
+        "dispatch": n8n_integration.get_stats(),
+        "post_response": post_response_worker.get_stats()
     }
 
+@app.get("/transcripts/stats")
+async def get_transcript_stats():
+    """Transcript store size on disk, compression ratio and writer backlog"""
+    return transcript_store.get_stats()
+
+@app.get("/tracing/stats")
+async def get_tracing_stats():
+    """Trace sampling rate, exporter and spans exported or dropped"""
+    return tracer.get_stats()
+
+@app.get("/http/stats")
+async def get_http_pool_stats():
+    """Outbound connection pool usage, HTTP/2 status and warmed origins"""
+    return http_clients.get_stats()
+
+def _collect_service_metrics():
+    """Scrape-time metrics read from counters the services already keep"""
+    cache = response_cache.get_stats()
+    sessions = session_store.get_metrics()
+    outbox = notification_dispatcher.outbox.status_counts()
+    yield ("chatbot_response_cache_requests_total", "counter", "Cached GET responses served, by result", [
+        ({"result": result}, cache[result]) for result in ("hits", "misses", "not_modified")
+    ])
+    yield ("chatbot_response_cache_entries", "gauge", "Responses held in the cache", [({}, cache["entries"])])
+    yield ("chatbot_sessions", "gauge", "Active chat sessions", [({}, sessions["sessions"])])
+    yield ("chatbot_session_evictions_total", "counter", "Sessions evicted, by reason", [
+        ({"reason": reason}, count) for reason, count in sessions.get("evictions", {}).items()
+    ])
+    yield ("chatbot_queue_depth", "gauge", "Work waiting in each background queue", [
+        # A scrape should not build the n8n integration before warm-up does
+        ({"queue": "n8n"}, n8n_integration.get_stats()["queue_depth"] if services.initialized(n8n_integration) else 0),
+        ({"queue": "post_response"}, post_response_worker.get_stats()["queue_depth"]),
+        ({"queue": "transcript"}, transcript_store.pending_count()),
+        ({"queue": "notification_outbox"}, outbox.get("pending", 0))
+    ])
+    yield ("chatbot_post_response_tasks_total", "counter", "Post-response tasks, by outcome", [
+        ({"outcome": outcome}, post_response_worker.stats[outcome])
+        for outcome in ("completed", "failed", "shed")
+    ])
+
+metrics.registry.register_collector(_collect_service_metrics)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms, cache, session and queue metrics"""
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/analytics/processing-stats")
 async def get_processing_statistics():
     """Get processing statistics from local data processor"""
@@ -291,6 +412,7 @@ async def get_processing_statistics():
         return {
             "status": "success",
             "statistics": stats,
+            "post_response": post_response_worker.get_stats(),
             "processing_method": "local_data_processing"
         }
     except Exception as e:
@@ -301,17 +423,32 @@ async def get_processing_statistics():
         }
 
 @app.get("/memory/sessions")
-async def get_all_memory_sessions():
-    """Get all active conversation memory sessions"""
+async def get_all_memory_sessions(
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get active conversation memory sessions, one page at a time"""
     try:
-        sessions = rag_system.get_all_sessions()
-        return {
-            "active_sessions": sessions,
-            "total_sessions": len(sessions)
-        }
+        after = _cursor_after(cursor, str)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        page = session_store.page_sessions(after, limit, with_memory=True)
+        sessions = [summary["session_id"] for summary in page]
+        next_cursor = encode_cursor([sessions[-1]]) if len(sessions) == limit else None
+        total = session_store.count_sessions(with_memory=True)
+        return stream_page({"total_sessions": total}, "active_sessions", sessions, next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting memory sessions: {str(e)}")
 
+@app.get("/memory/stats")
+async def get_session_store_stats():
+    """Session store size, evictions and approximate memory usage"""
+    return {
+        "status": "success",
+        "session_store": session_store.get_metrics()
+    }
+
 @app.get("/memory/sessions/{session_id}")
 async def get_conversation_memory(session_id: str):
     """Get conversation memory for a specific session"""
@@ -342,14 +479,14 @@ async def clear_conversation_memory(session_id: str):
 
 # Consultation Scheduling Endpoints
 @app.get("/consultation/available-slots")
-async def get_available_consultation_slots():
+async def get_available_consultation_slots(request: Request):
     """Get available consultation time slots"""
     try:
-        slots = consultation_scheduler.get_available_slots()
-        return {
+        version = (consultation_scheduler.repository.generation(), tuple(consultation_scheduler.available_days))
+        return response_cache.respond(request, "consultation/available-slots", version, lambda: {
             "status": "success",
-            "available_slots": slots
-        }
+            "available_slots": consultation_scheduler.get_available_slots()
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting available slots: {str(e)}")
 
@@ -400,18 +537,6 @@ async def schedule_consultation(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scheduling consultation: {str(e)}")
 
-@app.get("/consultation/available-slots")
-async def get_available_consultation_slots():
-    """Get available consultation time slots"""
-    try:
-        slots = consultation_scheduler.get_available_slots()
-        return {
-            "status": "success",
-            "available_slots": slots
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting available slots: {str(e)}")
-
 @app.get("/consultation/status/{consultation_id}")
 async def get_consultation_status(consultation_id: str):
     """Get status of a consultation request"""
@@ -425,15 +550,29 @@ async def get_consultation_status(consultation_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting consultation status: {str(e)}")
 
 @app.get("/consultation/all")
-async def get_all_consultations():
-    """Get all consultation requests (admin endpoint)"""
+async def get_all_consultations(
+    request: Request,
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get consultation requests in creation order, one page at a time (admin endpoint)"""
     try:
-        requests = consultation_scheduler.get_all_requests()
-        return {
-            "status": "success",
-            "total_requests": len(requests),
-            "requests": requests
-        }
+        after = _cursor_after(cursor, int) or 0
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        version = (consultation_scheduler.repository.generation(),)
+        headers, not_modified = response_cache.revalidate(request, f"consultation/all:{after}:{limit}", version)
+        if not_modified is not None:
+            return not_modified
+
+        page = consultation_scheduler.get_requests_page(after, limit)
+        next_cursor = encode_cursor([page[-1][0]]) if len(page) == limit else None
+        return stream_page(
+            {"status": "success", "total_requests": consultation_scheduler.repository.count()},
+            "requests", [consultation for _, consultation in page], next_cursor,
+            headers=headers
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting consultations: {str(e)}")
 
@@ -442,12 +581,13 @@ async def update_consultation_status(consultation_id: str, status: str):
     """Update consultation status (admin endpoint)"""
     try:
         result = consultation_scheduler.update_consultation_status(consultation_id, status)
-        if result["success"]:
-            return result
-        else:
-            raise HTTPException(status_code=404, detail="Consultation request not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating consultation status: {str(e)}")
+    if result["success"]:
+        return result
+    if result.get("conflict"):
+        raise HTTPException(status_code=409, detail=result["message"])
+    raise HTTPException(status_code=404, detail="Consultation request not found")
 
 @app.delete("/consultation/delete/{consultation_id}")
 async def delete_consultation(consultation_id: str):
@@ -462,67 +602,100 @@ async def delete_consultation(consultation_id: str):
         raise HTTPException(status_code=500, detail=f"Error deleting consultation: {str(e)}")
 
 # Admin Logging and Team Management Endpoints
+def _logs_page(limit: int, cursor: Optional[str], start: Optional[str] = None, end: Optional[str] = None,
+               status: Optional[str] = None):
+    """One page of matching logs; total_logs counts every match, not just this page"""
+    page = consultation_logger.query_logs(start=start, end=end, status=status, limit=limit, cursor=cursor)
+    return stream_page(
+        {"status": "success", "total_logs": consultation_logger.count_logs(start, end, status)},
+        "logs", page["logs"], page["next_cursor"]
+    )
+
 @app.get("/admin/logs/recent")
-async def get_recent_consultation_logs(hours: int = 24):
-    """Get recent consultation logs (admin endpoint)"""
+async def get_recent_consultation_logs(
+    hours: int = 24,
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get recent consultation logs, newest first (admin endpoint)"""
     try:
-        logs = consultation_logger.get_recent_logs(hours=hours)
-        return {
-            "status": "success",
-            "total_logs": len(logs),
-            "logs": logs
-        }
+        start = consultation_logger.recent_cutoff(hours)
+        return _logs_page(limit, cursor, start=start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting recent logs: {str(e)}")
 
 @app.get("/admin/logs/status/{status}")
-async def get_logs_by_status(status: str):
-    """Get logs by status (admin endpoint)"""
+async def get_logs_by_status(
+    status: str,
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get logs by status, newest first (admin endpoint)"""
     try:
-        logs = consultation_logger.get_logs_by_status(status)
-        return {
-            "status": "success",
-            "total_logs": len(logs),
-            "logs": logs
-        }
+        return _logs_page(limit, cursor, status=status)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting logs by status: {str(e)}")
 
 @app.get("/admin/logs/date-range")
-async def get_logs_by_date_range(start_date: str, end_date: str):
-    """Get logs by date range (admin endpoint)"""
+async def get_logs_by_date_range(
+    start_date: str,
+    end_date: str,
+    limit: int = Query(Config.DEFAULT_PAGE_SIZE, ge=1, le=Config.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Get logs by date range, newest first (admin endpoint)"""
     try:
-        logs = consultation_logger.get_logs_by_date_range(start_date, end_date)
-        return {
-            "status": "success",
-            "total_logs": len(logs),
-            "logs": logs
-        }
+        return _logs_page(limit, cursor, start=start_date, end=end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting logs by date range: {str(e)}")
 
 @app.get("/admin/stats")
-async def get_consultation_stats():
+async def get_consultation_stats(request: Request):
     """Get consultation statistics (admin endpoint)"""
     try:
-        stats = consultation_logger.get_consultation_stats()
-        return {
+        # The 7-day activity window moves with time, so the version includes the hour
+        version = (
+            consultation_scheduler.repository.generation(),
+            consultation_logger.team_repository.generation(),
+            datetime.now().strftime("%Y-%m-%d %H")
+        )
+        return response_cache.respond(request, "admin/stats", version, lambda: {
             "status": "success",
-            "stats": stats
-        }
+            "stats": consultation_logger.get_consultation_stats()
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
-@app.get("/admin/team")
-async def get_team_members():
-    """Get all team members (admin endpoint)"""
+@app.get("/admin/notifications")
+async def get_notification_stats():
+    """Notification queue depth and SMTP connection stats (admin endpoint)"""
     try:
-        team_members = consultation_logger.get_team_members()
         return {
             "status": "success",
-            "total_members": len(team_members),
-            "team_members": team_members
+            "notifications": notification_dispatcher.get_stats()
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting notification stats: {str(e)}")
+
+@app.get("/admin/team")
+async def get_team_members(request: Request):
+    """Get all team members (admin endpoint)"""
+    try:
+        def build():
+            team_members = consultation_logger.get_team_members()
+            return {
+                "status": "success",
+                "total_members": len(team_members),
+                "team_members": team_members
+            }
+        version = (consultation_logger.team_repository.generation(),)
+        return response_cache.respond(request, "admin/team", version, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting team members: {str(e)}")
 
@@ -18,6 +18,9 @@ class ChatResponse(BaseModel):
     sources: Optional[List[Dict[str, str]]] = None
     confidence: Optional[float] = None
     processing_time: Optional[float] = None
+    pipeline_path: Optional[str] = None  # "consultation" or "rag"
+    stage_timings: Optional[Dict[str, float]] = None  # seconds per chat pipeline stage
+    trace_id: Optional[str] = None  # set when the request was sampled for tracing
 
 class DocumentChunk(BaseModel):
     content: str
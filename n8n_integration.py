@@ -1,21 +1,185 @@
-import requests
-import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union
 from datetime import datetime
+import httpx
 from config import Config
 from models import N8NWebhookPayload, ChatRequest, ChatResponse
 from data_processor import local_data_processor
+from http_clients import HTTPClients, http_clients
+from metrics import timed
+from services import LazyService
+from tracing import current_span, tracer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class CircuitBreaker:
+    """
+    Stops calling a failing service. After failure_threshold consecutive
+    failures the circuit opens and requests are refused; after reset_timeout
+    one trial request is let through (half open), and its outcome closes or
+    reopens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial_in_flight or self._clock() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight:
+                # The trial failed: stay open for another reset period
+                self._trial_in_flight = False
+            elif self._opened_at is not None or self._failures < self.failure_threshold:
+                return
+            self._opened_at = self._clock()
+            self.times_opened += 1
+
+@dataclass
+class _N8NJob:
+    """One chat interaction waiting to be structured"""
+    chat_request: ChatRequest
+    rag_response: ChatResponse
+    payload: Dict[str, Any]
+    on_result: Optional[Callable[[Dict[str, Any]], None]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    trace_parent: Any = field(default_factory=current_span)  # Span the delivery continues
+
+class DeliveryMetrics:
+    """Records delivered, batch sizes and flush latency (first enqueue to delivery) of recent flushes"""
+
+    def __init__(self, window_seconds: float = 60, max_samples: int = 1000):
+        self.window_seconds = window_seconds
+        self._flushes: deque = deque(maxlen=max_samples)  # (finished_at, records, latency seconds)
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.records = 0
+        self.flush_reasons = {"size": 0, "time": 0}
+
+    def record_flush(self, records: int, latency: float, reason: Optional[str] = None):
+        with self._lock:
+            self._flushes.append((time.monotonic(), records, latency))
+            self.batches += 1
+            self.records += records
+            if reason:
+                self.flush_reasons[reason] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            recent = [flush for flush in self._flushes if now - flush[0] <= self.window_seconds]
+            latencies = sorted(flush[2] for flush in self._flushes)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 2)
+
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "avg_batch_size": round(self.records / self.batches, 2) if self.batches else 0,
+            "flush_reasons": dict(self.flush_reasons),
+            "throughput_per_second": round(sum(flush[1] for flush in recent) / self.window_seconds, 3),
+            "flush_latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)}
+        }
+
 class N8NIntegration:
-    def __init__(self):
-        self.webhook_url = Config.N8N_WEBHOOK_URL
-        self.api_key = Config.N8N_API_KEY
+    """
+    Sends chat interactions to an n8n workflow without holding up /chat.
+    Interactions go into a bounded queue served by a background event loop
+    with a pooled async HTTP client. Failed deliveries are retried with
+    backoff; when n8n is unhealthy the circuit breaker opens and interactions
+    are structured by local_data_processor instead.
+
+    With batch_size > 1 each worker accumulates records and posts them as one
+    JSON array, flushing when the batch is full or its oldest record has
+    waited batch_max_wait seconds.
+    """
+
+    QUEUE_POLICIES = ("spill", "drop_oldest", "drop_newest")
+
+    def __init__(
+        self,
+        webhook_url: Optional[str] = Config.N8N_WEBHOOK_URL,
+        api_key: Optional[str] = Config.N8N_API_KEY,
+        timeout: float = Config.N8N_TIMEOUT_SECONDS,
+        workers: int = Config.N8N_WORKERS,
+        queue_size: int = Config.N8N_QUEUE_SIZE,
+        queue_policy: str = Config.N8N_QUEUE_POLICY,
+        max_retries: int = Config.N8N_MAX_RETRIES,
+        retry_backoff: float = Config.N8N_RETRY_BACKOFF_SECONDS,
+        batch_size: int = Config.N8N_BATCH_SIZE,
+        batch_max_wait: float = Config.N8N_BATCH_MAX_WAIT_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+        http: Optional[HTTPClients] = None,
+        pool_name: str = "n8n"
+    ):
+        if queue_policy not in self.QUEUE_POLICIES:
+            raise ValueError(f"Unknown n8n queue policy: {queue_policy}")
+        self.webhook_url = webhook_url
+        self.api_key = api_key
         self.enabled = bool(self.webhook_url)  # Only enable if webhook URL is provided
+        self.timeout = timeout
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.batch_size = max(batch_size, 1)
+        self.batch_max_wait = batch_max_wait
+        self.metrics = DeliveryMetrics()
+        self.breaker = breaker or CircuitBreaker(Config.N8N_BREAKER_FAILURES, Config.N8N_BREAKER_RESET_SECONDS)
+        self.http = http or http_clients
+        self.pool_name = pool_name  # Async pool owned by the delivery loop
+        
+        # Background delivery loop, started on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {
+            "submitted": 0, "sent": 0, "retries": 0, "failed": 0,
+            "fallbacks": 0, "dropped": 0, "spilled": 0
+        }
         
         if self.enabled:
             self.headers = {
@@ -29,68 +193,267 @@ class N8NIntegration:
             self.headers = {}
             logger.info("N8N integration disabled - no webhook URL provided")
     
-    def send_to_n8n_workflow(self, chat_request: ChatRequest, rag_response: ChatResponse) -> Optional[Dict[str, Any]]:
+    def _build_payload(self, chat_request: ChatRequest, rag_response: ChatResponse) -> Dict[str, Any]:
+        payload = N8NWebhookPayload(
+            query=chat_request.message,
+            session_id=chat_request.session_id or "default",
+            user_context=chat_request.context,
+            timestamp=datetime.now()
+        )
+        
+        # Add RAG response data
+        return {
+            "input": payload.model_dump(mode="json"),
+            "rag_response": {
+                "response": rag_response.response,
+                "sources": rag_response.sources,
+                "confidence": rag_response.confidence,
+                "processing_time": rag_response.processing_time
+            },
+            "metadata": {
+                "timestamp": datetime.now().isoformat(),
+                "workflow_type": "chatbot_data_processing"
+            }
+        }
+    
+    def dispatch(self, chat_request: ChatRequest, rag_response: ChatResponse,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None):
         """
-        Send data to n8n workflow for processing and structuring
-        This is an optional component for data structuring and intermediary calculations
+        Structure a chat interaction through the n8n workflow (or local
+        processing) without waiting for it. on_result receives the structured
+        data from whichever path handled the interaction.
         """
         if not self.enabled:
             logger.info("N8N integration disabled, using local data processing")
-            return local_data_processor.process_chat_interaction(chat_request, rag_response)
+            with timed("local_processing"), tracer.span("n8n.local_processing", reason="disabled"):
+                result = local_data_processor.process_chat_interaction(chat_request, rag_response)
+            if on_result and result:
+                on_result(result)
+            return
         
+        job = _N8NJob(chat_request, rag_response, self._build_payload(chat_request, rag_response), on_result)
+        self._ensure_started()
+        self.stats["submitted"] += 1
+        self._loop.call_soon_threadsafe(self._enqueue, job)
+    
+    # Background delivery
+    
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="n8n-dispatcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+    
+    def _run_loop(self, ready: threading.Event):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._client = self.http.async_client(self.pool_name)
+        worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        ready.set()
         try:
-            # Prepare payload for n8n workflow
-            payload = N8NWebhookPayload(
-                query=chat_request.message,
-                session_id=chat_request.session_id or "default",
-                user_context=chat_request.context,
-                timestamp=datetime.now()
-            )
-            
-            # Add RAG response data
-            n8n_data = {
-                "input": payload.dict(),
-                "rag_response": {
-                    "response": rag_response.response,
-                    "sources": rag_response.sources,
-                    "confidence": rag_response.confidence,
-                    "processing_time": rag_response.processing_time
-                },
-                "metadata": {
-                    "timestamp": datetime.now().isoformat(),
-                    "workflow_type": "chatbot_data_processing"
-                }
-            }
-            
-            # Send to n8n workflow
-            response = requests.post(
-                self.webhook_url,
-                json=n8n_data,
-                headers=self.headers,
-                timeout=30
-            )
+            loop.run_forever()
+        finally:
+            for task in worker_tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*worker_tasks, return_exceptions=True))
+            loop.run_until_complete(self.http.aclose(self.pool_name))
+            loop.close()
+    
+    def _enqueue(self, job: _N8NJob):
+        """Add a job to the queue, applying the overflow policy when it is full (runs on the loop)"""
+        if not self._queue.full():
+            self._queue.put_nowait(job)
+        elif self.queue_policy == "drop_oldest":
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(job)
+            self.stats["dropped"] += 1
+        elif self.queue_policy == "drop_newest":
+            self.stats["dropped"] += 1
+        else:
+            self.stats["spilled"] += 1
+            self._loop.run_in_executor(None, self._fallback, job)
+    
+    async def _worker(self):
+        while True:
+            batch, reason = await self._next_batch()
+            try:
+                if self.batch_size > 1:
+                    await self._deliver_batch(batch, reason)
+                else:
+                    await self._deliver(batch[0])
+            except Exception as e:
+                logger.error(f"Unexpected error in n8n integration: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _next_batch(self) -> Tuple[List[_N8NJob], Optional[str]]:
+        """Wait for a job, then (in batching mode) keep collecting until the batch is full or due"""
+        batch = [await self._queue.get()]
+        if self.batch_size == 1:
+            return batch, None
+        deadline = batch[0].enqueued_at + self.batch_max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch, "size" if len(batch) == self.batch_size else "time"
+    
+    async def _post(self, body: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Optional[Any]:
+        """POST with retries; the parsed response, or None once retries are exhausted"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                with timed("n8n"), tracer.span("n8n.post", attempt=attempt + 1) as span:
+                    response = await self._client.post(self.webhook_url, json=body, headers=self.headers, timeout=self.timeout)
+                    span.set_attribute("status_code", response.status_code)
+            except httpx.HTTPError as e:
+                logger.warning(f"Error sending data to n8n workflow: {e}")
+                continue
             
             if response.status_code == 200:
-                result = response.json()
-                print(f"Successfully sent data to n8n workflow: {result}")
-                return result
-            else:
-                print(f"N8N workflow returned status {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Error sending data to n8n workflow: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error in n8n integration: {e}")
-            return local_data_processor.process_chat_interaction(chat_request, rag_response)
+                self.breaker.record_success()
+                try:
+                    return response.json()
+                except ValueError:
+                    # Delivered, but the workflow answered with something other than JSON
+                    # (e.g. "Workflow was started"): there is no structured result to hand back
+                    logger.warning(f"N8N workflow returned a non-JSON body: {response.text[:200]!r}")
+                    return {}
+            logger.warning(f"N8N workflow returned status {response.status_code}: {response.text}")
+            if response.status_code < 500 and response.status_code != 429:
+                break  # Client errors will not succeed on retry
+        
+        self.breaker.record_failure()
+        return None
     
+    async def _deliver(self, job: _N8NJob):
+        with tracer.span("n8n.deliver", parent=job.trace_parent, queue_wait_ms=(time.monotonic() - job.enqueued_at) * 1000):
+            await self._deliver_one(job)
     
-    def process_structured_data(self, n8n_response: Dict[str, Any]) -> Dict[str, Any]:
+    async def _deliver_one(self, job: _N8NJob):
+        if not self.breaker.allow_request():
+            await self._loop.run_in_executor(None, self._fallback, job)
+            return
+        
+        result = await self._post(job.payload)
+        if result is None:
+            self.stats["failed"] += 1
+            await self._loop.run_in_executor(None, self._fallback, job)
+            return
+        
+        self.stats["sent"] += 1
+        self.metrics.record_flush(1, time.monotonic() - job.enqueued_at)
+        logger.info(f"Successfully sent data to n8n workflow: {result}")
+        if job.on_result and result:
+            await self._loop.run_in_executor(None, job.on_result, result)
+    
+    async def _deliver_batch(self, batch: List[_N8NJob], reason: str):
+        """Send a batch as one JSON array and hand each record its own result"""
+        # One span per batch, in the trace of its oldest record
+        with tracer.span(
+            "n8n.deliver_batch", parent=batch[0].trace_parent, batch_size=len(batch), flush_reason=reason,
+            queue_wait_ms=(time.monotonic() - batch[0].enqueued_at) * 1000
+        ):
+            await self._send_batch(batch, reason)
+    
+    async def _send_batch(self, batch: List[_N8NJob], reason: str):
+        if not self.breaker.allow_request():
+            for job in batch:
+                await self._loop.run_in_executor(None, self._fallback, job)
+            return
+        
+        result = await self._post([job.payload for job in batch])
+        if result is None:
+            self.stats["failed"] += len(batch)
+            for job in batch:
+                await self._loop.run_in_executor(None, self._fallback, job)
+            return
+        
+        self.stats["sent"] += len(batch)
+        self.metrics.record_flush(len(batch), time.monotonic() - batch[0].enqueued_at, reason)
+        logger.info(f"Successfully sent batch of {len(batch)} to n8n workflow")
+        for job, job_result in zip(batch, self.split_batch_response(result, len(batch))):
+            if job.on_result and job_result:
+                await self._loop.run_in_executor(None, job.on_result, job_result)
+    
+    @staticmethod
+    def split_batch_response(n8n_response: Any, count: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Per-record results of a batched call, in record order. n8n may answer
+        with a JSON array or {"results": [...]}; missing results are None.
+        """
+        if isinstance(n8n_response, dict):
+            n8n_response = n8n_response.get("results", [])
+        if not isinstance(n8n_response, list):
+            return [None] * count
+        results = [item if isinstance(item, dict) else None for item in n8n_response[:count]]
+        return results + [None] * (count - len(results))
+    
+    def _fallback(self, job: _N8NJob):
+        """Structure the interaction locally (runs in a worker thread)"""
+        self.stats["fallbacks"] += 1
+        with timed("local_processing"), tracer.span("n8n.local_processing", parent=job.trace_parent, reason="fallback"):
+            result = local_data_processor.process_chat_interaction(job.chat_request, job.rag_response)
+        if job.on_result and result:
+            job.on_result(result)
+    
+    def flush(self, timeout: float = 10) -> bool:
+        """Wait until every queued interaction has been handled; returns False on timeout"""
+        if not (self._thread and self._thread.is_alive()):
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+    
+    def stop(self, timeout: float = 10):
+        """Deliver what is queued (up to timeout), then stop the background loop"""
+        if not (self._thread and self._thread.is_alive()):
+            return
+        self.flush(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "queue_policy": self.queue_policy,
+            "circuit": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+            "batching": {"batch_size": self.batch_size, "max_wait_seconds": self.batch_max_wait},
+            "delivery": self.metrics.snapshot()
+        }
+    
+    def process_structured_data(self, n8n_response: Any) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Process the structured data returned from n8n workflow
         This could include calculations, data enrichment, or formatting
+        A batched response (JSON array or {"results": [...]}) gives one entry per record
         """
+        if isinstance(n8n_response, dict) and isinstance(n8n_response.get("results"), list):
+            n8n_response = n8n_response["results"]
+        if isinstance(n8n_response, list):
+            return [self.process_structured_data(item) for item in self.split_batch_response(n8n_response, len(n8n_response))]
+        
         if not n8n_response:
             return {}
         
@@ -128,7 +491,7 @@ class N8NIntegration:
             # Implementation depends on your n8n setup
             status_url = f"{self.webhook_url.replace('/webhook', '')}/api/v1/workflows/{workflow_id}/status"
             
-            response = requests.get(
+            response = self.http.sync.get(
                 status_url,
                 headers=self.headers,
                 timeout=10
@@ -145,4 +508,4 @@ class N8NIntegration:
             return None
 
 # Initialize N8N integration
-n8n_integration = N8NIntegration()
+n8n_integration = LazyService("n8n_integration", N8NIntegration)
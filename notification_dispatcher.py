@@ -0,0 +1,293 @@
+"""
+Notification Dispatcher
+Sends team notification emails off the request path. Notifications are
+written to a durable queue in the database and a background worker sends
+them over a persistent SMTP connection, one SMTP transaction per
+notification with every recipient on it. Failed sends are retried with
+exponential backoff until they run out of attempts.
+
+In digest mode, non-urgent events are held back and every event of a
+window goes out as one digest email per recipient list.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from metrics import timed
+from storage import NotificationOutbox, database
+
+class SMTPSession:
+    """One SMTP connection reused across sends and reopened when it drops or sits idle"""
+
+    def __init__(
+        self,
+        host: str = Config.SMTP_SERVER,
+        port: int = Config.SMTP_PORT,
+        username: str = Config.SMTP_USERNAME,
+        password: str = Config.SMTP_PASSWORD,
+        starttls: bool = Config.SMTP_STARTTLS,
+        idle_timeout: float = Config.SMTP_IDLE_TIMEOUT,
+        timeout: float = 30,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._smtp_factory = smtp_factory
+        self._clock = clock
+        self._connection: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.stats = {"connections_opened": 0, "messages_sent": 0}
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = self._smtp_factory(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        self.stats["connections_opened"] += 1
+        return connection
+
+    def close_if_idle(self):
+        """Drop the connection once it has been idle longer than idle_timeout"""
+        if self._connection is not None and self._clock() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def _get_connection(self) -> smtplib.SMTP:
+        self.close_if_idle()
+        if self._connection is None:
+            self._connection = self._connect()
+        return self._connection
+
+    def send(self, from_email: str, recipients: List[str], message: str) -> Dict[str, Any]:
+        """
+        Send one message to all recipients in a single SMTP transaction.
+        Returns the recipients the server refused; raises if it refused all.
+        """
+        with timed("smtp_send"):
+            try:
+                refused = self._get_connection().sendmail(from_email, recipients, message)
+            except smtplib.SMTPServerDisconnected:
+                # The pooled connection was closed by the server; retry once on a new one
+                self._connection = None
+                refused = self._get_connection().sendmail(from_email, recipients, message)
+        self._last_used = self._clock()
+        self.stats["messages_sent"] += 1
+        return refused
+
+    def close(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except Exception:
+            pass
+        self._connection = None
+
+class NotificationDispatcher:
+    """Durable notification queue with a background sending worker"""
+
+    def __init__(
+        self,
+        outbox: NotificationOutbox,
+        session: SMTPSession,
+        from_email: str = Config.FROM_EMAIL,
+        max_attempts: int = Config.NOTIFICATION_MAX_ATTEMPTS,
+        backoff_seconds: float = Config.NOTIFICATION_BACKOFF_SECONDS,
+        backoff_max_seconds: float = Config.NOTIFICATION_BACKOFF_MAX_SECONDS,
+        poll_interval: float = Config.NOTIFICATION_POLL_INTERVAL,
+        digest_window_seconds: float = Config.NOTIFICATION_DIGEST_WINDOW_SECONDS,
+        batch_size: int = 20,
+        clock: Callable[[], float] = time.time
+    ):
+        self.outbox = outbox
+        self.session = session
+        self.from_email = from_email
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_interval = poll_interval
+        self.digest_window_seconds = digest_window_seconds
+        self.batch_size = batch_size
+        self._clock = clock
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._send_lock = threading.Lock()  # The SMTP session is used by one sender at a time
+        self.digest_stats = {"digests_sent": 0, "events_coalesced": 0, "messages_saved": 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether email credentials are configured"""
+        return bool(self.session.username and self.session.password)
+
+    @property
+    def digest_enabled(self) -> bool:
+        return self.digest_window_seconds > 0
+
+    def enqueue(self, subject: str, body: str, recipients: List[str]) -> Optional[int]:
+        """Queue a notification for all recipients and wake the worker"""
+        recipients = list(dict.fromkeys(recipient for recipient in recipients if recipient))
+        if not recipients:
+            return None
+        notification_id = self.outbox.enqueue(subject, body, recipients, self._clock())
+        self._wake.set()
+        return notification_id
+
+    def add_to_digest(self, subject: str, body: str, recipients: List[str]) -> Optional[int]:
+        """Hold an event back for the current digest window (sent at once when digests are off)"""
+        if not self.digest_enabled:
+            return self.enqueue(subject, body, recipients)
+        recipients = list(dict.fromkeys(recipient for recipient in recipients if recipient))
+        if not recipients:
+            return None
+        event_id = self.outbox.add_digest_event(subject, body, recipients, self._clock())
+        self._wake.set()  # The worker recomputes when the window closes
+        return event_id
+
+    def _compose_digest(self, events: List[Dict[str, Any]]) -> Tuple[str, str]:
+        if len(events) == 1:
+            return events[0]["subject"], events[0]["body"]
+        subjects = "\n".join(f"- {event['subject']}" for event in events)
+        details = "\n".join(f"=== {event['subject']} ===\n{event['body'].strip()}\n" for event in events)
+        return (
+            f"Consultation Digest - {len(events)} updates",
+            f"{len(events)} consultation updates since the last digest:\n\n{subjects}\n\n{details}"
+        )
+
+    def flush_digest(self, force: bool = False) -> int:
+        """Queue the held-back events as digests once the window has closed; returns notifications queued"""
+        opened_at = self.outbox.digest_opened_at()
+        if opened_at is None or (not force and self._clock() - opened_at < self.digest_window_seconds):
+            return 0
+        flushed = self.outbox.flush_digest(self._clock(), self._compose_digest)
+        for event_count, recipients in flushed:
+            if event_count > 1:
+                self.digest_stats["digests_sent"] += 1
+                self.digest_stats["events_coalesced"] += event_count
+                self.digest_stats["messages_saved"] += (event_count - 1) * len(recipients)
+        return len(flushed)
+
+    def _next_wakeup(self) -> float:
+        """Seconds until the next retry is due or the digest window closes, capped at the poll interval"""
+        timeout = self.poll_interval
+        next_due = self.outbox.next_due()
+        if next_due is not None:
+            timeout = min(timeout, next_due - self._clock())
+        opened_at = self.outbox.digest_opened_at()
+        if opened_at is not None:
+            timeout = min(timeout, opened_at + self.digest_window_seconds - self._clock())
+        return max(timeout, 0)
+
+    def _build_message(self, notification: Dict[str, Any]) -> str:
+        msg = MIMEMultipart()
+        msg['From'] = self.from_email
+        msg['To'] = ", ".join(notification["recipients"])
+        msg['Subject'] = notification["subject"]
+        msg.attach(MIMEText(notification["body"], 'plain'))
+        return msg.as_string()
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.backoff_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+
+    def process_due(self) -> int:
+        """Send every notification that is due; returns how many were sent"""
+        sent = 0
+        self.flush_digest()
+        with self._send_lock:
+            while not self._stop.is_set():
+                # Lease long enough to cover a slow batch; a dead worker's claims expire after it
+                batch = self.outbox.claim_due(self._clock(), self.batch_size, lease_seconds=300)
+                if not batch:
+                    break
+                for notification in batch:
+                    sent += self._deliver(notification)
+        return sent
+
+    def _deliver(self, notification: Dict[str, Any]) -> int:
+        attempts = notification["attempts"] + 1
+        try:
+            refused = self.session.send(self.from_email, notification["recipients"], self._build_message(notification))
+        except Exception as e:
+            self.session.close()
+            error = f"{type(e).__name__}: {e}"
+            permanent = isinstance(e, smtplib.SMTPRecipientsRefused) or (
+                isinstance(e, smtplib.SMTPResponseException) and 500 <= e.smtp_code < 600
+            )
+            if permanent or attempts >= self.max_attempts:
+                self.outbox.mark_failed(notification["id"], attempts, error)
+                logging.error(f"Giving up on notification {notification['id']} after {attempts} attempts: {error}")
+            else:
+                delay = self._backoff(attempts)
+                self.outbox.schedule_retry(notification["id"], attempts, self._clock() + delay, error)
+                logging.warning(f"Notification {notification['id']} failed ({error}); retrying in {delay:.0f}s")
+            return 0
+
+        if refused:
+            logging.warning(f"Notification {notification['id']} refused for: {', '.join(refused)}")
+        self.outbox.mark_sent(notification["id"], attempts)
+        logging.info(f"Notification {notification['id']} sent to {len(notification['recipients'])} recipients")
+        return 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            timeout = self.poll_interval
+            try:
+                self.process_due()
+                timeout = self._next_wakeup()
+            except Exception as e:
+                logging.error(f"Notification worker error: {e}")
+
+            # Sleep until something is due, a new notification arrives, or the poll interval passes
+            self._wake.wait(timeout)
+            self._wake.clear()
+            with self._send_lock:
+                self.session.close_if_idle()
+        with self._send_lock:
+            self.session.close()
+
+    def start(self):
+        """Start the background worker (idempotent)"""
+        with self._worker_lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5):
+        with self._worker_lock:
+            self._stop.set()
+            self._wake.set()
+            if self._worker:
+                self._worker.join(timeout)
+            self._worker = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "queue": self.outbox.status_counts(),
+            "digest": {
+                "enabled": self.digest_enabled,
+                "window_seconds": self.digest_window_seconds,
+                "pending_events": self.outbox.digest_event_count(),
+                **self.digest_stats  # Counted by this worker process
+            },
+            "smtp": dict(self.session.stats),
+            "worker_running": bool(self._worker and self._worker.is_alive())
+        }
+
+# Shared notification dispatcher
+notification_dispatcher = NotificationDispatcher(NotificationOutbox(database), SMTPSession())
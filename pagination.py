@@ -0,0 +1,53 @@
+"""
+Cursor Pagination
+Opaque cursors for paginated endpoints. A cursor encodes the sort key of the
+last item on a page, so the next page starts right after it no matter how
+many items were added or removed in the meantime. Pages are serialized item
+by item into a streamed JSON body.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from http_cache import serialize_json
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque, URL-safe cursor for a sort key"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Sort key encoded in a cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+def _page_chunks(fields: Dict[str, Any], items_key: str, items: Iterable[Any],
+                 next_cursor: Optional[str]) -> Iterator[bytes]:
+    yield b"{"
+    for name, value in fields.items():
+        yield serialize_json(name) + b":" + serialize_json(value) + b","
+    yield serialize_json(items_key) + b":["
+    for i, item in enumerate(items):
+        yield (b"," if i else b"") + serialize_json(item)
+    yield b'],"next_cursor":' + serialize_json(next_cursor) + b"}"
+
+def stream_page(fields: Dict[str, Any], items_key: str, items: Iterable[Any], next_cursor: Optional[str],
+                headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    JSON response {**fields, items_key: [...], "next_cursor": ...} written
+    one item at a time, so no full body is built in memory
+    """
+    return StreamingResponse(
+        _page_chunks(fields, items_key, items, next_cursor),
+        media_type="application/json",
+        headers=headers
+    )
@@ -0,0 +1,124 @@
+"""
+Post-Response Work
+Runs work that does not shape the reply (interaction analytics, n8n
+dispatch, session context updates) after /chat has answered. Tasks go
+through a bounded queue to a small pool of worker threads. When the queue
+is full, submit waits up to submit_timeout and then sheds the task, so a
+slow analytics stage can never hold up chat replies or grow memory without
+bound.
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from config import Config
+from streaming_stats import StreamingMetric
+
+class PostResponseWorker:
+    """Bounded background queue for work that runs after the response is sent"""
+
+    def __init__(
+        self,
+        workers: int = Config.POST_RESPONSE_WORKERS,
+        queue_size: int = Config.POST_RESPONSE_QUEUE_SIZE,
+        submit_timeout: float = Config.POST_RESPONSE_SUBMIT_TIMEOUT_SECONDS
+    ):
+        self.workers = max(workers, 1)
+        self.queue_size = queue_size
+        self.submit_timeout = submit_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "shed": 0}
+        # Time each task ran in the background, i.e. latency kept off the request path
+        self.task_seconds = StreamingMetric()
+        self.queue_wait_seconds = StreamingMetric()
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> bool:
+        """Queue func(*args, **kwargs); returns False if the task was shed"""
+        self._ensure_started()
+        # The task runs in a copy of the caller's context, so it continues the caller's trace
+        item = (time.perf_counter(), contextvars.copy_context(), func, args, kwargs)
+        try:
+            if self.submit_timeout > 0:
+                self._queue.put(item, timeout=self.submit_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["shed"] += 1
+            logging.warning(f"Post-response queue full; shed {getattr(func, '__name__', func)}")
+            return False
+        self.stats["submitted"] += 1
+        return True
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f"post-response-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            queued_at, context, func, args, kwargs = item
+            started = time.perf_counter()
+            self.queue_wait_seconds.add(started - queued_at)
+            try:
+                context.run(func, *args, **kwargs)
+                self.stats["completed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logging.error(f"Post-response task {getattr(func, '__name__', func)} failed: {e}")
+            finally:
+                self.task_seconds.add(time.perf_counter() - started)
+                self._queue.task_done()
+
+    def start(self):
+        """Start the worker threads (idempotent; submit also starts them)"""
+        self._ensure_started()
+
+    def flush(self, timeout: float = 10) -> bool:
+        """Wait until every queued task has run; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 10):
+        """Run what is queued (up to timeout), then stop the workers"""
+        self.flush(timeout)
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None, timeout=timeout)
+        for thread in threads:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        task_seconds = self.task_seconds.snapshot()
+        return {
+            **self.stats,
+            "workers": len([thread for thread in self._threads if thread.is_alive()]),
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "latency_saved_seconds": {
+                "total": task_seconds["mean"] * task_seconds["count"],
+                "per_request": {key: task_seconds[key] for key in ("mean", "p50", "p95", "p99")},
+                "windows": task_seconds["windows"]
+            },
+            "queue_wait_seconds": {key: value for key, value in self.queue_wait_seconds.snapshot().items() if key != "windows"}
+        }
+
+# Shared post-response worker
+post_response_worker = PostResponseWorker()
@@ -1,4 +1,5 @@
 # Explicitly disable LangSmith to prevent 403 errors
+import contextvars
 import os
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
 os.environ["LANGCHAIN_API_KEY"] = ""
@@ -6,33 +7,58 @@ os.environ["LANGCHAIN_API_KEY"] = ""
 import time
 import json
 import re
-import requests
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.memory import ConversationBufferWindowMemory
-from langchain.chains import ConversationalRetrievalChain
-from langchain.schema import BaseMessage
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 # Removed LangSmith imports for compatibility
 from knowledge_base import knowledge_base
 from config import Config
 from models import SearchResult, ChatResponse
+from response_formatter import format_response
+from keyword_automaton import keyword_automaton, message_features
+from session_store import session_store
+from http_clients import http_clients
+from metrics import timed
+from services import LazyService
+from tracing import tracer
+
+if TYPE_CHECKING:
+    # langchain is imported when the RAG system is first built, not with this module
+    from langchain.memory import ConversationBufferWindowMemory
+    from langchain.schema import BaseMessage
+
+# Keyword masks for intent and topic detection
+_EXPLICIT_CONSULTATION = keyword_automaton.mask("consultation.explicit")
+_GENERAL_CONSULTATION = keyword_automaton.mask("consultation.general")
+_TOPIC_RULES = [
+    (keyword_automaton.mask("topics.pricing"), "pricing"),
+    (keyword_automaton.mask("topics.services"), "services"),
+    (keyword_automaton.mask("topics.demo"), "demo"),
+    (keyword_automaton.mask("topics.implementation"), "implementation"),
+]
 
 class RAGSystem:
     def __init__(self):
+        from langchain_openai import ChatOpenAI
+        from langchain.prompts import ChatPromptTemplate
+        
         self.llm = ChatOpenAI(
             model=Config.CHAT_MODEL,
             temperature=Config.TEMPERATURE,
             max_tokens=Config.MAX_TOKENS,
-            openai_api_key=Config.OPENAI_API_KEY
+            openai_api_key=Config.OPENAI_API_KEY,
+            openai_api_base=Config.OPENAI_BASE_URL,
+            http_client=http_clients.sync,
+            http_async_client=http_clients.async_client()
         )
         
         # Initialize LangSmith tracing if configured (simplified)
         self.tracer = None  # Disabled for compatibility
         
-        # Initialize memory storage for conversations
-        self.conversation_memories = {}  # session_id -> ConversationBufferWindowMemory
+        # Conversation memories live in the shared, bounded session store
+        self.session_store = session_store
+        
+        # Background threads for knowledge base retrieval in the chat pipeline
+        self._retrieval_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
         
         # Create the system prompt
         self.system_prompt = """
@@ -148,22 +174,29 @@ class RAGSystem:
             ("human", "Context: {context}\n\nUser Question: {question}")
         ])
     
-    def get_or_create_memory(self, session_id: str) -> ConversationBufferWindowMemory:
+    def get_or_create_memory(self, session_id: str) -> "ConversationBufferWindowMemory":
         """Get or create conversation memory for a session"""
-        if session_id not in self.conversation_memories:
-            self.conversation_memories[session_id] = ConversationBufferWindowMemory(
-                k=10,  # Keep last 10 exchanges
-                memory_key="chat_history",
-                return_messages=True
-            )
-        return self.conversation_memories[session_id]
+        return self.session_store.get_memory(session_id, self._new_memory)
+    
+    def _new_memory(self) -> "ConversationBufferWindowMemory":
+        from langchain.memory import ConversationBufferWindowMemory
+        return ConversationBufferWindowMemory(
+            k=10,  # Keep last 10 exchanges
+            memory_key="chat_history",
+            return_messages=True
+        )
     
     def retrieve_relevant_documents(self, query: str, k: int = None) -> List[SearchResult]:
         """Retrieve relevant documents from the knowledge base"""
         if k is None:
             k = Config.TOP_K_RESULTS
         
-        search_results = knowledge_base.search(query, k=k)
+        with tracer.span("rag.retrieve", k=k) as span:
+            search_results = knowledge_base.search(query, k=k)
+            span.set_attributes(
+                results=len(search_results),
+                min_distance=min((result["score"] for result in search_results), default=None)
+            )
         
         return [
             SearchResult(
@@ -197,121 +230,194 @@ class RAGSystem:
         """Generate a response using RAG with conversation memory"""
         start_time = time.time()
         
-        try:
-            # Check if this message contains consultation details
-            consultation_details = self._extract_consultation_details(query)
-            print(f"DEBUG: Consultation details detected: {consultation_details}")
-            
-            if consultation_details:
-                intent = consultation_details.get("intent")
-                explicit = consultation_details.get("explicit", False)
+        with tracer.span("rag.generate_response", context_length=len(context)):
+            try:
+                # Check if this message contains consultation details
+                consultation_details = self._extract_consultation_details(query)
+                print(f"DEBUG: Consultation details detected: {consultation_details}")
                 
-                if intent == "schedule_consultation" and explicit:
-                    print("DEBUG: User explicitly wants to schedule consultation - directing to form...")
-                    
-                    # Generate consultation form direction response
-                    consultation_response = self._generate_consultation_intent_response(explicit=True)
-                    print(f"DEBUG: Generated consultation response: {consultation_response[:100]}...")
-                    
-                    processing_time = time.time() - start_time
-                    
-                    # Return the consultation response
-                    return ChatResponse(
-                        response=consultation_response,
-                        session_id=session_id or "default",
-                        confidence=0.9,  # High confidence for consultation scheduling
-                        processing_time=processing_time
-                    )
-                elif intent == "consultation_mention" and not explicit:
-                    print("DEBUG: User mentioned consultation but not explicitly requesting - providing general response...")
-                    
-                    # Generate general consultation mention response
-                    consultation_response = self._generate_consultation_intent_response(explicit=False)
-                    print(f"DEBUG: Generated consultation response: {consultation_response[:100]}...")
-                    
-                    processing_time = time.time() - start_time
-                    
-                    # Return the consultation response
-                    return ChatResponse(
-                        response=consultation_response,
-                        session_id=session_id or "default",
-                        confidence=0.8,  # Medium confidence for general consultation mention
-                        processing_time=processing_time
-                    )
-            
-            # If not a consultation request, proceed with normal RAG response
-            # Get or create memory for this session
-            memory = self.get_or_create_memory(session_id or "default")
-            
-            # Get conversation history
-            chat_history = memory.chat_memory.messages
-            
-            # Create the prompt with conversation history
-            if chat_history:
-                # Build conversation context
-                history_context = "Previous conversation:\n"
-                for message in chat_history[-6:]:  # Last 6 messages
-                    if hasattr(message, 'content'):
-                        role = "Human" if message.__class__.__name__ == "HumanMessage" else "Assistant"
-                        history_context += f"{role}: {message.content}\n"
+                consultation_response = self._consultation_shortcut(consultation_details, session_id, start_time)
+                if consultation_response:
+                    return consultation_response
                 
-                # Combine with current context
-                full_context = f"{history_context}\nCurrent context: {context}\n\nUser Question: {query}"
-            else:
-                full_context = f"Context: {context}\n\nUser Question: {query}"
-            
-            # Create messages for the LLM
-            messages = [
-                SystemMessage(content=self.system_prompt),
-                HumanMessage(content=full_context)
-            ]
-            
-            # Generate response
+                # If not a consultation request, proceed with normal RAG response
+                memory, history_context = self._prepare_history(session_id)
+                return self._generate_rag_response(query, context, memory, history_context, session_id, start_time)
+                
+            except Exception as e:
+                return self._error_response(e, session_id, start_time)
+    
+    def _consultation_shortcut(
+        self,
+        consultation_details: Optional[Dict[str, Any]],
+        session_id: str,
+        start_time: float
+    ) -> Optional[ChatResponse]:
+        """Return the canned consultation response for consultation intents, if any"""
+        if not consultation_details:
+            return None
+        
+        intent = consultation_details.get("intent")
+        explicit = consultation_details.get("explicit", False)
+        
+        if intent == "schedule_consultation" and explicit:
+            print("DEBUG: User explicitly wants to schedule consultation - directing to form...")
+            confidence = 0.9  # High confidence for consultation scheduling
+        elif intent == "consultation_mention" and not explicit:
+            print("DEBUG: User mentioned consultation but not explicitly requesting - providing general response...")
+            confidence = 0.8  # Medium confidence for general consultation mention
+        else:
+            return None
+        
+        # Generate consultation form direction response
+        consultation_response = self._generate_consultation_intent_response(explicit=explicit)
+        print(f"DEBUG: Generated consultation response: {consultation_response[:100]}...")
+        
+        return ChatResponse(
+            response=consultation_response,
+            session_id=session_id or "default",
+            confidence=confidence,
+            processing_time=time.time() - start_time
+        )
+    
+    def _prepare_history(self, session_id: str):
+        """Get the session memory and the prompt text for recent conversation history"""
+        memory = self.get_or_create_memory(session_id or "default")
+        chat_history = memory.chat_memory.messages
+        
+        if not chat_history:
+            return memory, ""
+        
+        # Build conversation context
+        history_context = "Previous conversation:\n"
+        for message in chat_history[-6:]:  # Last 6 messages
+            if hasattr(message, 'content'):
+                role = "Human" if message.__class__.__name__ == "HumanMessage" else "Assistant"
+                history_context += f"{role}: {message.content}\n"
+        return memory, history_context
+    
+    def _generate_rag_response(
+        self,
+        query: str,
+        context: str,
+        memory: "ConversationBufferWindowMemory",
+        history_context: str,
+        session_id: str,
+        start_time: float
+    ) -> ChatResponse:
+        """Call the LLM with retrieved context and history, then save the exchange to memory"""
+        # Create the prompt with conversation history
+        if history_context:
+            full_context = f"{history_context}\nCurrent context: {context}\n\nUser Question: {query}"
+        else:
+            full_context = f"Context: {context}\n\nUser Question: {query}"
+        
+        # Create messages for the LLM
+        from langchain.schema import HumanMessage, SystemMessage
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            HumanMessage(content=full_context)
+        ]
+        
+        # Generate response
+        with timed("llm"), tracer.span("llm", model=Config.CHAT_MODEL, prompt_chars=len(full_context)) as span:
             response = self.llm.invoke(messages)
-            
-            # Format the response for better readability
-            formatted_response = self._format_response(response.content)
-            
-            # Save to memory
-            memory.chat_memory.add_user_message(query)
-            memory.chat_memory.add_ai_message(formatted_response)
-            
-            processing_time = time.time() - start_time
-            
-            return ChatResponse(
-                response=formatted_response,
-                session_id=session_id or "default",
-                confidence=0.8,  # Could be calculated based on search scores
-                processing_time=processing_time
-            )
-            
-        except Exception as e:
-            processing_time = time.time() - start_time
-            return ChatResponse(
-                response=f"I apologize, but I encountered an error while processing your request: {str(e)}",
-                session_id=session_id or "default",
-                confidence=0.0,
-                processing_time=processing_time
+            usage = getattr(response, "usage_metadata", None) or {}
+            span.set_attributes(
+                input_tokens=usage.get("input_tokens"),
+                output_tokens=usage.get("output_tokens"),
+                total_tokens=usage.get("total_tokens")
             )
+        
+        # Format the response for better readability
+        with timed("format_response"), tracer.span("format_response", raw_chars=len(response.content)):
+            formatted_response = self._format_response(response.content)
+        
+        # Save to memory
+        self.session_store.record_exchange(session_id or "default", memory, query, formatted_response)
+        
+        return ChatResponse(
+            response=formatted_response,
+            session_id=session_id or "default",
+            confidence=0.8,  # Could be calculated based on search scores
+            processing_time=time.time() - start_time
+        )
+    
+    def _error_response(self, error: Exception, session_id: str, start_time: float) -> ChatResponse:
+        """Apologetic response used when generation fails"""
+        return ChatResponse(
+            response=f"I apologize, but I encountered an error while processing your request: {str(error)}",
+            session_id=session_id or "default",
+            confidence=0.0,
+            processing_time=time.time() - start_time
+        )
     
     def chat(self, query: str, session_id: str = None, user_context: Dict[str, Any] = None) -> ChatResponse:
-        """Main chat method that combines retrieval and generation"""
-        # Retrieve relevant documents
-        search_results = self.retrieve_relevant_documents(query)
+        """
+        Main chat method, run as a staged pipeline:
+        1. classify - cheap local intent detection picks the path
+        2. retrieve - knowledge base search, concurrent with history preparation (RAG path only)
+        3. generate - canned consultation response or LLM call
+        """
+        pipeline_start = time.time()
+        stage_timings = {}
         
-        # Format context
-        context = self.format_context(search_results)
+        with tracer.span("rag.chat") as span:
+            # Stage 1: local classification
+            consultation_details = self._extract_consultation_details(query)
+            stage_timings["classify"] = time.time() - pipeline_start
+            print(f"DEBUG: Consultation details detected: {consultation_details}")
+            
+            generate_start = time.time()
+            response = self._consultation_shortcut(consultation_details, session_id, generate_start)
+            
+            if response:
+                # Consultation intents are answered locally, so retrieval is skipped
+                path = "consultation"
+                stage_timings["generate"] = time.time() - generate_start
+            else:
+                path = "rag"
+                
+                # Stage 2: retrieval runs in the background while history is prepared
+                retrieve_start = time.time()
+                retrieval = self._retrieval_executor.submit(
+                    contextvars.copy_context().run, self.retrieve_relevant_documents, query
+                )
+                try:
+                    with tracer.span("rag.history") as history_span:
+                        memory, history_context = self._prepare_history(session_id)
+                        history_span.set_attribute("history_messages", len(memory.chat_memory.messages))
+                    stage_timings["history"] = time.time() - retrieve_start
+                finally:
+                    search_results = retrieval.result()
+                context = self.format_context(search_results)
+                stage_timings["retrieve"] = time.time() - retrieve_start
+                
+                # Stage 3: generation
+                generate_start = time.time()
+                with tracer.span("rag.generate"):
+                    try:
+                        response = self._generate_rag_response(
+                            query, context, memory, history_context, session_id, generate_start
+                        )
+                    except Exception as e:
+                        response = self._error_response(e, session_id, generate_start)
+                stage_timings["generate"] = time.time() - generate_start
+            
+            span.set_attributes(path=path, confidence=response.confidence)
         
-        # Generate response
-        response = self.generate_response(query, context, session_id, user_context)
+        stage_timings["total"] = time.time() - pipeline_start
+        response.pipeline_path = path
+        response.stage_timings = stage_timings
+        print(f"DEBUG: Chat pipeline path={path} timings={stage_timings}")
         
         # Don't include sources in the response
         return response
     
     def get_conversation_summary(self, session_id: str) -> Dict[str, Any]:
         """Get a summary of the conversation for a session"""
-        if session_id in self.conversation_memories:
-            memory = self.conversation_memories[session_id]
+        memory = self.session_store.get_memory(session_id, self._new_memory, create=False)
+        if memory is not None:
             messages = memory.chat_memory.messages
             
             return {
@@ -337,31 +443,24 @@ class RAGSystem:
                 "conversation_history": []
             }
     
-    def _extract_topics(self, messages: List[BaseMessage]) -> List[str]:
+    def _extract_topics(self, messages: List["BaseMessage"]) -> List[str]:
         """Extract topics from conversation messages"""
         topics = []
         for message in messages:
-            content = message.content.lower()
-            if "pricing" in content or "cost" in content:
-                topics.append("pricing")
-            elif "service" in content or "offer" in content:
-                topics.append("services")
-            elif "demo" in content or "consultation" in content:
-                topics.append("demo")
-            elif "implementation" in content or "deploy" in content:
-                topics.append("implementation")
+            features = message_features(message.content)
+            for mask, topic in _TOPIC_RULES:
+                if features & mask:
+                    topics.append(topic)
+                    break
         return list(set(topics))  # Remove duplicates
     
     def clear_conversation_memory(self, session_id: str) -> bool:
         """Clear conversation memory for a session"""
-        if session_id in self.conversation_memories:
-            del self.conversation_memories[session_id]
-            return True
-        return False
+        return self.session_store.clear_memory(session_id)
     
     def get_all_sessions(self) -> List[str]:
         """Get list of all active session IDs"""
-        return list(self.conversation_memories.keys())
+        return self.session_store.memory_session_ids()
     
     def _extract_consultation_details(self, user_message: str) -> Optional[Dict[str, str]]:
         """Extract consultation details from user message"""
@@ -413,7 +512,7 @@ class RAGSystem:
             print(f"DEBUG: Calling API with data: {consultation_data}")
             
             # Call the consultation scheduling API
-            response = requests.post(
+            response = http_clients.sync.post(
                 'http://localhost:8000/consultation/schedule',
                 json=consultation_data,
                 timeout=10
@@ -472,69 +571,21 @@ Please contact us directly at +1 (555) 012-3456 or ask@softtechniques.com to sch
     
     def _format_response(self, response: str) -> str:
         """Format response for better readability and ChatGPT-like structure"""
-        # Remove any markdown formatting
-        response = response.replace("**", "").replace("*", "")
-        
-        # Convert numbered lists to bullet points
-        response = re.sub(r'(\d+)\.\s*', '- ', response)
-        
-        # Handle cases where bullet points might be missing spaces or formatting
-        response = re.sub(r'-\s*([^\s])', r'- \1', response)
-        
-        # Convert any remaining list patterns to bullet points
-        response = re.sub(r'^(\s*)([•·▪▫])\s*', r'\1- ', response, flags=re.MULTILINE)
-        
-        # Ensure each bullet point starts on a new line with proper spacing
-        # First, ensure bullets are properly formatted with space after dash
-        response = re.sub(r'-([^\s])', r'- \1', response)
-        
-        # Ensure each bullet point starts on a new line
-        response = re.sub(r'(?<!\n)\n- ', '\n\n- ', response)
-        response = re.sub(r'^- ', '- ', response)  # Fix first bullet if needed
-        
-        # Ensure proper spacing between paragraphs and sections
-        response = re.sub(r'(?<!\n)\n(?=[A-Z])', '\n\n', response)  # Add space before new paragraphs
-        
-        # Clean up excessive spacing (more than 2 newlines)
-        response = re.sub(r'\n{3,}', '\n\n', response)
-        
-        # Ensure proper spacing around bullet lists
-        response = re.sub(r'(?<!\n)\n- ', '\n\n- ', response)
-        
-        # Add spacing before and after bullet lists
-        response = re.sub(r'(?<!\n)\n- ', r'\n\n- ', response)
-        response = re.sub(r'(- .*?)(?=\n\n[A-Z])', r'\1\n', response)
-        
-        # Final cleanup: ensure consistent spacing
-        response = re.sub(r'\n{3,}', '\n\n', response)
-        
+        # Single pass over the text; see response_formatter for the rules applied
         # Don't automatically add call-to-actions - let the LLM handle this naturally
-        
-        return response.strip()
+        return format_response(response)
     
     def _extract_consultation_details(self, query: str) -> Optional[Dict[str, str]]:
         """Extract consultation details from user query - only show form for explicit consultation requests"""
-        # More specific consultation keywords that indicate user wants to schedule
-        explicit_consultation_phrases = [
-            "schedule a consultation", "book a consultation", "schedule consultation",
-            "book consultation", "want to schedule", "want to book", "need consultation",
-            "get consultation", "have consultation", "set up consultation",
-            "arrange consultation", "plan consultation", "organize consultation"
-        ]
-        
-        # General consultation keywords (less specific)
-        general_keywords = [
-            "consultation", "meeting", "appointment", "call", "demo", "discuss", "talk", "consult"
-        ]
-        
-        query_lower = query.lower()
+        # Keyword lists live in keyword_automaton ("consultation.explicit" / "consultation.general")
+        features = message_features(query)
         
         # Check for explicit consultation scheduling requests
-        if any(phrase in query_lower for phrase in explicit_consultation_phrases):
+        if features & _EXPLICIT_CONSULTATION:
             return {"intent": "schedule_consultation", "explicit": True}
         
         # Check for general consultation mentions (but don't show form automatically)
-        if any(keyword in query_lower for keyword in general_keywords):
+        if features & _GENERAL_CONSULTATION:
             return {"intent": "consultation_mention", "explicit": False}
         
         return None
@@ -574,4 +625,4 @@ Feel free to ask me any questions about our services!"""
         }
 
 # Initialize RAG system
-rag_system = RAGSystem()
+rag_system = LazyService("rag_system", RAGSystem)
@@ -0,0 +1,223 @@
+"""
+Single-pass Response Formatter
+Applies the bullet, numbering and spacing rules used for chatbot answers in one
+left-to-right pass. Text can be fed incrementally, so a token stream can be
+formatted as it arrives.
+"""
+
+import re
+
+# Special tokens; everything between two matches is plain text. The leading
+# lookahead lets the regex engine skip plain text with a fast character scan.
+#   1. numbered list marker ("12.") and the whitespace after it
+#   2-3. dash and the whitespace after it
+#   4-5. bullet glyph and the whitespace after it
+#   6. line break and the whitespace after it
+_TOKEN_RE = re.compile(
+    r"(?=[-\n•·▪▫\d])(?:(\d+\.)\s*|(-)(\s*)|([•·▪▫])(\s*)|(\n\s*))"
+)
+_NEWLINE_RUN_RE = re.compile(r"\n{3,}")
+
+# match.lastindex of each token kind
+_NUMBERED, _DASH, _BULLET, _LINE_BREAK = 1, 3, 5, 6
+
+# Pending states
+_AFTER_DASH = 1    # dash seen, collapsing the whitespace that follows it
+_AFTER_BULLET = 2  # bullet converted, dropping the whitespace that follows it
+_AFTER_PAIR = 3    # "--" pair, a space goes before the next visible character
+
+
+class ResponseFormatter:
+    """
+    Incremental formatter for LLM answers.
+
+    Removes markdown asterisks, turns numbered items and bullet glyphs into
+    dash bullets, normalizes the space after dashes, and separates paragraphs
+    and bullet lists with blank lines. Output is identical to the regex
+    cascade previously used in RAGSystem._format_response.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._tail = ""            # held-back input (digits that may precede a ".")
+        self._ws = ""              # whitespace waiting for the next visible output
+        self._started = False      # leading whitespace is stripped
+        self._bol = True           # a bullet glyph here would start a line
+        self._skip_numbered_ws = False
+        self._state = None
+        self._dash_ws = ""
+        self._bullet_nl = False
+
+    def feed(self, text: str) -> str:
+        """Feed a chunk of text and return the output that is final so far"""
+        text = self._tail + text.replace("*", "")
+        cut = len(text)
+        while cut and text[cut - 1].isdecimal():
+            cut -= 1
+        self._tail = text[cut:]
+        self._consume(text[:cut])
+        return self._drain()
+
+    def finish(self) -> str:
+        """Flush all pending input and return the remaining output"""
+        self._consume(self._tail)
+        self._tail = ""
+        if self._state == _AFTER_DASH:
+            # Trailing dash with nothing after it is kept as-is
+            self._emit("-", self._dash_ws[:1] == " ")
+        self._state = None
+        self._ws = ""
+        return self._drain()
+
+    def format(self, text: str) -> str:
+        """Format a complete response"""
+        return self.feed(text) + self.finish()
+
+    def _drain(self) -> str:
+        output = "".join(self._parts)
+        self._parts = []
+        return output
+
+    def _emit(self, text: str, breaks_line: bool):
+        """Emit visible text, flushing the whitespace that precedes it"""
+        ws = self._ws
+        if ws:
+            if self._started:
+                if "\n" in ws:
+                    if "\n\n\n" in ws:
+                        ws = _NEWLINE_RUN_RE.sub("\n\n", ws)
+                    # A single line break before a bullet or a capitalized
+                    # line becomes a paragraph break
+                    if breaks_line and ws[-1] == "\n" and (len(ws) == 1 or ws[-2] != "\n"):
+                        ws += "\n"
+                self._parts.append(ws)
+            self._ws = ""
+        self._started = True
+        self._parts.append(text)
+
+    def _emit_bullet_dash(self):
+        self._emit("-", True)
+        self._ws = " "
+
+    def _consume(self, text: str):
+        on_plain, on_text, on_space = self._on_plain, self._on_text, self._on_space
+        pos = 0
+        for match in _TOKEN_RE.finditer(text):
+            start, end = match.span()
+            if start > pos:
+                plain = text[pos:start]
+                if plain[0].isspace() or plain[-1].isspace():
+                    on_plain(plain)
+                else:
+                    self._skip_numbered_ws = False
+                    on_text(plain)
+            pos = end
+
+            kind = match.lastindex
+            if kind == _LINE_BREAK:
+                if not self._skip_numbered_ws:
+                    on_space(match.group(kind))
+                continue
+            self._skip_numbered_ws = False
+
+            if kind == _DASH:
+                self._on_dash()
+                if match.end(2) != end:
+                    on_space(match.group(3))
+            elif kind == _BULLET:
+                self._on_bullet(match.group(4))
+                if match.end(4) != end:
+                    on_space(match.group(5))
+            else:
+                # "1." and the whitespace after it become "- "
+                self._on_dash()
+                self._on_space(" ")
+                self._skip_numbered_ws = True
+        if pos < len(text):
+            self._on_plain(text[pos:])
+
+    def _on_plain(self, text: str):
+        """Handle a run of text without line breaks, dashes or bullet glyphs"""
+        if text[0].isspace():
+            stripped = text.lstrip()
+            if not self._skip_numbered_ws:
+                self._on_space(text[:len(text) - len(stripped)])
+            if not stripped:
+                return
+            text = stripped
+        self._skip_numbered_ws = False
+        if text[-1].isspace():
+            core = text.rstrip()
+            self._on_text(core)
+            self._on_space(text[len(core):])
+        else:
+            self._on_text(text)
+
+    def _on_space(self, token: str):
+        state = self._state
+        if state == _AFTER_DASH:
+            self._dash_ws += token
+            return
+        if state == _AFTER_BULLET:
+            self._bullet_nl = token[-1] == "\n"
+            return
+        self._state = None
+        self._ws += token
+        if "\n" in token:
+            self._bol = True
+
+    def _on_text(self, token: str):
+        state = self._state
+        if state == _AFTER_DASH:
+            # Most common case: "- " directly followed by the bullet text
+            self._emit("-", True)
+            self._parts += (" ", token)
+            self._state = None
+            self._bol = False
+            return
+        if state == _AFTER_PAIR:
+            self._ws += " "
+        self._state = None
+        self._emit(token, "A" <= token[0] <= "Z")
+        self._bol = False
+
+    def _on_dash(self):
+        state = self._state
+        if state == _AFTER_DASH:
+            # The second dash of a pair is taken verbatim
+            self._emit_bullet_dash()
+            self._emit("-", False)
+            self._bol = False
+            self._state = _AFTER_PAIR
+            return
+        if state == _AFTER_PAIR:
+            self._ws += " "
+        self._state = _AFTER_DASH
+        self._dash_ws = ""
+
+    def _on_bullet(self, token: str):
+        state = self._state
+        if state == _AFTER_DASH:
+            self._emit_bullet_dash()
+            self._emit(token, False)
+            self._bol = False
+            self._state = None
+            return
+        if state == _AFTER_BULLET:
+            self._bol = self._bullet_nl
+        elif state == _AFTER_PAIR:
+            self._ws += " "
+        self._state = None
+
+        if self._bol:
+            self._emit_bullet_dash()
+            self._state = _AFTER_BULLET
+            self._bullet_nl = False
+        else:
+            self._emit(token, False)
+        self._bol = False
+
+
+def format_response(response: str) -> str:
+    """Format a complete LLM response for display"""
+    return ResponseFormatter().format(response)
@@ -0,0 +1,65 @@
+"""
+Response Formatter Reference
+The regex cascade that RAGSystem._format_response used before the
+single-pass formatter, and a golden corpus of typical LLM answers and
+formatting edge cases. The formatter tests check that both produce the
+same output, and the benchmarks time one against the other.
+"""
+
+import re
+
+def legacy_format_response(response: str) -> str:
+    """Reference copy of the regex cascade formerly in RAGSystem._format_response"""
+    response = response.replace("**", "").replace("*", "")
+    response = re.sub(r'(\d+)\.\s*', '- ', response)
+    response = re.sub(r'-\s*([^\s])', r'- \1', response)
+    response = re.sub(r'^(\s*)([•·▪▫])\s*', r'\1- ', response, flags=re.MULTILINE)
+    response = re.sub(r'-([^\s])', r'- \1', response)
+    response = re.sub(r'(?<!\n)\n- ', '\n\n- ', response)
+    response = re.sub(r'^- ', '- ', response)
+    response = re.sub(r'(?<!\n)\n(?=[A-Z])', '\n\n', response)
+    response = re.sub(r'\n{3,}', '\n\n', response)
+    response = re.sub(r'(?<!\n)\n- ', '\n\n- ', response)
+    response = re.sub(r'(?<!\n)\n- ', r'\n\n- ', response)
+    response = re.sub(r'(- .*?)(?=\n\n[A-Z])', r'\1\n', response)
+    response = re.sub(r'\n{3,}', '\n\n', response)
+    return response.strip()
+
+# Golden corpus of typical LLM answers and known formatting edge cases
+GOLDEN_CORPUS = [
+    "",
+    "   \n\n  ",
+    "Soft Techniques specializes in custom AI solutions.",
+    """Soft Techniques specializes in **custom AI solutions** that transform how businesses operate.
+
+Our core services include:
+1. Custom AI model development tailored to your data
+2. Agentic AI systems for autonomous operations
+3. Seamless AI integration and deployment
+
+Ready to unlock AI's potential for your business?""",
+    """Here is what we offer:
+* **Custom Solutions**: Tailored AI
+* *Expert Team*: Professional service
+• Real-time analytics
+· Predictive maintenance
+▪ Computer vision
+▫ NLP pipelines
+Schedule a consultation!""",
+    "Key benefits:\n-Faster decisions\n-  Lower costs\n- Better service\nContact us today.",
+    "Our pricing starts at $2.500 per month for version 2.0 of the platform.",
+    "Call +1 (555) 012-3456 or email ask@softtechniques.com for cutting-edge, real-time help.",
+    "Steps:\n\n\n\n1.Discovery\n2.   Design\n\n3.\nDelivery\n\n\n\nThat's it.",
+    "A list -- with double dashes --- and triple -x ones",
+    "  •  leading bullet\n\t• tabbed bullet\nnot • a bullet\n•\n•stacked",
+    "Ends with a dash -",
+    "Ends with a number 42",
+    "Ends with a numbered marker 7.",
+    "Windows\r\nline endings\r\n- bullet\r\nDone",
+    """Past projects:
+
+- Retail demand forecasting - cut stockouts 30%
+- Healthcare triage assistant - 24/7 patient intake
+- Logistics route optimizer - saved 12% fuel
+Let's discuss how we can help you.""",
+]
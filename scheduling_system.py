@@ -2,13 +2,17 @@
 Consultation Scheduling System for the Chatbot
 """
 
-import json
-import os
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import uuid
-from consultation_logger import consultation_logger
+from consultation_logger import ConsultationLogger, consultation_logger
+from services import LazyService
+from storage import ConsultationRepository, Database, database
+
+# Requests in these states hold their time slot
+BOOKED_STATUSES = ["confirmed", "pending"]
 
 @dataclass
 class ConsultationRequest:
@@ -26,12 +30,65 @@ class ConsultationRequest:
     created_at: str
     confirmed_at: Optional[str] = None
 
+class BookedSlotIndex:
+    """
+    Booked time slots per day, kept up to date on every create, update and
+    delete. Each slot maps to the number of requests holding it, so removing
+    one of two legacy double bookings keeps the slot booked.
+    """
+    
+    def __init__(self):
+        self._days: Dict[str, Dict[str, int]] = {}
+        self.generation: Optional[int] = None  # Storage generation the index reflects
+    
+    def rebuild(self, holders, generation: int):
+        """Rebuild from (date, time) pairs of every request holding a slot"""
+        self._days = {}
+        for date, time in holders:
+            self.add(date, time)
+        self.generation = generation
+    
+    def add(self, date: str, time: str):
+        day = self._days.setdefault(date, {})
+        day[time] = day.get(time, 0) + 1
+    
+    def remove(self, date: str, time: str):
+        day = self._days.get(date)
+        if not day or time not in day:
+            return
+        day[time] -= 1
+        if not day[time]:
+            del day[time]
+            if not day:
+                del self._days[date]
+    
+    def is_booked(self, date: str, time: str) -> bool:
+        return time in self._days.get(date, ())
+    
+    def booked_times(self, date: str) -> List[str]:
+        return list(self._days.get(date, ()))
+    
+    def booked_days(self) -> Dict[str, List[str]]:
+        return {date: list(times) for date, times in self._days.items()}
+
+def _holds_slot(request: Dict) -> bool:
+    return request["status"] in BOOKED_STATUSES and bool(request["preferred_date"]) and bool(request["preferred_time"])
+
 class ConsultationScheduler:
     """Handles consultation scheduling functionality"""
     
-    def __init__(self, data_file: str = "consultation_requests.json"):
+    def __init__(self, data_file: str = "consultation_requests.json", db: Database = None,
+                 logger: ConsultationLogger = None):
         self.data_file = data_file
-        self.requests = self._load_requests()
+        self.repository = ConsultationRepository(db or database)
+        self.logger = logger or consultation_logger
+        
+        # One-shot import of requests saved by earlier JSON-file versions
+        self.repository.migrate_from_json(data_file)
+        
+        # Booked slots, synced lazily with the database generation
+        self._slots = BookedSlotIndex()
+        self._slots_lock = threading.Lock()
         
         # Available time slots (you can customize these)
         self.available_slots = [
@@ -41,20 +98,24 @@ class ConsultationScheduler:
         # Available days (next 14 days)
         self.available_days = self._generate_available_days()
     
-    def _load_requests(self) -> List[Dict]:
-        """Load existing consultation requests from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+    def _sync_slot_index(self):
+        """Rebuild the slot index if any process changed consultations since it was built"""
+        generation = self.repository.generation()
+        if generation != self._slots.generation:
+            holders = self.repository.slot_holders(BOOKED_STATUSES)
+            self._slots.rebuild(holders, generation)
     
-    def _save_requests(self):
-        """Save consultation requests to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.requests, f, indent=2)
+    def _apply_slot_change(self, generation: int, change):
+        """
+        Apply our own committed write to the slot index. If the index is not at
+        the generation just before this write, another process wrote in between
+        and the index is rebuilt on next use instead.
+        """
+        if self._slots.generation == generation - 1:
+            change()
+            self._slots.generation = generation
+        else:
+            self._slots.generation = None
     
     def _generate_available_days(self) -> List[str]:
         """Generate available days for the next 14 days"""
@@ -71,16 +132,15 @@ class ConsultationScheduler:
     
     def get_available_slots(self) -> Dict[str, List[str]]:
         """Get available consultation slots (excluding booked times)"""
-        # Get all booked time slots
-        booked_slots = self._get_booked_slots()
-        
-        # Filter out booked slots for each day
-        available_slots_by_day = {}
-        for day in self.available_days:
-            day_booked_times = booked_slots.get(day, [])
-            available_times = [time for time in self.available_slots if time not in day_booked_times]
-            if available_times:  # Only include days with available slots
-                available_slots_by_day[day] = available_times
+        with self._slots_lock:
+            self._sync_slot_index()
+            
+            # Filter out booked slots for each day
+            available_slots_by_day = {}
+            for day in self.available_days:
+                available_times = [time for time in self.available_slots if not self._slots.is_booked(day, time)]
+                if available_times:  # Only include days with available slots
+                    available_slots_by_day[day] = available_times
         
         return {
             "available_days": list(available_slots_by_day.keys()),
@@ -91,26 +151,16 @@ class ConsultationScheduler:
     
     def _get_booked_slots(self) -> Dict[str, List[str]]:
         """Get all booked time slots organized by date"""
-        booked_slots = {}
-        
-        for request in self.requests:
-            # Only count confirmed and pending requests as "booked"
-            if request["status"] in ["confirmed", "pending"] and request["preferred_date"] and request["preferred_time"]:
-                date = request["preferred_date"]
-                time = request["preferred_time"]
-                
-                if date not in booked_slots:
-                    booked_slots[date] = []
-                if time not in booked_slots[date]:
-                    booked_slots[date].append(time)
-        
-        return booked_slots
+        # Only confirmed and pending requests count as "booked"
+        with self._slots_lock:
+            self._sync_slot_index()
+            return self._slots.booked_days()
     
     def is_time_slot_available(self, date: str, time: str) -> bool:
         """Check if a specific time slot is available"""
-        booked_slots = self._get_booked_slots()
-        day_booked_times = booked_slots.get(date, [])
-        return time not in day_booked_times
+        with self._slots_lock:
+            self._sync_slot_index()
+            return not self._slots.is_booked(date, time)
     
     def schedule_consultation(self, 
                             name: str, 
@@ -124,14 +174,16 @@ class ConsultationScheduler:
                             user_agent: str = "") -> Dict:
         """Schedule a new consultation"""
         
-        # Check if the time slot is available
+        slot_taken = {
+            "success": False,
+            "message": f"Sorry, the time slot {preferred_time} on {preferred_date} is no longer available. Please select a different time.",
+            "suggestion": "Try refreshing the page to see updated available times."
+        }
+        
+        # Fast rejection from the in-memory index
         if preferred_date and preferred_time:
             if not self.is_time_slot_available(preferred_date, preferred_time):
-                return {
-                    "success": False,
-                    "message": f"Sorry, the time slot {preferred_time} on {preferred_date} is no longer available. Please select a different time.",
-                    "suggestion": "Try refreshing the page to see updated available times."
-                }
+                return slot_taken
         
         # Generate unique ID
         consultation_id = str(uuid.uuid4())[:8]
@@ -151,12 +203,27 @@ class ConsultationScheduler:
             created_at=datetime.now().isoformat()
         )
         
-        # Add to requests
-        self.requests.append(asdict(request))
-        self._save_requests()
+        record = asdict(request)
+        holds_slot = _holds_slot(record)
+        
+        # Reserve-or-fail: the check and the insert share one write
+        # transaction, so concurrent bookings (in any process) cannot both win
+        with self._slots_lock:
+            with self.repository.db.transaction():
+                if holds_slot and self.repository.is_slot_booked(preferred_date, preferred_time, BOOKED_STATUSES):
+                    # Another process booked it after our index was synced
+                    self._slots.generation = None
+                    return slot_taken
+                self.repository.add(record)
+                generation = self.repository.generation()
+            
+            def change():
+                if holds_slot:
+                    self._slots.add(preferred_date, preferred_time)
+            self._apply_slot_change(generation, change)
         
         # Log the consultation action
-        log_result = consultation_logger.log_consultation_action(
+        log_result = self.logger.log_consultation_action(
             action="scheduled",
             consultation_id=consultation_id,
             user_name=name,
@@ -185,64 +252,99 @@ class ConsultationScheduler:
     
     def get_consultation_status(self, consultation_id: str) -> Dict:
         """Get status of a consultation request"""
-        for request in self.requests:
-            if request["id"] == consultation_id:
-                return {
-                    "found": True,
-                    "status": request["status"],
-                    "created_at": request["created_at"],
-                    "confirmed_at": request.get("confirmed_at"),
-                    "details": request
-                }
+        request = self.repository.get(consultation_id)
+        if request:
+            return {
+                "found": True,
+                "status": request["status"],
+                "created_at": request["created_at"],
+                "confirmed_at": request.get("confirmed_at"),
+                "details": request
+            }
         
         return {"found": False, "message": "Consultation request not found"}
     
     def get_all_requests(self) -> List[Dict]:
         """Get all consultation requests (for admin use)"""
-        return self.requests
+        return self.repository.all()
+    
+    def get_requests_page(self, after: int = 0, limit: int = 100) -> List[Tuple[int, Dict]]:
+        """(position, request) pairs after a position, in creation order (for admin use)"""
+        return self.repository.page(after, limit)
     
     def update_consultation_status(self, consultation_id: str, status: str) -> Dict:
         """Update consultation status (for admin use)"""
-        for request in self.requests:
-            if request["id"] == consultation_id:
-                old_status = request["status"]
-                request["status"] = status
-                if status == "confirmed":
-                    request["confirmed_at"] = datetime.now().isoformat()
-                self._save_requests()
-                
-                # Log the status update
-                log_result = consultation_logger.log_consultation_action(
-                    action="updated",
-                    consultation_id=consultation_id,
-                    user_name=request["name"],
-                    user_email=request["email"],
-                    user_phone=request["phone"],
-                    company=request["company"],
-                    preferred_date=request["preferred_date"],
-                    preferred_time=request["preferred_time"],
-                    message=request["message"],
-                    status=status
-                )
+        with self._slots_lock:
+            with self.repository.db.transaction():
+                request = self.repository.get(consultation_id)
+                if request and _holds_slot({**request, "status": status}) and not _holds_slot(request) and \
+                        self.repository.is_slot_booked(request["preferred_date"], request["preferred_time"], BOOKED_STATUSES):
+                    # Reopening a cancelled or completed request: someone else may have booked its slot since
+                    self._slots.generation = None
+                    return {
+                        "success": False,
+                        "conflict": True,
+                        "message": f"The time slot {request['preferred_time']} on {request['preferred_date']} "
+                                   f"has been booked by another request; consultation {consultation_id} stays {request['status']}"
+                    }
+                if request:
+                    confirmed_at = datetime.now().isoformat() if status == "confirmed" else None
+                    self.repository.update_status(consultation_id, status, confirmed_at)
+                    generation = self.repository.generation()
+            
+            if request:
+                updated = {**request, "status": status}
                 
-                return {
-                    "success": True, 
-                    "message": f"Consultation {consultation_id} status updated from {old_status} to {status}",
-                    "logged": log_result["success"]
-                }
+                def change():
+                    if _holds_slot(request):
+                        self._slots.remove(request["preferred_date"], request["preferred_time"])
+                    if _holds_slot(updated):
+                        self._slots.add(updated["preferred_date"], updated["preferred_time"])
+                self._apply_slot_change(generation, change)
+        
+        if request:
+            old_status = request["status"]
+            
+            # Log the status update
+            log_result = self.logger.log_consultation_action(
+                action="updated",
+                consultation_id=consultation_id,
+                user_name=request["name"],
+                user_email=request["email"],
+                user_phone=request["phone"],
+                company=request["company"],
+                preferred_date=request["preferred_date"],
+                preferred_time=request["preferred_time"],
+                message=request["message"],
+                status=status
+            )
+            
+            return {
+                "success": True, 
+                "message": f"Consultation {consultation_id} status updated from {old_status} to {status}",
+                "logged": log_result["success"]
+            }
         
         return {"success": False, "message": "Consultation request not found"}
     
     def delete_consultation(self, consultation_id: str) -> Dict:
         """Delete a consultation request (for admin use)"""
-        original_count = len(self.requests)
-        self.requests = [request for request in self.requests if request["id"] != consultation_id]
-        
-        if len(self.requests) < original_count:
-            self._save_requests()
+        with self._slots_lock:
+            with self.repository.db.transaction():
+                request = self.repository.get(consultation_id)
+                if request:
+                    self.repository.delete(consultation_id)
+                    generation = self.repository.generation()
             
+            if request:
+                def change():
+                    if _holds_slot(request):
+                        self._slots.remove(request["preferred_date"], request["preferred_time"])
+                self._apply_slot_change(generation, change)
+        
+        if request:
             # Log the deletion
-            log_result = consultation_logger.log_consultation_action(
+            log_result = self.logger.log_consultation_action(
                 action="deleted",
                 consultation_id=consultation_id,
                 user_name="Admin",
@@ -259,4 +361,4 @@ class ConsultationScheduler:
             return {"success": False, "message": "Consultation request not found"}
 
 # Initialize the scheduler
-consultation_scheduler = ConsultationScheduler()
+consultation_scheduler = LazyService("consultation_scheduler", ConsultationScheduler)
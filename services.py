@@ -0,0 +1,159 @@
+"""
+Lazy Services
+The heavy singletons (RAG system, knowledge base, scheduler, logger, n8n
+integration) are built on first use instead of at import, so the app can
+answer /health while they load. Each module still exposes its singleton
+under the usual name; the name is bound to a LazyService that builds the
+real object once, then forwards attribute reads and writes to it.
+
+A service runs its warm-up hook (the knowledge base loads its vector
+index) right after it is built. At startup a background thread builds and
+warms every service, retrying failures with backoff. Requests that arrive
+earlier build what they need themselves; the build lock makes them wait
+for one construction instead of starting another. /ready reports progress.
+Without the startup thread, services are built on demand, so ones not yet
+used do not hold /ready back.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Build states
+PENDING = "pending"
+INITIALIZING = "initializing"
+READY = "ready"
+FAILED = "failed"
+
+class LazyService:
+    """Stands in for a singleton until first use, then forwards to it"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], warm_up: Optional[Callable[[Any], Any]] = None,
+                 register: bool = True):
+        # Own attributes carry a _lazy_ prefix so they never shadow the service's
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_warm_up", warm_up)
+        object.__setattr__(self, "_lazy_instance", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+        object.__setattr__(self, "_lazy_status", {
+            "state": PENDING, "warmed": warm_up is None, "init_seconds": None,
+            "warm_up_seconds": None, "warm_up_result": None, "error": None, "warm_up_error": None
+        })
+        if register:
+            _registry.append(self)  # Warmed at startup and reported by /ready
+
+    def _lazy_get(self) -> Any:
+        instance = self._lazy_instance
+        if instance is not None:
+            return instance
+        with self._lazy_lock:
+            if self._lazy_instance is None:
+                status = self._lazy_status
+                status.update(state=INITIALIZING, error=None)
+                started = time.perf_counter()
+                try:
+                    instance = self._lazy_factory()
+                except Exception as e:
+                    status.update(state=FAILED, error=f"{type(e).__name__}: {e}")
+                    raise
+                status["init_seconds"] = round(time.perf_counter() - started, 4)
+                if not status["warmed"]:
+                    self._lazy_run_warm_up(instance)
+                status["state"] = READY
+                object.__setattr__(self, "_lazy_instance", instance)
+            return self._lazy_instance
+
+    def _lazy_run_warm_up(self, instance: Any):
+        # A failed warm-up leaves a usable service; it is recorded and retried by the warm-up thread
+        status = self._lazy_status
+        started = time.perf_counter()
+        try:
+            status["warm_up_result"] = self._lazy_warm_up(instance)
+        except Exception as e:
+            status["warm_up_error"] = f"{type(e).__name__}: {e}"
+            logging.error(f"Warm-up of {self._lazy_name} failed: {e}")
+        else:
+            status.update(warmed=True, warm_up_error=None)
+        status["warm_up_seconds"] = round(time.perf_counter() - started, 4)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names the proxy itself lacks, i.e. the service's
+        if name.startswith("_lazy_"):
+            raise AttributeError(name)
+        return getattr(self._lazy_get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_get(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._lazy_get(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyService {self._lazy_name}: {self._lazy_status['state']}>"
+
+_registry: List[LazyService] = []
+
+def initialized(service: Any) -> bool:
+    """Whether a lazy service has been built (always True for ordinary objects)"""
+    return not isinstance(service, LazyService) or service._lazy_instance is not None
+
+def warm_up_service(service: LazyService):
+    """Build one service, or re-run a warm-up hook that failed earlier"""
+    target = service._lazy_get()
+    status = service._lazy_status
+    if status["warmed"]:
+        return
+    with service._lazy_lock:
+        if not status["warmed"]:
+            service._lazy_run_warm_up(target)
+
+def warm_up(services: Optional[List[LazyService]] = None) -> bool:
+    """Build and warm every registered service in registration order; failures are recorded, not raised.
+    Returns whether every service ended up built and warmed."""
+    done = True
+    for service in list(_registry if services is None else services):
+        try:
+            warm_up_service(service)
+        except Exception as e:
+            logging.error(f"Building {service._lazy_name} failed: {e}")
+        done = done and service._lazy_instance is not None and service._lazy_status["warmed"]
+    return done
+
+_warm_up_thread: Optional[threading.Thread] = None
+_started_at = time.time()
+
+def _warm_up_until_done(services: Optional[List[LazyService]], retry_delay: float, max_retry_delay: float):
+    while not warm_up(services):
+        time.sleep(retry_delay)
+        retry_delay = min(retry_delay * 2, max_retry_delay)
+
+def start_warm_up(retry_delay: float = 1.0, max_retry_delay: float = 60.0) -> threading.Thread:
+    """Warm every service on a background thread, retrying failures with backoff (idempotent)"""
+    global _warm_up_thread
+    if _warm_up_thread is None or not _warm_up_thread.is_alive():
+        _warm_up_thread = threading.Thread(target=_warm_up_until_done, args=(None, retry_delay, max_retry_delay),
+                                           name="service-warmup", daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+def readiness(services: Optional[List[LazyService]] = None, eager: Optional[bool] = None) -> Dict[str, Any]:
+    """Per-service build state. With start-up warm-up (eager) the app is ready once every service is
+    built; otherwise services are built on demand and only a failed build holds readiness back.
+    A failed warm-up hook is reported but does not: the service works, just with a cold first call."""
+    if eager is None:
+        eager = _warm_up_thread is not None
+    statuses = {service._lazy_name: dict(service._lazy_status) for service in (_registry if services is None else services)}
+    if any(status["state"] == FAILED for status in statuses.values()):
+        state = FAILED
+    elif all(status["state"] == READY or (status["state"] == PENDING and not eager) for status in statuses.values()):
+        state = READY
+    else:
+        state = "starting"
+    return {
+        "status": state,
+        "ready": state == READY,
+        "seconds_since_import": round(time.time() - _started_at, 3),
+        "services": statuses
+    }
@@ -0,0 +1,712 @@
+"""
+Session Store
+Bounded stores for chat sessions and their conversation memory. Sessions
+expire after an idle TTL, the least recently used session is evicted when
+the store is full, and each session keeps at most a fixed number of messages.
+
+Two backends share the same interface:
+- SessionStore keeps everything in process (single worker)
+- RedisSessionStore keeps sessions in Redis so several workers can serve
+  the same conversation, with a small in-process read-through cache
+
+Both keep session ids in sorted order and number each session's messages,
+so listings can be paged with stable cursors.
+"""
+
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from tracing import current_span
+
+class BaseSessionStore(ABC):
+    """Interface and background sweeper shared by the session backends"""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_sessions: int,
+        max_messages: int,
+        sweep_interval: float
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.sweep_interval = sweep_interval
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        self._sweeper_lock = threading.Lock()
+        self._evictions = {"ttl": 0, "lru": 0}
+
+    def _new_session(self, session_id: str) -> Dict[str, Any]:
+        return {
+            "id": session_id,
+            "created_at": datetime.now(),
+            "messages": [],
+            "context": {}
+        }
+
+    @abstractmethod
+    def get_session(self, session_id: str, create: bool = True) -> Optional[Dict[str, Any]]:
+        """Get (or create) the session data for a session id"""
+
+    @abstractmethod
+    def add_message(self, session_id: str, message: Dict[str, Any]):
+        """
+        Append a message to a session, keeping only the newest max_messages.
+        The stored message gets a "seq" number, increasing within the session.
+        """
+
+    @abstractmethod
+    def update_context(self, session_id: str, context: Dict[str, Any]):
+        """Merge structured data into the session context"""
+
+    @abstractmethod
+    def get_memory(self, session_id: str, factory: Callable[[], Any], create: bool = True):
+        """Get the conversation memory of a session; factory builds an empty memory"""
+
+    @abstractmethod
+    def record_exchange(self, session_id: str, memory, user_message: str, ai_message: str):
+        """Add a question/answer pair to a session's conversation memory"""
+
+    @abstractmethod
+    def clear_memory(self, session_id: str) -> bool:
+        """Forget the conversation memory of a session but keep its messages"""
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool:
+        """Remove a session and its conversation memory"""
+
+    @abstractmethod
+    def list_sessions(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Live sessions, least recently used first (does not refresh them)"""
+
+    @abstractmethod
+    def memory_session_ids(self) -> List[str]:
+        """Ids of live sessions that have conversation memory"""
+
+    @abstractmethod
+    def count_sessions(self, with_memory: bool = False) -> int:
+        """Number of live sessions; with_memory counts only those that have conversation memory"""
+
+    @abstractmethod
+    def page_sessions(self, after: Optional[str], limit: int, with_memory: bool = False) -> List[Dict[str, Any]]:
+        """
+        Summaries (session_id, created_at, message_count) of up to limit live
+        sessions with ids after a given id, in id order. with_memory keeps
+        only sessions that have conversation memory.
+        """
+
+    @abstractmethod
+    def page_messages(self, session_id: str, after: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Up to limit messages of a session with seq greater than after, or None if the session is gone"""
+
+    @staticmethod
+    def _messages_after(first_seq: int, after: int) -> int:
+        """Position of the first message with seq > after; seqs within a session are contiguous"""
+        return max(after - first_seq + 1, 0)
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Evict every session idle for longer than the TTL"""
+
+    @abstractmethod
+    def get_metrics(self) -> Dict[str, Any]:
+        """Session counts, evictions and an estimate of the memory held"""
+
+    def _sweep_loop(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            try:
+                evicted = self.sweep()
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
+                continue
+            if evicted:
+                print(f"DEBUG: Session sweeper evicted {evicted} idle sessions")
+
+    def start_sweeper(self):
+        """Start the background thread that evicts idle sessions"""
+        with self._sweeper_lock:
+            if self._sweeper and self._sweeper.is_alive():
+                return
+            self._stop_sweeper.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the background sweeper thread"""
+        self._stop_sweeper.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    def _limits(self) -> Dict[str, Any]:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "max_sessions": self.max_sessions,
+            "max_messages_per_session": self.max_messages
+        }
+
+class _SessionEntry:
+    """Session data and conversation memory for one session id"""
+
+    __slots__ = ("session", "memory", "last_access", "next_seq")
+
+    def __init__(self, session: Dict[str, Any], last_access: float):
+        self.session = session
+        self.memory = None
+        self.last_access = last_access
+        self.next_seq = 1
+
+class SessionStore(BaseSessionStore):
+    """In-process LRU/TTL bounded store shared by the API sessions and RAGSystem memories"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = Config.SESSION_TTL_SECONDS,
+        max_sessions: int = Config.MAX_SESSIONS,
+        max_messages: int = Config.MAX_MESSAGES_PER_SESSION,
+        sweep_interval: float = Config.SESSION_SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        super().__init__(ttl_seconds, max_sessions, max_messages, sweep_interval)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._ids: List[str] = []  # Live session ids, sorted, for paging
+        self._lock = threading.RLock()
+
+    def _forget(self, session_id: str):
+        """Drop a session and its id (caller holds the lock)"""
+        del self._entries[session_id]
+        del self._ids[bisect_right(self._ids, session_id) - 1]
+
+    def _lookup(self, session_id: str, create: bool) -> Optional[_SessionEntry]:
+        """Find a live entry, marking it most recently used (caller holds the lock)"""
+        now = self._clock()
+        entry = self._entries.get(session_id)
+
+        if entry is not None and now - entry.last_access > self.ttl_seconds:
+            self._forget(session_id)
+            self._evictions["ttl"] += 1
+            entry = None
+
+        if entry is None:
+            if not create:
+                return None
+            entry = _SessionEntry(self._new_session(session_id), now)
+            self._entries[session_id] = entry
+            insort(self._ids, session_id)
+            while len(self._entries) > self.max_sessions:
+                self._forget(next(iter(self._entries)))
+                self._evictions["lru"] += 1
+        else:
+            entry.last_access = now
+            self._entries.move_to_end(session_id)
+        return entry
+
+    def get_session(self, session_id: str, create: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._lookup(session_id, create)
+            return entry.session if entry else None
+
+    def add_message(self, session_id: str, message: Dict[str, Any]):
+        with self._lock:
+            entry = self._lookup(session_id, create=True)
+            messages = entry.session["messages"]
+            messages.append({**message, "seq": entry.next_seq})
+            entry.next_seq += 1
+            if len(messages) > self.max_messages:
+                del messages[:-self.max_messages]
+
+    def update_context(self, session_id: str, context: Dict[str, Any]):
+        with self._lock:
+            self._lookup(session_id, create=True).session["context"].update(context)
+
+    def get_memory(self, session_id: str, factory: Callable[[], Any], create: bool = True):
+        with self._lock:
+            entry = self._lookup(session_id, create)
+            if entry is None:
+                return None
+            if entry.memory is None:
+                if not create:
+                    return None
+                entry.memory = factory()
+            return entry.memory
+
+    def record_exchange(self, session_id: str, memory, user_message: str, ai_message: str):
+        with self._lock:
+            memory.chat_memory.add_user_message(user_message)
+            memory.chat_memory.add_ai_message(ai_message)
+            messages = memory.chat_memory.messages
+            if len(messages) > self.max_messages:
+                del messages[:-self.max_messages]
+
+    def clear_memory(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._lookup(session_id, create=False)
+            if entry is None or entry.memory is None:
+                return False
+            entry.memory = None
+            return True
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._entries:
+                return False
+            self._forget(session_id)
+            return True
+
+    def list_sessions(self) -> List[Tuple[str, Dict[str, Any]]]:
+        self.sweep()
+        with self._lock:
+            return [(session_id, entry.session) for session_id, entry in self._entries.items()]
+
+    def memory_session_ids(self) -> List[str]:
+        self.sweep()
+        with self._lock:
+            return [session_id for session_id, entry in self._entries.items() if entry.memory is not None]
+
+    def count_sessions(self, with_memory: bool = False) -> int:
+        self.sweep()
+        with self._lock:
+            if not with_memory:
+                return len(self._entries)
+            return sum(1 for entry in self._entries.values() if entry.memory is not None)
+
+    def page_sessions(self, after: Optional[str], limit: int, with_memory: bool = False) -> List[Dict[str, Any]]:
+        self.sweep()
+        with self._lock:
+            page = []
+            for session_id in self._ids[bisect_right(self._ids, after) if after else 0:]:
+                if len(page) >= limit:
+                    break
+                entry = self._entries[session_id]
+                if with_memory and entry.memory is None:
+                    continue
+                page.append({
+                    "session_id": session_id,
+                    "created_at": entry.session["created_at"],
+                    "message_count": len(entry.session["messages"])
+                })
+            return page
+
+    def page_messages(self, session_id: str, after: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._lookup(session_id, create=False)
+            if entry is None:
+                return None
+            messages = entry.session["messages"]
+            if not messages:
+                return []
+            start = self._messages_after(messages[0]["seq"], after)
+            return messages[start:start + limit]
+
+    def sweep(self) -> int:
+        with self._lock:
+            cutoff = self._clock() - self.ttl_seconds
+            expired = []
+            # Entries are kept in access order, so expired ones are at the front
+            for session_id, entry in self._entries.items():
+                if entry.last_access >= cutoff:
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                self._forget(session_id)
+            self._evictions["ttl"] += len(expired)
+            return len(expired)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            message_count = 0
+            memory_message_count = 0
+            approx_bytes = 0
+            for entry in self._entries.values():
+                for message in entry.session["messages"]:
+                    message_count += 1
+                    approx_bytes += sys.getsizeof(message.get("content", ""))
+                if entry.memory is not None:
+                    for message in entry.memory.chat_memory.messages:
+                        memory_message_count += 1
+                        approx_bytes += sys.getsizeof(message.content)
+
+            return {
+                "backend": "memory",
+                "sessions": len(self._entries),
+                "sessions_with_memory": sum(1 for entry in self._entries.values() if entry.memory is not None),
+                "messages": message_count,
+                "memory_messages": memory_message_count,
+                "approx_message_bytes": approx_bytes,
+                "evictions": dict(self._evictions),
+                "limits": self._limits(),
+                "sweeper_running": bool(self._sweeper and self._sweeper.is_alive())
+            }
+
+class RedisSessionStore(BaseSessionStore):
+    """
+    Session store kept in Redis (or anything speaking its protocol).
+
+    Per session the store keeps a JSON metadata string, a list of chat
+    messages and a list of conversation memory messages, all expiring after
+    the idle TTL. A sorted set of session ids scored by last access time
+    drives LRU eviction, and a second sorted set with equal scores keeps the
+    ids in lexical order for paged listings. A counter numbers each session's
+    messages. Reads go through a small in-process
+    cache whose entries live for cache_ttl seconds, which bounds how stale a
+    worker's view of a session written by another worker can be.
+    """
+
+    def __init__(
+        self,
+        client,
+        key_prefix: str = Config.SESSION_KEY_PREFIX,
+        ttl_seconds: float = Config.SESSION_TTL_SECONDS,
+        max_sessions: int = Config.MAX_SESSIONS,
+        max_messages: int = Config.MAX_MESSAGES_PER_SESSION,
+        sweep_interval: float = Config.SESSION_SWEEP_INTERVAL,
+        cache_size: int = Config.SESSION_CACHE_SIZE,
+        cache_ttl: float = Config.SESSION_CACHE_TTL,
+        clock: Callable[[], float] = time.time
+    ):
+        super().__init__(ttl_seconds, max_sessions, max_messages, sweep_interval)
+        self.client = client
+        self.key_prefix = key_prefix
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    # Keys
+
+    def _index_key(self) -> str:
+        return f"{self.key_prefix}:sessions"
+
+    def _ids_key(self) -> str:
+        return f"{self.key_prefix}:session_ids"
+
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}:meta"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}:messages"
+
+    def _memory_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}:memory"
+
+    def _seq_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{session_id}:seq"
+
+    def _session_keys(self, session_id: str) -> List[str]:
+        return [
+            self._meta_key(session_id), self._messages_key(session_id),
+            self._memory_key(session_id), self._seq_key(session_id)
+        ]
+
+    # Read-through cache
+
+    def _cache_get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            cached = self._cache.get(session_id)
+            hit = cached is not None and self._clock() - cached[0] < self.cache_ttl
+            if hit:
+                self._cache.move_to_end(session_id)
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+        span = current_span()
+        if span is not None:
+            span.set_attribute("session_cache_hit", hit)
+        return cached[1] if hit else None
+
+    def _cache_put(self, session_id: str, record: Dict[str, Any]):
+        with self._cache_lock:
+            self._cache[session_id] = (self._clock(), record)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_invalidate(self, session_id: str):
+        with self._cache_lock:
+            self._cache.pop(session_id, None)
+
+    # Serialization
+
+    def _encode_meta(self, session: Dict[str, Any]) -> str:
+        return json.dumps({
+            "id": session["id"],
+            "created_at": session["created_at"].isoformat(),
+            "context": session["context"]
+        }, default=str)
+
+    def _decode_record(self, meta: str, messages: List[str], memory: List[str]) -> Dict[str, Any]:
+        data = json.loads(meta)
+        return {
+            "session": {
+                "id": data["id"],
+                "created_at": datetime.fromisoformat(data["created_at"]),
+                "messages": [json.loads(message) for message in messages],
+                "context": data["context"]
+            },
+            "memory": [json.loads(message) for message in memory]
+        }
+
+    def _build_memory(self, messages: List[Dict[str, str]], factory: Callable[[], Any]):
+        memory = factory()
+        for message in messages:
+            if message["type"] == "human":
+                memory.chat_memory.add_user_message(message["content"])
+            else:
+                memory.chat_memory.add_ai_message(message["content"])
+        return memory
+
+    # Storage
+
+    def _touch(self, pipe, session_id: str):
+        """Refresh the TTL and LRU position of a session inside a pipeline"""
+        pipe.zadd(self._index_key(), {session_id: self._clock()})
+        for key in self._session_keys(session_id):
+            pipe.expire(key, int(self.ttl_seconds))
+
+    def _evict_over_capacity(self):
+        excess = self.client.zcard(self._index_key()) - self.max_sessions
+        if excess <= 0:
+            return
+        evicted = [session_id for session_id, _ in self.client.zpopmin(self._index_key(), excess)]
+        if evicted:
+            self.client.delete(*[key for session_id in evicted for key in self._session_keys(session_id)])
+            self.client.zrem(self._ids_key(), *evicted)
+            for session_id in evicted:
+                self._cache_invalidate(session_id)
+            self._evictions["lru"] += len(evicted)
+
+    def _load(self, session_id: str, create: bool) -> Optional[Dict[str, Any]]:
+        record = self._cache_get(session_id)
+        if record is not None:
+            return record
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self._meta_key(session_id))
+        pipe.lrange(self._messages_key(session_id), 0, -1)
+        pipe.lrange(self._memory_key(session_id), 0, -1)
+        meta, messages, memory = pipe.execute()
+
+        if meta is None:
+            if not create:
+                return None
+            session = self._new_session(session_id)
+            pipe = self.client.pipeline(transaction=True)
+            pipe.set(self._meta_key(session_id), self._encode_meta(session), nx=True)
+            pipe.zadd(self._ids_key(), {session_id: 0})
+            self._touch(pipe, session_id)
+            created = pipe.execute()[0]
+            self._evict_over_capacity()
+            if not created:
+                # Another worker created it first
+                return self._load(session_id, create=False) or {"session": session, "memory": []}
+            record = {"session": session, "memory": []}
+        else:
+            record = self._decode_record(meta, messages, memory)
+            pipe = self.client.pipeline(transaction=True)
+            self._touch(pipe, session_id)
+            pipe.execute()
+
+        self._cache_put(session_id, record)
+        return record
+
+    def get_session(self, session_id: str, create: bool = True) -> Optional[Dict[str, Any]]:
+        record = self._load(session_id, create)
+        return record["session"] if record else None
+
+    def add_message(self, session_id: str, message: Dict[str, Any]):
+        self._load(session_id, create=True)
+        seq = self.client.incr(self._seq_key(session_id))
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(self._messages_key(session_id), json.dumps({**message, "seq": seq}, default=str))
+        pipe.ltrim(self._messages_key(session_id), -self.max_messages, -1)
+        self._touch(pipe, session_id)
+        pipe.execute()
+        self._cache_invalidate(session_id)
+
+    def update_context(self, session_id: str, context: Dict[str, Any]):
+        session = dict(self._load(session_id, create=True)["session"])
+        session["context"] = {**session["context"], **context}
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._meta_key(session_id), self._encode_meta(session))
+        self._touch(pipe, session_id)
+        pipe.execute()
+        self._cache_invalidate(session_id)
+
+    def get_memory(self, session_id: str, factory: Callable[[], Any], create: bool = True):
+        record = self._load(session_id, create)
+        if record is None or (not record["memory"] and not create):
+            return None
+        return self._build_memory(record["memory"], factory)
+
+    def record_exchange(self, session_id: str, memory, user_message: str, ai_message: str):
+        memory.chat_memory.add_user_message(user_message)
+        memory.chat_memory.add_ai_message(ai_message)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(
+            self._memory_key(session_id),
+            json.dumps({"type": "human", "content": user_message}),
+            json.dumps({"type": "ai", "content": ai_message})
+        )
+        pipe.ltrim(self._memory_key(session_id), -self.max_messages, -1)
+        self._touch(pipe, session_id)
+        pipe.execute()
+        self._cache_invalidate(session_id)
+
+    def clear_memory(self, session_id: str) -> bool:
+        if self.client.get(self._meta_key(session_id)) is None:
+            return False
+        cleared = self.client.delete(self._memory_key(session_id)) > 0
+        self._cache_invalidate(session_id)
+        return cleared
+
+    def delete_session(self, session_id: str) -> bool:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*self._session_keys(session_id))
+        pipe.zrem(self._index_key(), session_id)
+        pipe.zrem(self._ids_key(), session_id)
+        deleted, _, _ = pipe.execute()
+        self._cache_invalidate(session_id)
+        return deleted > 0
+
+    def list_sessions(self) -> List[Tuple[str, Dict[str, Any]]]:
+        self.sweep()
+        session_ids = self.client.zrange(self._index_key(), 0, -1)
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.get(self._meta_key(session_id))
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+        results = pipe.execute()
+
+        sessions = []
+        for i, session_id in enumerate(session_ids):
+            meta, messages = results[2 * i], results[2 * i + 1]
+            if meta is not None:
+                sessions.append((session_id, self._decode_record(meta, messages, [])["session"]))
+        return sessions
+
+    def memory_session_ids(self) -> List[str]:
+        self.sweep()
+        session_ids = self.client.zrange(self._index_key(), 0, -1)
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.exists(self._memory_key(session_id))
+        return [session_id for session_id, exists in zip(session_ids, pipe.execute()) if exists]
+
+    def count_sessions(self, with_memory: bool = False) -> int:
+        if with_memory:
+            return len(self.memory_session_ids())
+        self.sweep()
+        return self.client.zcard(self._index_key())
+
+    def page_sessions(self, after: Optional[str], limit: int, with_memory: bool = False) -> List[Dict[str, Any]]:
+        self.sweep()
+        page = []
+        low = f"({after}" if after else "-"
+        while len(page) < limit:
+            session_ids = self.client.zrangebylex(self._ids_key(), low, "+", start=0, num=limit)
+            if not session_ids:
+                break
+            pipe = self.client.pipeline(transaction=False)
+            for session_id in session_ids:
+                pipe.get(self._meta_key(session_id))
+                pipe.llen(self._messages_key(session_id))
+                pipe.exists(self._memory_key(session_id))
+            results = pipe.execute()
+
+            for i, session_id in enumerate(session_ids):
+                meta, message_count, has_memory = results[3 * i:3 * i + 3]
+                if meta is None or (with_memory and not has_memory) or len(page) >= limit:
+                    continue
+                page.append({
+                    "session_id": session_id,
+                    "created_at": datetime.fromisoformat(json.loads(meta)["created_at"]),
+                    "message_count": message_count
+                })
+            low = f"({session_ids[-1]}"
+        return page
+
+    def page_messages(self, session_id: str, after: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.exists(self._meta_key(session_id))
+        pipe.lindex(self._messages_key(session_id), 0)
+        exists, first = pipe.execute()
+        if not exists:
+            return None
+        if first is None:
+            return []
+        start = self._messages_after(json.loads(first).get("seq", 1), after)
+        messages = self.client.lrange(self._messages_key(session_id), start, start + limit - 1)
+        return [json.loads(message) for message in messages]
+
+    def sweep(self) -> int:
+        cutoff = self._clock() - self.ttl_seconds
+        expired = self.client.zrangebyscore(self._index_key(), "-inf", cutoff)
+        if not expired:
+            return 0
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*[key for session_id in expired for key in self._session_keys(session_id)])
+        pipe.zrem(self._index_key(), *expired)
+        pipe.zrem(self._ids_key(), *expired)
+        pipe.execute()
+        for session_id in expired:
+            self._cache_invalidate(session_id)
+        self._evictions["ttl"] += len(expired)
+        return len(expired)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        session_ids = self.client.zrange(self._index_key(), 0, -1)
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.llen(self._messages_key(session_id))
+            pipe.llen(self._memory_key(session_id))
+        lengths = pipe.execute()
+        memory_lengths = lengths[1::2]
+
+        with self._cache_lock:
+            cache = {
+                "entries": len(self._cache),
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "approx_bytes": sum(
+                    sys.getsizeof(message.get("content", ""))
+                    for _, record in self._cache.values()
+                    for message in record["session"]["messages"]
+                )
+            }
+
+        return {
+            "backend": "redis",
+            "sessions": len(session_ids),
+            "sessions_with_memory": sum(1 for length in memory_lengths if length),
+            "messages": sum(lengths[0::2]),
+            "memory_messages": sum(memory_lengths),
+            "evictions": dict(self._evictions),  # Evictions made by this worker
+            "limits": self._limits(),
+            "cache": cache,
+            "sweeper_running": bool(self._sweeper and self._sweeper.is_alive())
+        }
+
+def create_session_store() -> BaseSessionStore:
+    """Build the session store selected by SESSION_BACKEND ("memory" or "redis")"""
+    if Config.SESSION_BACKEND == "redis":
+        import redis
+        client = redis.Redis.from_url(Config.REDIS_URL, decode_responses=True)
+        print(f"Using Redis session store at {Config.REDIS_URL}")
+        return RedisSessionStore(client)
+    return SessionStore()
+
+# Global session store
+session_store = create_session_store()
@@ -10,4 +10,10 @@ mkdir -p uploads
 mkdir -p chroma_db
 
 # Start the application
-uvicorn main:app --host 0.0.0.0 --port $PORT --workers 1
+# More than one worker needs a shared session store (SESSION_BACKEND=redis)
+WORKERS=${WEB_CONCURRENCY:-1}
+if [ "$WORKERS" -gt 1 ] && [ "${SESSION_BACKEND:-memory}" != "redis" ]; then
+    echo "SESSION_BACKEND=redis is required for more than one worker, starting 1 worker"
+    WORKERS=1
+fi
+uvicorn main:app --host 0.0.0.0 --port $PORT --workers $WORKERS
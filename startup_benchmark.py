@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Cold-start report: what `import main` costs, and how long a fresh process
+takes to answer /health, /ready and its first /chat.
+
+1. Import-time budget: runs `python -X importtime -c "import main"` in a
+   clean process and breaks the total down by top-level package and by
+   main's direct imports. Exits non-zero when the total is over
+   --budget-ms, so CI can catch an eager import creeping back in.
+2. Startup benchmark: boots uvicorn (as in production) --runs times
+   against the fake upstreams from load_test.py, with a knowledge base of
+   --documents chunks. For each run it times launch-to-healthy,
+   launch-to-ready (services built, vector index loaded) and the first
+   /chat.
+
+Usage:
+    python startup_benchmark.py                       # import report + 5 cold starts
+    python startup_benchmark.py --imports-only --budget-ms 800
+    python startup_benchmark.py --runs 10 --documents 2000 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from load_test import APP_DIR, AppServer, FakeUpstreams, UpstreamProfile
+
+DEFAULT_BUDGET_MS = 1000
+INSTANT = {name: UpstreamProfile(median_ms=0) for name in ("llm", "embeddings", "n8n", "smtp")}
+
+# Import-time breakdown
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """Rows of `-X importtime` output: name, self and cumulative microseconds, nesting depth"""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip(" ")
+        rows.append({
+            "name": stripped.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(stripped) - 1) // 2
+        })
+    return rows
+
+def import_breakdown(rows: List[Dict[str, Any]], module: str = "main", top: int = 15) -> Dict[str, Any]:
+    """Total for `module`, self time summed per top-level package, and the module's direct imports"""
+    # Children are printed before their parent, so main's subtree is everything since the last top-level row
+    end = next(index for index, row in enumerate(rows) if row["name"] == module and row["depth"] == 0)
+    start = max((index for index in range(end) if rows[index]["depth"] == 0), default=-1) + 1
+    subtree = rows[start:end + 1]
+    total_us = rows[end]["cumulative_us"]
+
+    packages: Dict[str, int] = {}
+    for row in subtree:
+        package = row["name"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self_us"]
+
+    def share(us: int) -> Dict[str, Any]:
+        return {"ms": round(us / 1000, 2), "share": round(us / total_us, 4) if total_us else 0.0}
+
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 2),
+        "modules_imported": len(subtree),
+        "packages": [
+            {"package": package, **share(us)}
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "direct_imports": [
+            {"module": row["name"], **share(row["cumulative_us"])}
+            for row in sorted((row for row in subtree if row["depth"] == 1), key=lambda row: -row["cumulative_us"])[:top]
+        ]
+    }
+
+def measure_imports(environment: Dict[str, str], module: str = "main", top: int = 15) -> Dict[str, Any]:
+    """Import `module` in a fresh interpreter with -X importtime and break the cost down"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, env={**os.environ, **environment}, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    breakdown = import_breakdown(parse_importtime(result.stderr), module, top)
+    breakdown["process_wall_ms"] = round(wall * 1000, 1)  # Interpreter start + import + exit
+    return breakdown
+
+# Cold starts
+
+def seed_documents(environment: Dict[str, str], documents: int):
+    """Fill the scratch knowledge base through the API of a throwaway app process"""
+    if documents <= 0:
+        return
+    app = AppServer(environment).start()
+    try:
+        for offset in range(0, documents, 100):
+            texts = [
+                f"Document {i}: case study {i % 37} on agentic AI automation for workflow {i % 11}."
+                for i in range(offset, min(offset + 100, documents))
+            ]
+            httpx.post(f"{app.url}/knowledge-base/add-text", json={"texts": texts}, timeout=120).raise_for_status()
+    finally:
+        app.stop()
+
+def measure_cold_start(environment: Dict[str, str], timeout: float = 120) -> Dict[str, Any]:
+    """One fresh app process: launch to healthy, to ready, and the first chat"""
+    app = AppServer(environment).start(timeout=timeout, poll_interval=0.02)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            response = httpx.get(f"{app.url}/ready", timeout=5)
+            if response.status_code == 200:
+                ready = time.perf_counter() - app.launched_at
+                break
+            if response.json()["status"] == "failed" or time.monotonic() > deadline:
+                raise RuntimeError(f"App never became ready: {response.text}")
+            time.sleep(0.02)
+        services = response.json()["services"]
+
+        started = time.perf_counter()
+        httpx.post(f"{app.url}/chat", json={"message": "What services do you offer?", "session_id": "startup"},
+                   timeout=60).raise_for_status()
+        first_chat = time.perf_counter() - started
+    finally:
+        app.stop()
+    return {
+        "healthy_ms": round(app.healthy_seconds * 1000, 1),
+        "ready_ms": round(ready * 1000, 1),
+        "first_chat_ms": round(first_chat * 1000, 1),
+        "service_init_ms": {
+            name: round(((status["init_seconds"] or 0) + (status["warm_up_seconds"] or 0)) * 1000, 1)
+            for name, status in services.items()
+        }
+    }
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {"median": round(statistics.median(values), 1), "min": min(values), "max": max(values)}
+
+def run_benchmark(runs: int = 5, documents: int = 200, top: int = 15, imports_only: bool = False) -> Dict[str, Any]:
+    """Import breakdown plus `runs` cold starts, in a scratch directory"""
+    directory = tempfile.mkdtemp(prefix="chatbot-startup-")
+    upstreams = FakeUpstreams(INSTANT).start()
+    environment = upstreams.app_environment(directory)
+    try:
+        report: Dict[str, Any] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "imports": measure_imports(environment, top=top)
+        }
+        if not imports_only:
+            seed_documents(environment, documents)
+            starts = [measure_cold_start(environment) for _ in range(runs)]
+            report["documents"] = documents
+            report["runs"] = starts
+            report["startup"] = {
+                key: _summary([run[key] for run in starts]) for key in ("healthy_ms", "ready_ms", "first_chat_ms")
+            }
+        return report
+    finally:
+        upstreams.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+def print_report(report: Dict[str, Any], budget_ms: float):
+    imports = report["imports"]
+    verdict = "✅ within" if imports["total_ms"] <= budget_ms else "❌ over"
+    print(f"\n📦 import {imports['module']}: {imports['total_ms']:,.1f} ms, {imports['modules_imported']} modules "
+          f"({verdict} the {budget_ms:,.0f} ms budget; process wall {imports['process_wall_ms']:,.0f} ms)")
+    print(f"\n{'Package (self time)':<34} {'ms':>9} {'share':>7}")
+    for row in imports["packages"]:
+        print(f"{row['package']:<34} {row['ms']:>9,.1f} {row['share'] * 100:>6.1f}%")
+    print(f"\n{'Direct import of ' + imports['module'] + ' (cumulative)':<34} {'ms':>9} {'share':>7}")
+    for row in imports["direct_imports"]:
+        print(f"{row['module']:<34} {row['ms']:>9,.1f} {row['share'] * 100:>6.1f}%")
+
+    if "startup" in report:
+        print(f"\n🚀 Cold starts: {len(report['runs'])} runs, {report['documents']} documents in the knowledge base")
+        print(f"{'Milestone':<34} {'median':>9} {'min':>9} {'max':>9}")
+        labels = {"healthy_ms": "launch -> /health 200", "ready_ms": "launch -> /ready 200", "first_chat_ms": "first /chat"}
+        for key, label in labels.items():
+            row = report["startup"][key]
+            print(f"{label:<34} {row['median']:>9,.1f} {row['min']:>9,.1f} {row['max']:>9,.1f}")
+        last = report["runs"][-1]["service_init_ms"]
+        print("   Service build + warm-up (last run): " + ", ".join(f"{name}={ms:,.0f} ms" for name, ms in last.items()))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time budget report and cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to time (default 5)")
+    parser.add_argument("--documents", type=int, default=200, help="Knowledge base chunks to seed (default 200)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Import-time budget for main in ms (default {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--top", type=int, default=15, help="Rows per breakdown table (default 15)")
+    parser.add_argument("--imports-only", action="store_true", help="Only the import-time report")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(runs=args.runs, documents=args.documents, top=args.top, imports_only=args.imports_only)
+    report["budget_ms"] = args.budget_ms
+    print_report(report, args.budget_ms)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+    return 0 if report["imports"]["total_ms"] <= args.budget_ms else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
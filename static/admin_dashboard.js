@@ -8,6 +8,24 @@ document.addEventListener('DOMContentLoaded', function() {
     loadConsultations();
 });
 
+// Fetch every page of a paginated list endpoint, following next_cursor
+async function fetchAllPages(url, itemsKey) {
+    const items = [];
+    let cursor = null;
+    do {
+        const separator = url.includes('?') ? '&' : '?';
+        const pageUrl = cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url;
+        const response = await fetch(pageUrl);
+        if (!response.ok) {
+            throw new Error(`Request failed: ${response.status}`);
+        }
+        const data = await response.json();
+        items.push(...(data[itemsKey] || []));
+        cursor = data.next_cursor;
+    } while (cursor);
+    return items;
+}
+
 // Load statistics
 async function loadStats() {
     try {
@@ -159,17 +177,11 @@ function displayTeamMembers(members) {
 // Load consultations
 async function loadConsultations() {
     try {
-        const response = await fetch(`${API_BASE}/consultation/all`);
-        const data = await response.json();
+        const requests = await fetchAllPages(`${API_BASE}/consultation/all`, 'requests');
         
-        console.log('Consultations response:', data); // Debug log
+        console.log('Consultations loaded:', requests.length); // Debug log
         
-        if (data.status === 'success') {
-            displayConsultations(data.requests);
-        } else {
-            console.error('Consultations API returned error:', data);
-            document.getElementById('consultationsTable').innerHTML = '<div class="error">Error loading consultations</div>';
-        }
+        displayConsultations(requests);
     } catch (error) {
         console.error('Error loading consultations:', error);
         document.getElementById('consultationsTable').innerHTML = '<div class="error">Error loading consultations</div>';
@@ -483,25 +495,20 @@ async function deleteAllData() {
 
         // Step 1: Delete all consultation requests
         try {
-            const consultationsResponse = await fetch(`${API_BASE}/consultation/all`);
-            if (consultationsResponse.ok) {
-                const consultationsData = await consultationsResponse.json();
-                if (consultationsData.status === 'success' && consultationsData.requests) {
-                    totalItems += consultationsData.requests.length;
-                    
-                    // Delete each consultation individually
-                    for (const consultation of consultationsData.requests) {
-                        try {
-                            const deleteResponse = await fetch(`${API_BASE}/consultation/delete/${consultation.id}`, {
-                                method: 'DELETE'
-                            });
-                            if (deleteResponse.ok) {
-                                deletedCount++;
-                            }
-                        } catch (err) {
-                            console.log('Could not delete consultation:', consultation.id);
-                        }
+            const consultations = await fetchAllPages(`${API_BASE}/consultation/all`, 'requests');
+            totalItems += consultations.length;
+            
+            // Delete each consultation individually
+            for (const consultation of consultations) {
+                try {
+                    const deleteResponse = await fetch(`${API_BASE}/consultation/delete/${consultation.id}`, {
+                        method: 'DELETE'
+                    });
+                    if (deleteResponse.ok) {
+                        deletedCount++;
                     }
+                } catch (err) {
+                    console.log('Could not delete consultation:', consultation.id);
                 }
             }
         } catch (err) {
@@ -521,14 +528,9 @@ async function deleteAllData() {
             
             // Alternative: Try to clear logs by getting recent logs and clearing them
             try {
-                const recentLogsResponse = await fetch(`${API_BASE}/admin/logs/recent?hours=8760`); // 1 year
-                if (recentLogsResponse.ok) {
-                    const logsData = await recentLogsResponse.json();
-                    if (logsData.status === 'success' && logsData.logs) {
-                        totalItems += logsData.logs.length;
-                        // Note: We can't delete individual logs, but we've attempted to clear them
-                    }
-                }
+                const logs = await fetchAllPages(`${API_BASE}/admin/logs/recent?hours=8760`, 'logs'); // 1 year
+                totalItems += logs.length;
+                // Note: We can't delete individual logs, but we've attempted to clear them
             } catch (altErr) {
                 console.log('Alternative log clearing failed:', altErr);
             }
@@ -563,24 +565,19 @@ async function deleteAllData() {
 
         // Step 4: Clear all chat sessions
         try {
-            const sessionsResponse = await fetch(`${API_BASE}/sessions`);
-            if (sessionsResponse.ok) {
-                const sessionsData = await sessionsResponse.json();
-                if (sessionsData.sessions) {
-                    totalItems += sessionsData.sessions.length;
-                    
-                    for (const session of sessionsData.sessions) {
-                        try {
-                            const deleteSessionResponse = await fetch(`${API_BASE}/sessions/${session.session_id}`, {
-                                method: 'DELETE'
-                            });
-                            if (deleteSessionResponse.ok) {
-                                deletedCount++;
-                            }
-                        } catch (err) {
-                            console.log('Could not delete session:', session.session_id);
-                        }
+            const sessions = await fetchAllPages(`${API_BASE}/sessions`, 'sessions');
+            totalItems += sessions.length;
+            
+            for (const session of sessions) {
+                try {
+                    const deleteSessionResponse = await fetch(`${API_BASE}/sessions/${session.session_id}`, {
+                        method: 'DELETE'
+                    });
+                    if (deleteSessionResponse.ok) {
+                        deletedCount++;
                     }
+                } catch (err) {
+                    console.log('Could not delete session:', session.session_id);
                 }
             }
         } catch (err) {
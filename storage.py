@@ -0,0 +1,423 @@
+"""
+SQLite Storage Layer
+Repositories for consultation requests, team members and the outgoing
+notification queue, backed by one SQLite database in WAL mode so several worker processes can
+read and write safely. Existing JSON files are imported once on first use.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from metrics import timed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS consultations (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    preferred_date TEXT NOT NULL DEFAULT '',
+    preferred_time TEXT NOT NULL DEFAULT '',
+    timezone TEXT NOT NULL DEFAULT 'EST',
+    message TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    confirmed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_consultations_slot ON consultations (preferred_date, preferred_time);
+CREATE INDEX IF NOT EXISTS idx_consultations_status ON consultations (status);
+
+CREATE TABLE IF NOT EXISTS team_members (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL,
+    phone TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_team_members_email ON team_members (email);
+
+-- Bumped inside every write transaction, so any process can tell whether
+-- a table changed since it last looked
+CREATE TABLE IF NOT EXISTS generations (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+-- Durable queue of notification emails; a worker claims due rows with a lease
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox (status, next_attempt_at);
+
+-- Notification events held back to be coalesced into a digest
+CREATE TABLE IF NOT EXISTS notification_digest_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+CONSULTATION_COLUMNS = [
+    "id", "name", "email", "phone", "company", "preferred_date", "preferred_time",
+    "timezone", "message", "status", "created_at", "confirmed_at"
+]
+
+TEAM_MEMBER_COLUMNS = ["name", "email", "role", "phone"]
+
+class Database:
+    """SQLite database in WAL mode with one connection per thread"""
+
+    def __init__(self, path: str = Config.DATABASE_PATH):
+        self.path = path
+        self._local = threading.local()
+        # executescript manages its own transaction; every statement is idempotent
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """Connection for the calling thread"""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit mode; multi-statement writes use transaction()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database write lock up front"""
+        conn = self.connection()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+        with timed("sqlite_write"):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        if sql.startswith(("UPDATE", "INSERT", "DELETE")):
+            # Single-statement writes outside transaction() commit on their own
+            with timed("sqlite_write"):
+                return self.connection().execute(sql, tuple(parameters))
+        return self.connection().execute(sql, tuple(parameters))
+
+    def generation(self, name: str) -> int:
+        """Current generation of a table (0 if it was never written)"""
+        row = self.execute("SELECT value FROM generations WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump_generation(self, name: str) -> int:
+        """Increment a table generation; call inside the write transaction"""
+        conn = self.connection()
+        conn.execute(
+            "INSERT INTO generations (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+        return conn.execute("SELECT value FROM generations WHERE name = ?", (name,)).fetchone()[0]
+
+    def migrate_json(self, name: str, json_file: str, import_rows) -> int:
+        """
+        Import a JSON file once. The migration is recorded by name, so the file
+        is never imported again even if it is later edited or removed.
+        """
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                return 0
+
+            rows = []
+            if os.path.exists(json_file):
+                try:
+                    with open(json_file, 'r') as f:
+                        rows = json.load(f)
+                except Exception as e:
+                    print(f"Error reading {json_file} for migration: {e}")
+                    rows = []
+
+            import_rows(conn, rows)
+            conn.execute("INSERT INTO migrations (name) VALUES (?)", (name,))
+
+        if rows:
+            print(f"Migrated {len(rows)} records from {json_file} to {self.path}")
+        return len(rows)
+
+def _insert(conn: sqlite3.Connection, table: str, columns: List[str], record: Dict[str, Any], or_ignore: bool = False):
+    placeholders = ", ".join("?" for _ in columns)
+    verb = "INSERT OR IGNORE" if or_ignore else "INSERT"
+    conn.execute(
+        f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        [record.get(column) for column in columns]
+    )
+
+class ConsultationRepository:
+    """Consultation requests, in creation order"""
+
+    def __init__(self, database: Database):
+        self.db = database
+        self._select = f"SELECT {', '.join(CONSULTATION_COLUMNS)} FROM consultations"
+
+    def migrate_from_json(self, json_file: str) -> int:
+        def import_rows(conn, rows):
+            for row in rows:
+                _insert(conn, "consultations", CONSULTATION_COLUMNS, {"timezone": "EST", **row}, or_ignore=True)
+        return self.db.migrate_json(f"consultations:{os.path.basename(json_file)}", json_file, import_rows)
+
+    def generation(self) -> int:
+        return self.db.generation("consultations")
+
+    def add(self, request: Dict[str, Any]):
+        with self.db.transaction() as conn:
+            _insert(conn, "consultations", CONSULTATION_COLUMNS, request)
+            self.db.bump_generation("consultations")
+
+    def get(self, consultation_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(f"{self._select} WHERE id = ?", (consultation_id,)).fetchone()
+        return dict(row) if row else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.db.execute(f"{self._select} ORDER BY rowid")]
+
+    def page(self, after: int = 0, limit: int = 100) -> List[Tuple[int, Dict[str, Any]]]:
+        """(rowid, request) pairs after a rowid in creation order, walked on the rowid key"""
+        rows = self.db.execute(
+            f"SELECT rowid, {', '.join(CONSULTATION_COLUMNS)} FROM consultations "
+            f"WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after, limit)
+        )
+        return [(row[0], {column: row[column] for column in CONSULTATION_COLUMNS}) for row in rows]
+
+    def update_status(self, consultation_id: str, status: str, confirmed_at: Optional[str] = None) -> bool:
+        with self.db.transaction() as conn:
+            if confirmed_at:
+                cursor = conn.execute(
+                    "UPDATE consultations SET status = ?, confirmed_at = ? WHERE id = ?",
+                    (status, confirmed_at, consultation_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "UPDATE consultations SET status = ? WHERE id = ?", (status, consultation_id)
+                )
+            if cursor.rowcount:
+                self.db.bump_generation("consultations")
+        return cursor.rowcount > 0
+
+    def delete(self, consultation_id: str) -> bool:
+        with self.db.transaction() as conn:
+            deleted = conn.execute("DELETE FROM consultations WHERE id = ?", (consultation_id,)).rowcount > 0
+            if deleted:
+                self.db.bump_generation("consultations")
+        return deleted
+
+    def slot_holders(self, statuses: List[str]) -> List[sqlite3.Row]:
+        """(preferred_date, preferred_time) of every request holding a slot"""
+        placeholders = ", ".join("?" for _ in statuses)
+        return self.db.execute(
+            f"SELECT preferred_date, preferred_time FROM consultations "
+            f"WHERE status IN ({placeholders}) AND preferred_date != '' AND preferred_time != ''",
+            statuses
+        ).fetchall()
+
+    def is_slot_booked(self, date: str, time: str, statuses: List[str]) -> bool:
+        placeholders = ", ".join("?" for _ in statuses)
+        row = self.db.execute(
+            f"SELECT 1 FROM consultations WHERE preferred_date = ? AND preferred_time = ? "
+            f"AND status IN ({placeholders}) LIMIT 1",
+            [date, time, *statuses]
+        ).fetchone()
+        return row is not None
+
+    def status_counts(self) -> Dict[str, int]:
+        rows = self.db.execute("SELECT status, COUNT(*) FROM consultations GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM consultations").fetchone()[0]
+
+    def created_at_values(self) -> List[str]:
+        return [row[0] for row in self.db.execute("SELECT created_at FROM consultations")]
+
+class TeamMemberRepository:
+    """Team members who receive consultation notifications"""
+
+    def __init__(self, database: Database):
+        self.db = database
+        self._select = f"SELECT {', '.join(TEAM_MEMBER_COLUMNS)} FROM team_members"
+
+    def migrate_from_json(self, json_file: str) -> int:
+        def import_rows(conn, rows):
+            for row in rows:
+                _insert(conn, "team_members", TEAM_MEMBER_COLUMNS, {"phone": "", **row})
+        return self.db.migrate_json(f"team_members:{os.path.basename(json_file)}", json_file, import_rows)
+
+    def generation(self) -> int:
+        return self.db.generation("team_members")
+
+    def add(self, member: Dict[str, Any]):
+        self.add_many([member])
+
+    def add_many(self, members: List[Dict[str, Any]]):
+        with self.db.transaction() as conn:
+            for member in members:
+                _insert(conn, "team_members", TEAM_MEMBER_COLUMNS, member)
+            self.db.bump_generation("team_members")
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.db.execute(f"{self._select} ORDER BY seq")]
+
+    def remove(self, email: str) -> bool:
+        with self.db.transaction() as conn:
+            removed = conn.execute("DELETE FROM team_members WHERE email = ?", (email,)).rowcount > 0
+            if removed:
+                self.db.bump_generation("team_members")
+        return removed
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM team_members").fetchone()[0]
+
+class NotificationOutbox:
+    """
+    Notification emails waiting to be sent. Rows stay 'pending' until sent or
+    out of attempts ('sent' / 'failed'). A worker claims due rows for a lease
+    period, so a row claimed by a worker that died becomes due again.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+
+    def enqueue(self, subject: str, body: str, recipients: List[str], now: float) -> int:
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO notification_outbox (subject, body, recipients, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (subject, body, json.dumps(recipients), now)
+            )
+        return cursor.lastrowid
+
+    def claim_due(self, now: float, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """Pending rows that are due and not claimed, oldest first, claimed until now + lease"""
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, subject, body, recipients, attempts FROM notification_outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? AND claimed_until <= ? ORDER BY id LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE notification_outbox SET claimed_until = ? WHERE id = ?",
+                [(now + lease_seconds, row["id"]) for row in rows]
+            )
+        return [{**dict(row), "recipients": json.loads(row["recipients"])} for row in rows]
+
+    def mark_sent(self, notification_id: int, attempts: int):
+        self.db.execute(
+            "UPDATE notification_outbox SET status = 'sent', attempts = ?, claimed_until = 0, "
+            "sent_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (attempts, notification_id)
+        )
+
+    def schedule_retry(self, notification_id: int, attempts: int, next_attempt_at: float, error: str):
+        self.db.execute(
+            "UPDATE notification_outbox SET attempts = ?, next_attempt_at = ?, claimed_until = 0, "
+            "last_error = ? WHERE id = ?",
+            (attempts, next_attempt_at, error, notification_id)
+        )
+
+    def mark_failed(self, notification_id: int, attempts: int, error: str):
+        self.db.execute(
+            "UPDATE notification_outbox SET status = 'failed', attempts = ?, claimed_until = 0, "
+            "last_error = ? WHERE id = ?",
+            (attempts, error, notification_id)
+        )
+
+    def get(self, notification_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.execute("SELECT * FROM notification_outbox WHERE id = ?", (notification_id,)).fetchone()
+        return {**dict(row), "recipients": json.loads(row["recipients"])} if row else None
+
+    def next_due(self) -> Optional[float]:
+        """Earliest next_attempt_at of a pending row"""
+        return self.db.execute(
+            "SELECT MIN(next_attempt_at) FROM notification_outbox WHERE status = 'pending'"
+        ).fetchone()[0]
+
+    def status_counts(self) -> Dict[str, int]:
+        rows = self.db.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status")
+        return {status: count for status, count in rows}
+
+    # Digest events
+
+    def add_digest_event(self, subject: str, body: str, recipients: List[str], now: float) -> int:
+        with self.db.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO notification_digest_events (subject, body, recipients, created_at) VALUES (?, ?, ?, ?)",
+                (subject, body, json.dumps(recipients), now)
+            )
+        return cursor.lastrowid
+
+    def digest_opened_at(self) -> Optional[float]:
+        """Time of the oldest held-back event (None when nothing is held back)"""
+        return self.db.execute("SELECT MIN(created_at) FROM notification_digest_events").fetchone()[0]
+
+    def digest_event_count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM notification_digest_events").fetchone()[0]
+
+    def flush_digest(self, now: float, compose) -> List[Tuple[int, List[str]]]:
+        """
+        Move every held-back event into the outbox in one transaction: one
+        notification per distinct recipient list, with subject and body from
+        compose(events). Returns (event count, recipients) per notification.
+        """
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, subject, body, recipients, created_at FROM notification_digest_events ORDER BY id"
+            ).fetchall()
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                groups.setdefault(row["recipients"], []).append(dict(row))
+
+            flushed = []
+            for recipients, events in groups.items():
+                subject, body = compose(events)
+                conn.execute(
+                    "INSERT INTO notification_outbox (subject, body, recipients, next_attempt_at) VALUES (?, ?, ?, ?)",
+                    (subject, body, recipients, now)
+                )
+                flushed.append((len(events), json.loads(recipients)))
+            if rows:
+                conn.execute("DELETE FROM notification_digest_events WHERE id <= ?", (rows[-1]["id"],))
+        return flushed
+
+# Shared database
+database = Database()
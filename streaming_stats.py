@@ -0,0 +1,185 @@
+"""
+Streaming Statistics
+Constant-memory aggregates for values recorded once per request (latencies,
+scores): a running mean and variance, a log-bucketed histogram for
+percentiles, and sliding time windows. Memory depends on the value range
+and the window layout, never on how many values were recorded.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Sliding windows reported next to the all-time figures: name -> seconds
+DEFAULT_WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}
+
+class RunningStats:
+    """Count, mean, variance, min and max (Welford's algorithm)"""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "RunningStats"):
+        """Combine another set of values into this one (Chan et al.)"""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+class LogHistogram:
+    """
+    Histogram with logarithmic buckets, like an HDR histogram: every
+    percentile is within `precision` (relative) of the true value.
+    Zero and negative values share one bucket.
+    """
+
+    __slots__ = ("_gamma_log", "buckets", "zeros", "count")
+
+    def __init__(self, precision: float = 0.01):
+        self._gamma_log = math.log((1 + precision) / (1 - precision))
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._gamma_log)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "LogHistogram"):
+        self.count += other.count
+        self.zeros += other.zeros
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0-1), or None when empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+                return 2 * math.exp(index * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return None
+
+class _Window:
+    """Ring of time slots covering the last `seconds`; old slots are reused"""
+
+    __slots__ = ("slot_seconds", "slots")
+
+    def __init__(self, seconds: float, slot_count: int):
+        self.slot_seconds = seconds / slot_count
+        self.slots = [None] * slot_count  # [slot number, RunningStats, LogHistogram]
+
+    def add(self, value: float, now: float, precision: float):
+        number = int(now // self.slot_seconds)
+        position = number % len(self.slots)
+        slot = self.slots[position]
+        if slot is None or slot[0] != number:
+            slot = self.slots[position] = [number, RunningStats(), LogHistogram(precision)]
+        slot[1].add(value)
+        slot[2].add(value)
+
+    def merged(self, now: float, precision: float):
+        oldest = int(now // self.slot_seconds) - len(self.slots) + 1
+        stats, histogram = RunningStats(), LogHistogram(precision)
+        for slot in self.slots:
+            if slot is not None and slot[0] >= oldest:
+                stats.merge(slot[1])
+                histogram.merge(slot[2])
+        return stats, histogram
+
+class StreamingMetric:
+    """All-time and sliding-window summaries of one stream of values"""
+
+    def __init__(
+        self,
+        windows: Dict[str, float] = None,
+        slots_per_window: int = 60,
+        precision: float = 0.01,
+        clock: Callable[[], float] = time.time
+    ):
+        self.precision = precision
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.total = RunningStats()
+        self.histogram = LogHistogram(precision)
+        self.windows = {
+            name: _Window(seconds, slots_per_window)
+            for name, seconds in (DEFAULT_WINDOWS if windows is None else windows).items()
+        }
+
+    def add(self, value: float):
+        now = self._clock()
+        with self._lock:
+            self.total.add(value)
+            self.histogram.add(value)
+            for window in self.windows.values():
+                window.add(value, now, self.precision)
+
+    @property
+    def count(self) -> int:
+        return self.total.count
+
+    @property
+    def mean(self) -> float:
+        return self.total.mean
+
+    @staticmethod
+    def _summary(stats: RunningStats, histogram: LogHistogram) -> Dict[str, Optional[float]]:
+        return {
+            "count": stats.count,
+            "mean": stats.mean,
+            "stddev": stats.stddev,
+            "min": stats.min,
+            "max": stats.max,
+            "p50": histogram.percentile(0.50),
+            "p95": histogram.percentile(0.95),
+            "p99": histogram.percentile(0.99)
+        }
+
+    def snapshot(self) -> Dict[str, object]:
+        now = self._clock()
+        with self._lock:
+            summary = self._summary(self.total, self.histogram)
+            summary["windows"] = {
+                name: self._summary(*window.merged(now, self.precision))
+                for name, window in self.windows.items()
+            }
+        return summary
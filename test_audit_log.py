@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the append-only consultation audit log: rotation into
+compressed segments, the bounded in-memory window, streamed range reads and
+indexed, cursor-paginated queries
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from audit_log import AuditLog, log_key
+from pagination import decode_cursor, encode_cursor
+
+START = datetime(2025, 10, 21, 9, 0, 0)
+
+def _entry(i: int, minutes: int = 1):
+    timestamp = (START + timedelta(minutes=i * minutes)).isoformat(timespec="microseconds")
+    return {"id": f"log_{i}", "action": "scheduled", "status": "pending", "timestamp": timestamp}
+
+def test_size_rotation_and_streaming():
+    """Large logs rotate into gzip segments; ranges stream across them"""
+    print("📜 Testing size-based rotation")
+    with tempfile.TemporaryDirectory() as directory:
+        log = AuditLog(os.path.join(directory, "audit.jsonl"), max_bytes=2000, max_age=timedelta(days=365), window_size=20)
+        for i in range(200):
+            log.append(_entry(i))
+
+        segments = log.segment_paths()
+        assert len(segments) > 5 and all(segment.endswith(".jsonl.gz") for segment in segments)
+        assert os.path.getsize(log.path) <= 2000
+        assert [entry["id"] for entry in log.iter_entries()] == [f"log_{i}" for i in range(200)]
+
+        # Old ranges come from the segments, recent ones from the window
+        start, end = _entry(50)["timestamp"], _entry(59)["timestamp"]
+        assert not log.window_covers(start)
+        assert [entry["id"] for entry in log.range(start, end)] == [f"log_{i}" for i in range(50, 60)]
+        assert log.window_covers(_entry(190)["timestamp"])
+        assert [entry["id"] for entry in log.range(_entry(190)["timestamp"])] == [f"log_{i}" for i in range(190, 200)]
+
+        assert len(log.recent()) == 20
+        reopened = AuditLog(log.path, max_bytes=2000, window_size=20)
+        assert reopened.recent() == log.recent()
+
+        assert log.clear() == 200
+        assert log.recent() == [] and list(log.iter_entries()) == []
+    print("✅ Rotated and streamed")
+
+def test_age_rotation():
+    """The active file rotates once its first entry is older than max_age"""
+    print("📜 Testing time-based rotation")
+    with tempfile.TemporaryDirectory() as directory:
+        log = AuditLog(os.path.join(directory, "audit.jsonl"), max_bytes=10 ** 9, max_age=timedelta(hours=1))
+        for i in range(5):
+            log.append(_entry(i, minutes=30))
+        # Entries at 0:00, 0:30, 1:00 stay together; 1:30 starts a new file
+        assert len(log.segment_paths()) == 1
+        assert [entry["id"] for entry in log.iter_entries()] == [f"log_{i}" for i in range(5)]
+    print("✅ Rotated by age")
+
+def test_shared_between_processes():
+    """A second writer's appends (another worker) show up in the window"""
+    print("📜 Testing appends from another writer")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audit.jsonl")
+        first = AuditLog(path, max_bytes=1500, window_size=50)
+        second = AuditLog(path, max_bytes=1500, window_size=50)
+        for i in range(40):
+            (first if i % 2 else second).append(_entry(i))
+        expected = [f"log_{i}" for i in range(40)]
+        assert [entry["id"] for entry in first.recent()] == expected
+        assert [entry["id"] for entry in second.recent()] == expected
+        assert [entry["id"] for entry in first.iter_entries()] == expected
+    print("✅ Both writers see every entry")
+
+def test_rotation_by_another_process():
+    """A file rotated and recreated by another writer is re-read even if it reuses the inode number"""
+    print("📜 Testing rotation by another writer")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audit.jsonl")
+        reader = AuditLog(path, max_bytes=10 ** 9, max_age=timedelta(hours=1), window_size=50)
+        writer = AuditLog(path, max_bytes=10 ** 9, max_age=timedelta(hours=1), window_size=50)
+        for i in range(3):
+            writer.append(_entry(i))
+        assert len(reader.recent()) == 3
+        # Far enough ahead to rotate, then longer lines so the new file passes the reader's offset
+        for i in range(100, 104):
+            writer.append({**_entry(i), "message": "x" * 200})
+        assert len(writer.segment_paths()) == 1
+        reader._active_inode = os.stat(path).st_ino  # As if the filesystem reused the inode number
+        assert [entry["id"] for entry in reader.recent()] == [f"log_{i}" for i in (0, 1, 2, 100, 101, 102, 103)]
+    print("✅ Recreated file detected")
+
+def test_indexed_queries_and_cursors():
+    """Queries by time and status page newest first, across the window and the segments"""
+    print("📜 Testing indexed queries with cursors")
+    with tempfile.TemporaryDirectory() as directory:
+        log = AuditLog(os.path.join(directory, "audit.jsonl"), max_bytes=2000, max_age=timedelta(days=365), window_size=30)
+        for i in range(200):
+            log.append({**_entry(i), "status": "confirmed" if i % 3 == 0 else "pending"})
+
+        # Walk every confirmed entry in pages of 7
+        pages, before = [], None
+        while True:
+            page = log.query(status="confirmed", before=before, limit=7)
+            pages.extend(entry["id"] for entry in page)
+            if len(page) < 7:
+                break
+            before = tuple(decode_cursor(encode_cursor(list(log_key(page[-1])))))
+        assert pages == [f"log_{i}" for i in range(199, -1, -1) if i % 3 == 0]
+
+        # Time range with a page boundary inside the range
+        start, end = _entry(100)["timestamp"], _entry(180)["timestamp"]
+        first = log.query(start, end, limit=50)
+        rest = log.query(start, end, before=log_key(first[-1]))
+        assert [entry["id"] for entry in first + rest] == [f"log_{i}" for i in range(180, 99, -1)]
+
+        assert log.query(_entry(500)["timestamp"]) == []
+        assert len(log.query(limit=5)) == 5
+
+        # Counts cover the window and the segments, like an unlimited query
+        assert log.count() == 200 and log.count(status="confirmed") == 67
+        assert log.count(start, end) == 81 and log.count(start, end, "pending") == len(log.query(start, end, "pending"))
+        assert log.count(_entry(190)["timestamp"]) == 10  # Inside the window
+        assert log.count(_entry(500)["timestamp"]) == 0
+    print("✅ Pages are complete and ordered")
+
+if __name__ == "__main__":
+    test_size_rotation_and_streaming()
+    test_age_rotation()
+    test_shared_between_processes()
+    test_rotation_by_another_process()
+    test_indexed_queries_and_cursors()
+    print("\n📜 Audit log tests completed!")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the vectorized batch analytics job gives the same
+scores as the per-row LocalDataProcessor rules, loads both history formats
+and writes rollups
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import pandas as pd
+
+from batch_analytics import (build_rollups, load_interactions, normalize, per_row_scores,
+                             score_interactions, verify, write_rollups)
+from keyword_automaton import KEYWORD_GROUPS
+
+def _history(count: int, seed: int = 3) -> pd.DataFrame:
+    """Synthetic interactions that hit every keyword group and every threshold"""
+    rng = random.Random(seed)
+    words = [word for group in KEYWORD_GROUPS.values() for word in group] + ["the", "our", "team", "Explain", "AI"]
+    rows = []
+    for i in range(count):
+        query = " ".join(rng.choice(words) for _ in range(rng.randint(0, 18)))
+        if rng.random() < 0.3:
+            query += "?"
+        rows.append({
+            "session_id": f"s{i % 97}",
+            "timestamp": f"2025-10-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+            "query": query + f" #{i}",
+            "response": "Soft Techniques builds custom AI solutions.",
+            "confidence": rng.choice([0.0, 0.6, 0.8, rng.random()]),
+            "processing_time": rng.random() * 3,
+            "source_count": rng.randint(0, 4)
+        })
+    return normalize(pd.DataFrame(rows))
+
+def test_matches_per_row_rules():
+    """Every vectorized column equals the per-row result, floats included"""
+    print("📊 Testing vectorized scores against per-row rules")
+    df = _history(3000)
+    scored = score_interactions(df)
+    expected = per_row_scores(df)
+    for column in expected.columns:
+        mismatched = (expected[column].to_numpy() != scored[column].to_numpy()).sum()
+        assert mismatched == 0, f"{column}: {mismatched} rows differ"
+    assert set(scored["query_type"]) >= {"definition", "how_to", "pricing", "general"}
+    assert set(scored["conversion_potential"]) == {"unknown", "high", "medium", "low"}
+    assert verify(df, scored, sample=200) == []
+    print("✅ All columns match")
+
+def test_control_characters():
+    """Queries with NUL and other control characters keep their own scores"""
+    print("📊 Testing queries with control characters")
+    df = _history(400, seed=11)
+    prefixes = ["\x00", "\x00\x00", "\x01", "\x1f", "\t", "\x7f", ""]
+    df["query"] = [prefixes[i % len(prefixes)] + query for i, query in enumerate(df["query"])]
+    df.loc[df.index[:3], "query"] = ["\x00pricing cost", "\x00what is AI", "\x00"]
+    scored = score_interactions(df)
+    expected = per_row_scores(df)
+    for column in expected.columns:
+        mismatched = (expected[column].to_numpy() != scored[column].to_numpy()).sum()
+        assert mismatched == 0, f"{column}: {mismatched} rows differ"
+    assert verify(df, scored) == []
+    print("✅ Control characters handled")
+
+def test_faster_than_per_row():
+    """The vectorized job is much faster than scoring one interaction at a time"""
+    print("📊 Testing speed")
+    df = _history(20000, seed=5)
+    started = time.perf_counter()
+    score_interactions(df)
+    vectorized = time.perf_counter() - started
+
+    sample = df.iloc[:2000]
+    started = time.perf_counter()
+    per_row_scores(sample)
+    per_row = (time.perf_counter() - started) * len(df) / len(sample)
+    print(f"   vectorized {vectorized:.3f}s vs per-row {per_row:.3f}s for {len(df)} rows ({per_row / vectorized:.0f}x)")
+    assert per_row / vectorized > 3
+    print("✅ Vectorized scoring is faster")
+
+def test_load_and_rollups():
+    """Flat CSV and n8n payload JSONL load into one frame; rollups are written"""
+    print("📊 Testing loading and rollups")
+    with tempfile.TemporaryDirectory() as directory:
+        payloads = os.path.join(directory, "payloads.jsonl")
+        with open(payloads, "w", encoding="utf-8") as f:
+            for i in range(3):
+                f.write(json.dumps({
+                    "input": {"query": "Send me a price quote", "session_id": "a", "timestamp": f"2025-10-21T09:0{i}:00"},
+                    "rag_response": {"response": "It depends.", "sources": [{"source": "kb"}], "confidence": 0.9, "processing_time": 1.0},
+                    "metadata": {}
+                }) + "\n")
+        flat = os.path.join(directory, "flat.csv")
+        pd.DataFrame([{"session_id": "b", "timestamp": "2025-10-22T10:00:00", "query": "What is agentic AI",
+                       "response": "Agents.", "confidence": None, "processing_time": 2.0, "source_count": 0}]).to_csv(flat, index=False)
+
+        df = load_interactions([payloads, flat])
+        assert len(df) == 4 and df["source_count"].tolist() == [1, 1, 1, 0]
+        scored = score_interactions(df)
+        assert scored["query_type"].tolist() == ["pricing"] * 3 + ["definition"]
+        assert scored["conversion_potential"].tolist()[-1] == "unknown"
+
+        rollups = build_rollups(scored)
+        assert rollups["daily"]["interactions"].tolist() == [3, 1]
+        assert rollups["daily_query_type"].set_index("date").loc["2025-10-21", "pricing"] == 3
+
+        written = write_rollups(scored, rollups, os.path.join(directory, "out"))
+        with open(written[-1], encoding="utf-8") as f:
+            summary = json.load(f)
+        assert summary["interactions"] == 4 and summary["query_type_distribution"] == {"pricing": 3, "definition": 1}
+    print("✅ Rollups written")
+
+if __name__ == "__main__":
+    test_matches_per_row_rules()
+    test_control_characters()
+    test_faster_than_per_row()
+    test_load_and_rollups()
+    print("\n📊 Batch analytics tests completed!")
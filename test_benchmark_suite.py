@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the benchmark suite runs end to end at tiny sizes,
+records every benchmark, and compares runs through the JSON history file
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import benchmark_suite
+from benchmark_suite import FakeEmbeddings, compare, parse_count, run_suite, save_run
+
+def test_helpers():
+    """Scale parsing and fake embeddings are deterministic"""
+    print("⏱️  Testing helpers")
+    assert [parse_count(text) for text in ("500", "1k", "10K", "1m", "2.5k")] == [500, 1000, 10000, 1000000, 2500]
+    embeddings = FakeEmbeddings(dim=16)
+    vector = embeddings.embed_query("AI agents")
+    assert vector == embeddings.embed_query("AI agents") and len(vector) == 16
+    assert abs(sum(value * value for value in vector) - 1) < 1e-9
+    print("✅ Helpers behave")
+
+def test_suite_and_history():
+    """A tiny run covers every group; a second run is compared with the first"""
+    print("⏱️  Testing a tiny suite run")
+    with tempfile.TemporaryDirectory() as directory:
+        settings = dict(scales=[200], bookings=60, classifier_count=50, memory=True, directory=directory)
+        run = run_suite(**settings)
+        names = {result["benchmark"] for result in run["results"]}
+        assert {
+            "SimpleVectorStore.add_documents", "SimpleVectorStore.similarity_search_with_score",
+            "RAGSystem._format_response", "RAGSystem._extract_consultation_details",
+            "LocalDataProcessor._classify_query_type", "LocalDataProcessor.process_chat_interaction",
+            "ConsultationScheduler.schedule_consultation", "ConsultationScheduler.get_available_slots",
+            "ConsultationLogger.get_logs_by_date_range (10% of history)"
+        } <= names
+        assert all(result["ops_per_sec"] > 0 for result in run["results"])
+        store = next(result for result in run["results"] if result["benchmark"] == "SimpleVectorStore.add_documents")
+        assert store["scale"] == 200 and store["retained_bytes"] > 0
+
+        history = os.path.join(directory, "history.json")
+        assert save_run(history, run) is None
+        second = run_suite(**{**settings, "only": ["formatting"]})
+        previous = save_run(history, second)
+        assert previous["timestamp"] == run["timestamp"]
+        rows = compare(second, previous)
+        assert all(row["change"] is not None for row in rows)
+        assert len(benchmark_suite.load_history(history)["runs"]) == 2
+    print("✅ Suite ran and history compared")
+
+if __name__ == "__main__":
+    test_helpers()
+    test_suite_and_history()
+    print("\n⏱️  Benchmark suite tests completed!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the intent-first chat pipeline only retrieves
+documents when the chosen path needs them
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from langchain.schema import AIMessage
+from rag_system import rag_system
+
+class _FakeLLM:
+    def invoke(self, messages):
+        return AIMessage(content="Soft Techniques builds **custom AI solutions**.")
+
+def _run_pipeline(query: str, session_id: str):
+    """Run RAGSystem.chat with retrieval and the LLM replaced by local fakes"""
+    retrieved = []
+
+    def fake_retrieve(search_query, k=None):
+        retrieved.append(search_query)
+        return []
+
+    original_retrieve, original_llm = rag_system.retrieve_relevant_documents, rag_system.llm
+    rag_system.retrieve_relevant_documents = fake_retrieve
+    rag_system.llm = _FakeLLM()
+    try:
+        return rag_system.chat(query, session_id), retrieved
+    finally:
+        rag_system.retrieve_relevant_documents = original_retrieve
+        rag_system.llm = original_llm
+
+def test_consultation_path_skips_retrieval():
+    """Consultation intents are answered without touching the knowledge base"""
+    print("🧭 Testing consultation path")
+    for query in ["I want to schedule a consultation", "Can we have a meeting?"]:
+        response, retrieved = _run_pipeline(query, "pipeline-consultation")
+        assert response.pipeline_path == "consultation"
+        assert retrieved == []
+        assert "retrieve" not in response.stage_timings
+        assert response.confidence in (0.9, 0.8)
+    print("✅ Retrieval skipped")
+
+def test_rag_path_retrieves_and_generates():
+    """Other questions retrieve documents and call the LLM"""
+    print("🧭 Testing RAG path")
+    response, retrieved = _run_pipeline("What is agentic AI?", "pipeline-rag")
+    assert response.pipeline_path == "rag"
+    assert retrieved == ["What is agentic AI?"]
+    assert response.response == "Soft Techniques builds custom AI solutions."
+    assert set(response.stage_timings) == {"classify", "history", "retrieve", "generate", "total"}
+    print(f"✅ Stage timings: {response.stage_timings}")
+
+if __name__ == "__main__":
+    test_consultation_path_skips_retrieval()
+    test_rag_path_retrieves_and_generates()
+    print("\n🧭 Chat pipeline tests completed!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script to verify ETag revalidation and body memoization in the
+HTTP response cache
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from starlette.requests import Request
+from http_cache import ResponseCache, etag_matches, make_etag
+
+def _request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+def test_not_modified_and_memoization():
+    """Unchanged data is served from memory or answered with 304"""
+    print("🏷️ Testing ETag revalidation")
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"status": "success", "count": len(builds)}
+
+    first = cache.respond(_request(), "admin/team", (1,), build)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and json.loads(first.body) == {"status": "success", "count": 1}
+
+    assert cache.respond(_request(etag), "admin/team", (1,), build).status_code == 304
+    assert cache.respond(_request(f'"other", W/{etag}'), "admin/team", (1,), build).status_code == 304
+    again = cache.respond(_request(), "admin/team", (1,), build)
+    assert again.body == first.body and len(builds) == 1
+
+    changed = cache.respond(_request(etag), "admin/team", (2,), build)
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert json.loads(changed.body)["count"] == 2
+    assert cache.get_stats()["not_modified"] == 2
+    print("✅ 304s and memoized bodies")
+
+def test_etag_helpers():
+    """ETags depend on key and version; If-None-Match parsing"""
+    print("🏷️ Testing ETag helpers")
+    assert make_etag("a", (1,)) == make_etag("a", (1,))
+    assert make_etag("a", (1,)) != make_etag("a", (2,)) != make_etag("b", (1,))
+    assert etag_matches("*", '"x"')
+    assert not etag_matches("", '"x"')
+    assert not etag_matches('"y"', '"x"')
+    print("✅ Helpers correct")
+
+if __name__ == "__main__":
+    test_not_modified_and_memoization()
+    test_etag_helpers()
+    print("\n🏷️ HTTP cache tests completed!")
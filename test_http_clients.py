@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared HTTP clients reuse pooled connections,
+warm them up ahead of the first request and report pool stats
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from http_clients import HTTPClients, origin_of
+
+class _KeepAliveServer:
+    """Local HTTP/1.1 server that counts the TCP connections it accepts"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                server.connections += 1
+                super().setup()
+
+            def _reply(self, body: bytes = b"ok"):
+                server.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_GET = do_HEAD = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def test_sync_pool_reuses_connections():
+    """Warm-up opens the connection and later requests reuse it"""
+    print("🌐 Testing sync connection reuse")
+    server = _KeepAliveServer()
+    clients = HTTPClients(max_connections=4, max_keepalive_connections=4, keepalive_expiry=30, timeout=5, http2=False)
+    try:
+        assert clients.warm_up([server.url + "/webhook/chatbot", server.url, "not a url"]) == [server.url]
+        assert server.connections == 1
+        for _ in range(5):
+            assert clients.sync.get(server.url + "/status").text == "ok"
+        assert server.connections == 1 and server.requests == 6
+
+        stats = clients.get_stats()
+        assert stats["pools"]["sync"] == {"requests": 6, "open_connections": 1, "idle_connections": 1, "http2_connections": 0}
+        assert stats["warmed_origins"] == [server.url]
+    finally:
+        clients.close()
+        server.close()
+    print("✅ One connection served every request")
+
+def test_async_pools_per_loop():
+    """Named async pools reuse connections and close with their loop"""
+    print("🌐 Testing async pools")
+    server = _KeepAliveServer()
+    clients = HTTPClients(max_connections=2, max_keepalive_connections=2, keepalive_expiry=30, timeout=5, http2=False)
+
+    async def run():
+        assert await clients.awarm_up([server.url], name="worker") == [server.url]
+        client = clients.async_client("worker")
+        for _ in range(4):
+            await client.get(server.url)
+        assert clients.get_stats()["pools"]["worker"]["requests"] == 5
+        await clients.aclose("worker")
+
+    try:
+        asyncio.run(run())
+        assert server.connections == 1
+        assert "worker" not in clients.get_stats()["pools"]
+    finally:
+        server.close()
+    print("✅ Async pool reused its connection")
+
+def test_origin_of():
+    """Warm-up targets scheme and host only"""
+    print("🌐 Testing origins")
+    assert origin_of("https://api.openai.com/v1") == "https://api.openai.com"
+    assert origin_of("http://n8n.local:5678/webhook/chatbot?x=1") == "http://n8n.local:5678"
+    assert origin_of(None) is None and origin_of("chatbot") is None
+    print("✅ Origins extracted")
+
+if __name__ == "__main__":
+    test_sync_pool_reuses_connections()
+    test_async_pools_per_loop()
+    test_origin_of()
+    print("\n🌐 HTTP client tests completed!")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the classifiers built on the shared keyword automaton
+return exactly what the original per-classifier keyword scans returned
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from keyword_automaton import KEYWORD_GROUPS, keyword_automaton
+from data_processor import local_data_processor
+from rag_system import rag_system
+
+# Reference copies of the original keyword scans
+
+def legacy_classify_query_type(query: str) -> str:
+    query_lower = query.lower()
+    if any(word in query_lower for word in ["what", "define", "explain", "meaning"]):
+        return "definition"
+    elif any(word in query_lower for word in ["how", "process", "steps", "implement", "deploy"]):
+        return "how_to"
+    elif any(word in query_lower for word in ["why", "benefit", "advantage", "purpose"]):
+        return "benefits"
+    elif any(word in query_lower for word in ["service", "offer", "provide", "company", "capabilities"]):
+        return "services"
+    elif any(word in query_lower for word in ["price", "cost", "fee", "rate", "budget"]):
+        return "pricing"
+    elif any(word in query_lower for word in ["contact", "reach", "speak", "talk"]):
+        return "contact"
+    return "general"
+
+def legacy_analyze_sentiment(query: str) -> str:
+    positive_words = ["good", "great", "excellent", "amazing", "love", "like", "interested"]
+    negative_words = ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"]
+    query_lower = query.lower()
+    positive_count = sum(1 for word in positive_words if word in query_lower)
+    negative_count = sum(1 for word in negative_words if word in query_lower)
+    if positive_count > negative_count:
+        return "positive"
+    elif negative_count > positive_count:
+        return "negative"
+    return "neutral"
+
+def legacy_calculate_complexity(query: str) -> float:
+    score = 0.0
+    if len(query) > 100:
+        score += 0.3
+    elif len(query) > 50:
+        score += 0.2
+    elif len(query) > 20:
+        score += 0.1
+    if "?" in query:
+        score += 0.2
+    technical_terms = ["api", "integration", "implementation", "deployment", "architecture", "framework"]
+    if any(term in query.lower() for term in technical_terms):
+        score += 0.3
+    return min(score, 1.0)
+
+def legacy_categorize_topic(query: str) -> str:
+    query_lower = query.lower()
+    if any(word in query_lower for word in ["agentic", "ai", "artificial intelligence", "machine learning"]):
+        return "agentic_ai"
+    elif any(word in query_lower for word in ["service", "offer", "provide", "capability"]):
+        return "services"
+    elif any(word in query_lower for word in ["implement", "deploy", "setup", "integration"]):
+        return "implementation"
+    elif any(word in query_lower for word in ["cost", "price", "budget", "pricing"]):
+        return "pricing"
+    elif any(word in query_lower for word in ["contact", "reach", "speak", "demo"]):
+        return "contact"
+    return "general"
+
+def legacy_determine_user_intent(query: str) -> str:
+    query_lower = query.lower()
+    if any(word in query_lower for word in ["buy", "purchase", "order", "get"]):
+        return "purchase"
+    elif any(word in query_lower for word in ["learn", "understand", "know", "explain"]):
+        return "learn"
+    elif any(word in query_lower for word in ["help", "support", "problem", "issue"]):
+        return "support"
+    elif any(word in query_lower for word in ["demo", "trial", "test", "try"]):
+        return "demo"
+    return "explore"
+
+def legacy_extract_consultation_details(query: str):
+    explicit_consultation_phrases = [
+        "schedule a consultation", "book a consultation", "schedule consultation",
+        "book consultation", "want to schedule", "want to book", "need consultation",
+        "get consultation", "have consultation", "set up consultation",
+        "arrange consultation", "plan consultation", "organize consultation"
+    ]
+    general_keywords = [
+        "consultation", "meeting", "appointment", "call", "demo", "discuss", "talk", "consult"
+    ]
+    query_lower = query.lower()
+    if any(phrase in query_lower for phrase in explicit_consultation_phrases):
+        return {"intent": "schedule_consultation", "explicit": True}
+    if any(keyword in query_lower for keyword in general_keywords):
+        return {"intent": "consultation_mention", "explicit": False}
+    return None
+
+def legacy_topic(content: str):
+    content = content.lower()
+    if "pricing" in content or "cost" in content:
+        return "pricing"
+    elif "service" in content or "offer" in content:
+        return "services"
+    elif "demo" in content or "consultation" in content:
+        return "demo"
+    elif "implementation" in content or "deploy" in content:
+        return "implementation"
+    return None
+
+SAMPLE_MESSAGES = [
+    "",
+    "What is agentic AI?",
+    "How do you deploy an AI agent into our CRM?",
+    "I'd like to schedule a consultation for next week",
+    "Can we set up consultation? I hate waiting.",
+    "What does it COST and what's your pricing model?",
+    "I love your services, great work! But there is a problem with the API integration.",
+    "Do you offer a free trial or a demo?",
+    "Please explain the architecture of your framework",
+    "I want to buy the enterprise plan",
+    "Let's talk about Machine Learning and Artificial Intelligence",
+    "Our company needs support with deployment steps",
+    "Hello there",
+]
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+def _random_messages(count: int):
+    """Word salad mixing every keyword with filler text"""
+    vocabulary = sorted({word for words in KEYWORD_GROUPS.values() for word in words})
+    filler = ["the", "our", "team", "x", "?", "!", "AI", "Demo", "PRICING", "re", "at"]
+    rng = random.Random(27)
+    for _ in range(count):
+        words = [rng.choice(vocabulary + filler) for _ in range(rng.randint(0, 12))]
+        separator = rng.choice([" ", "", "-", ", "])
+        yield separator.join(words)
+
+def test_data_processor_classifiers():
+    """LocalDataProcessor classifiers match the original keyword scans"""
+    print("🔤 Testing LocalDataProcessor classifiers")
+    for message in SAMPLE_MESSAGES + list(_random_messages(5000)):
+        assert local_data_processor._classify_query_type(message) == legacy_classify_query_type(message), message
+        assert local_data_processor._analyze_sentiment(message) == legacy_analyze_sentiment(message), message
+        assert local_data_processor._calculate_complexity(message) == legacy_calculate_complexity(message), message
+        assert local_data_processor._categorize_topic(message) == legacy_categorize_topic(message), message
+        assert local_data_processor._determine_user_intent(message) == legacy_determine_user_intent(message), message
+    print("✅ Classifications identical")
+
+def test_rag_system_classifiers():
+    """RAGSystem intent and topic detection match the original keyword scans"""
+    print("🔤 Testing RAGSystem intent and topic detection")
+    messages = SAMPLE_MESSAGES + list(_random_messages(5000))
+    for message in messages:
+        assert rag_system._extract_consultation_details(message) == legacy_extract_consultation_details(message), message
+
+    expected_topics = {legacy_topic(message) for message in messages} - {None}
+    topics = rag_system._extract_topics([_Message(message) for message in messages])
+    assert sorted(topics) == sorted(expected_topics)
+    print("✅ Classifications identical")
+
+def test_automaton_matches_substring_search():
+    """The automaton bitset equals a naive substring check for every keyword"""
+    print("🔤 Testing automaton against substring search")
+    for message in SAMPLE_MESSAGES + list(_random_messages(5000)):
+        bits = keyword_automaton.scan(message)
+        expected = [word for word in keyword_automaton.keywords if word in message.lower()]
+        assert keyword_automaton.matched_keywords(bits) == expected, message
+    print("✅ Automaton matches")
+
+if __name__ == "__main__":
+    test_automaton_matches_substring_search()
+    test_data_processor_classifiers()
+    test_rag_system_classifiers()
+    print("\n🔤 Keyword classifier tests completed!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the load harness: the fake OpenAI, n8n and SMTP
+stand-ins speak their protocols, and a short run against the real app
+reports every endpoint in the mix
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import httpx
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from load_test import FakeUpstreams, UpstreamProfile, parse_mix, run_load_test
+from notification_dispatcher import SMTPSession
+
+INSTANT = {name: UpstreamProfile(median_ms=0) for name in ("llm", "embeddings", "n8n", "smtp")}
+
+def test_profiles_and_mix():
+    """Profiles parse partially; latency is lognormal around the median; mixes are validated"""
+    print("🚦 Testing profile and mix parsing")
+    profile = UpstreamProfile.parse("median=200,errors=0.25")
+    assert (profile.median_ms, profile.sigma, profile.error_rate) == (200, 0.5, 0.25)
+    rng = random.Random(1)
+    samples = sorted(profile.sample(rng) for _ in range(2000))
+    median_delay = samples[len(samples) // 2][0]
+    assert 0.18 < median_delay < 0.22
+    assert 0.2 < sum(fail for _, fail in samples) / len(samples) < 0.3
+    assert parse_mix("chat=80,book=5,dashboard=15") == {"chat": 80, "book": 5, "dashboard": 15}
+    for bad in ("chat=0", "search=10"):
+        try:
+            parse_mix(bad)
+            raise AssertionError(f"{bad} accepted")
+        except ValueError:
+            pass
+    print("✅ Profiles and mixes parsed")
+
+def test_fake_upstreams():
+    """The openai client, the n8n payload format and smtplib all work against the stand-ins"""
+    print("🚦 Testing fake upstreams")
+    from openai import OpenAI
+
+    upstreams = FakeUpstreams({**INSTANT, "n8n": UpstreamProfile(median_ms=0, error_rate=1.0)}, embedding_dim=32).start()
+    try:
+        client = OpenAI(api_key="sk-test", base_url=f"{upstreams.api_url}/v1", max_retries=0)
+        first = client.embeddings.create(model="text-embedding-3-small", input=["agents", "pricing"])
+        again = client.embeddings.create(model="text-embedding-3-small", input="agents")
+        assert len(first.data[0].embedding) == 32 and first.data[0].embedding == again.data[0].embedding
+
+        completion = client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "What services do you offer?"}]
+        )
+        assert completion.choices[0].message.content and completion.usage.total_tokens > 0
+
+        response = httpx.post(f"{upstreams.api_url}/n8n/webhook", json={"user_message": "hi"})
+        assert response.status_code == 503  # Every n8n call fails in this profile
+
+        session = SMTPSession(host="127.0.0.1", port=upstreams.smtp_port, username="u", password="p", starttls=False)
+        refused = session.send("bot@example.com", ["team@example.com"], "Subject: Test\r\n\r\nHello")
+        session.close()
+        assert refused == {}
+
+        stats = upstreams.state.stats()
+        assert stats["embeddings"]["calls"] == 2 and stats["llm"]["calls"] == 1
+        assert stats["n8n"] == {"calls": 1, "errors": 1} and stats["smtp"]["calls"] == 1
+    finally:
+        upstreams.stop()
+    print("✅ Stand-ins answer like the real services")
+
+def test_short_run():
+    """A short run against the real app covers chat, booking and dashboard endpoints without errors"""
+    print("🚦 Testing a short load run")
+    instant = {name: "median=0" for name in INSTANT}
+    report = run_load_test(
+        concurrency=4, duration=None, requests=24, warmup=0,
+        mix="chat=2,book=1,dashboard=1", profiles=instant, seed=3
+    )
+    endpoints = report["endpoints"]
+    assert {"POST /chat", "POST /consultation/schedule", "GET /consultation/available-slots",
+            "GET /admin/stats", "GET /consultation/all", "GET /admin/team", "GET /admin/logs/recent"} <= set(endpoints)
+    assert sum(report["scenarios"].values()) == 24
+    assert report["overall"]["errors"] == 0, {name: row["statuses"] for name, row in endpoints.items()}
+    chat = endpoints["POST /chat"]
+    assert chat["requests"] == report["scenarios"]["chat"]
+    assert 0 < chat["p50_ms"] <= chat["p95_ms"] <= chat["p99_ms"] <= chat["max_ms"]
+    assert report["upstreams"]["llm"]["calls"] > 0  # Some questions take a path without the LLM
+    print(f"   {report['overall']['throughput_rps']} req/s over {report['elapsed_seconds']}s")
+    print("✅ Load run reported every endpoint")
+
+if __name__ == "__main__":
+    test_profiles_and_mix()
+    test_fake_upstreams()
+    test_short_run()
+    print("\n🚦 Load harness tests completed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Prometheus metrics: histogram buckets and the
+text exposition format, per-stage timings recorded by /chat, scrape-time
+service metrics, and the cost of recording on the hot path
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import main
+import metrics
+from metrics import MetricsRegistry
+from models import ChatRequest
+
+def _sample(text: str, line_start: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_start} not in metrics output")
+
+def test_histogram_exposition():
+    """Buckets are cumulative, le is inclusive, and +Inf equals the count"""
+    print("📊 Testing histogram exposition")
+    registry = MetricsRegistry(enabled=True)
+    histogram = registry.histogram("test_seconds", "Test latency", ["stage"], buckets=[0.1, 1])
+    child = histogram.labels("llm")
+    for value in (0.05, 0.1, 0.5, 3):
+        child.observe(value)
+    registry.counter("test_events", "Test events").inc(2)
+    text = registry.render()
+
+    assert "# TYPE test_seconds histogram" in text
+    assert _sample(text, 'test_seconds_bucket{stage="llm",le="0.1"}') == 2
+    assert _sample(text, 'test_seconds_bucket{stage="llm",le="1.0"}') == 3
+    assert _sample(text, 'test_seconds_bucket{stage="llm",le="+Inf"}') == 4
+    assert _sample(text, 'test_seconds_count{stage="llm"}') == 4
+    assert abs(_sample(text, 'test_seconds_sum{stage="llm"}') - 3.65) < 1e-9
+    assert _sample(text, "test_events_total") == 2
+    print("✅ Histogram rendered in Prometheus format")
+
+def test_collector_failure_is_contained():
+    """A failing collector is reported as a comment, the rest of the scrape still renders"""
+    print("📊 Testing collectors")
+    registry = MetricsRegistry(enabled=True)
+
+    def broken():
+        raise RuntimeError("backend down")
+        yield
+
+    registry.register_collector(broken)
+    registry.register_collector(lambda: [("test_depth", "gauge", "Depth", [({"queue": 'a"b'}, 3)])])
+    text = registry.render()
+    assert "# collector broken failed: backend down" in text
+    assert _sample(text, 'test_depth{queue="a\\"b"}') == 3
+    print("✅ Broken collector skipped")
+
+def test_chat_records_stages():
+    """/chat records the LLM and formatting stages and its end-to-end time; /metrics exposes them"""
+    print("📊 Testing /chat instrumentation")
+
+    class FakeLLM:
+        def invoke(self, messages):
+            return type("Reply", (), {"content": "We build custom AI agents."})()
+
+    original_llm = main.rag_system.llm
+    original_retrieve = main.rag_system.retrieve_relevant_documents
+    main.rag_system.llm = FakeLLM()
+    main.rag_system.retrieve_relevant_documents = lambda query, k=None: []
+    llm = metrics.STAGE_SECONDS.labels("llm")
+    chat = metrics.CHAT_SECONDS.labels("rag")
+    llm_before, chat_before = llm.count, chat.count
+    try:
+        asyncio.run(main.chat(ChatRequest(message="What services do you offer?", session_id="metrics-test")))
+        assert llm.count == llm_before + 1
+        assert metrics.STAGE_SECONDS.labels("format_response").count >= 1
+        assert chat.count == chat_before + 1
+
+        response = asyncio.run(main.get_metrics())
+        assert response.media_type.startswith("text/plain; version=0.0.4")
+        text = response.body.decode()
+        assert _sample(text, 'chatbot_stage_duration_seconds_count{stage="llm"}') == llm.count
+        assert _sample(text, "chatbot_sessions") >= 1
+        assert 'chatbot_queue_depth{queue="post_response"}' in text
+        assert 'chatbot_response_cache_requests_total{result="hits"}' in text
+    finally:
+        main.rag_system.llm = original_llm
+        main.rag_system.retrieve_relevant_documents = original_retrieve
+        main.post_response_worker.flush(5)
+        main.session_store.delete_session("metrics-test")
+    print("✅ Stage timings exposed at /metrics")
+
+def test_recording_overhead():
+    """Timing a stage costs microseconds, negligible next to any real stage"""
+    print("📊 Testing hot-path overhead")
+    iterations = 100000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with metrics.timed("overhead_test"):
+            pass
+    per_call = (time.perf_counter() - started) / iterations
+    print(f"   {per_call * 1e6:.2f} µs per timed block")
+    assert per_call < 20e-6
+    print("✅ Recording overhead is negligible")
+
+if __name__ == "__main__":
+    test_histogram_exposition()
+    test_collector_failure_is_contained()
+    test_chat_records_stages()
+    test_recording_overhead()
+    print("\n📊 Metrics tests completed!")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script to verify n8n payloads are delivered in the background: /chat
+does not wait for n8n, overflow follows the queue policy, the circuit
+breaker falls back to local processing while n8n is failing, and batching
+mode posts records as JSON arrays
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from models import ChatRequest, ChatResponse
+from n8n_integration import CircuitBreaker, N8NIntegration
+
+class _FakeN8N:
+    """Local webhook that answers after a delay with a configurable status"""
+
+    def __init__(self, delay: float = 0.0, status: int = 200, body: bytes = None):
+        self.delay = delay
+        self.status = status
+        self.body = body
+        self.requests = 0
+        self.batch_sizes = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                fake.requests += 1
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(fake.delay)
+                if isinstance(payload, list):
+                    fake.batch_sizes.append(len(payload))
+                    result = [{"processed_data": {"query": record["input"]["query"]}} for record in payload]
+                else:
+                    result = {"processed_data": {"query": payload["input"]["query"]}}
+                body = fake.body if fake.body is not None else json.dumps(result).encode()
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _interaction(i: int = 0):
+    request = ChatRequest(message=f"How can agentic AI help my business? ({i})", session_id=f"s{i}")
+    response = ChatResponse(response="Autonomous agents automate workflows.", sources=[], session_id=f"s{i}",
+                            confidence=0.8, processing_time=0.1)
+    return request, response
+
+def test_dispatch_does_not_wait():
+    """dispatch returns at once even when n8n takes a while"""
+    print("🔗 Testing fire-and-forget dispatch")
+    n8n = _FakeN8N(delay=0.5)
+    integration = N8NIntegration(webhook_url=n8n.url, workers=2, queue_size=10, retry_backoff=0)
+    results = []
+    try:
+        started = time.perf_counter()
+        integration.dispatch(*_interaction(), on_result=results.append)
+        assert time.perf_counter() - started < 0.1
+        assert integration.flush(5)
+        assert results == [{"processed_data": {"query": "How can agentic AI help my business? (0)"}}]
+        assert integration.get_stats()["sent"] == 1
+    finally:
+        integration.stop()
+        n8n.close()
+    print("✅ Dispatch returned before n8n answered")
+
+def test_queue_overflow_spills_locally():
+    """A full queue hands interactions to local processing instead of blocking"""
+    print("🔗 Testing queue overflow")
+    n8n = _FakeN8N(delay=0.3)
+    integration = N8NIntegration(webhook_url=n8n.url, workers=1, queue_size=1, queue_policy="spill", retry_backoff=0)
+    results = []
+    try:
+        for i in range(5):
+            integration.dispatch(*_interaction(i), on_result=results.append)
+        assert integration.flush(5)
+        time.sleep(0.2)  # Spilled interactions finish in the thread pool
+        stats = integration.get_stats()
+        assert stats["spilled"] >= 3 and stats["sent"] + stats["spilled"] == 5
+        assert len(results) == 5
+    finally:
+        integration.stop()
+        n8n.close()
+    print("✅ Overflow processed locally")
+
+def test_circuit_breaker_falls_back():
+    """Repeated failures open the circuit; later interactions skip n8n"""
+    print("🔗 Testing circuit breaker fallback")
+    n8n = _FakeN8N(status=500)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    integration = N8NIntegration(webhook_url=n8n.url, workers=1, max_retries=1, retry_backoff=0, breaker=breaker)
+    results = []
+    try:
+        for i in range(5):
+            integration.dispatch(*_interaction(i), on_result=results.append)
+        assert integration.flush(5)
+        time.sleep(0.2)
+        stats = integration.get_stats()
+        # Two interactions with one retry each reach n8n, then the circuit is open
+        assert n8n.requests == 4 and stats["circuit"] == "open" and stats["failed"] == 2
+        assert stats["fallbacks"] == 5 and len(results) == 5
+        assert all("query_analysis" in result for result in results)
+    finally:
+        integration.stop()
+        n8n.close()
+    print("✅ Fell back to local processing")
+
+def test_non_json_reply():
+    """A 200 with a plain-text body counts as delivered, without a structured result"""
+    print("🔗 Testing a non-JSON n8n reply")
+    n8n = _FakeN8N(body=b"Workflow was started")
+    results = []
+    for batch_size in (1, 2):
+        integration = N8NIntegration(webhook_url=n8n.url, workers=1, batch_size=batch_size, batch_max_wait=0.05,
+                                     retry_backoff=0)
+        try:
+            for i in range(2):
+                integration.dispatch(*_interaction(i), on_result=results.append)
+            assert integration.flush(5)
+            stats = integration.get_stats()
+            assert (stats["sent"], stats["failed"], stats["retries"]) == (2, 0, 0) and stats["circuit"] == "closed"
+        finally:
+            integration.stop()
+    n8n.close()
+    assert results == []
+    print("✅ Plain-text reply handled")
+
+def test_circuit_breaker_states():
+    """Open after the threshold, one trial after the reset timeout, close on success"""
+    print("🔗 Testing circuit breaker states")
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow_request()
+
+    clock.now = 30
+    assert breaker.allow_request() and not breaker.allow_request()  # Only one trial
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.times_opened == 2
+
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow_request()
+    print("✅ Breaker transitions")
+
+def test_batched_delivery():
+    """Records go out as arrays by size or time, and each gets its own result"""
+    print("🔗 Testing micro-batched delivery")
+    n8n = _FakeN8N()
+    integration = N8NIntegration(webhook_url=n8n.url, workers=1, batch_size=4, batch_max_wait=0.2, retry_backoff=0)
+    results = {}
+    try:
+        for i in range(10):
+            request, response = _interaction(i)
+            integration.dispatch(request, response, on_result=lambda result, i=i: results.setdefault(i, result))
+        assert integration.flush(5)
+        assert n8n.batch_sizes == [4, 4, 2]
+        assert all(results[i]["processed_data"]["query"].endswith(f"({i})") for i in range(10))
+
+        delivery = integration.get_stats()["delivery"]
+        assert (delivery["batches"], delivery["records"]) == (3, 10)
+        assert delivery["flush_reasons"] == {"size": 2, "time": 1}
+        assert delivery["flush_latency_ms"]["max"] >= 200  # The partial batch waited for the timer
+    finally:
+        integration.stop()
+        n8n.close()
+    print("✅ Batches flushed by size and time")
+
+def test_batched_response_formats():
+    """process_structured_data and split_batch_response accept both batch formats"""
+    print("🔗 Testing batched response formats")
+    integration = N8NIntegration(webhook_url=None)
+    records = [{"processed_data": {"query": "a"}}, {"processed_data": {"query": "b"}}]
+    for response in (records, {"results": records}):
+        structured = integration.process_structured_data(response)
+        assert [entry["original_query"] for entry in structured] == ["a", "b"]
+    assert N8NIntegration.split_batch_response({"results": records[:1]}, 2) == [records[0], None]
+    assert N8NIntegration.split_batch_response("unexpected", 2) == [None, None]
+    assert integration.process_structured_data(records[0])["original_query"] == "a"
+    print("✅ Batched responses split per record")
+
+if __name__ == "__main__":
+    test_dispatch_does_not_wait()
+    test_queue_overflow_spills_locally()
+    test_circuit_breaker_falls_back()
+    test_non_json_reply()
+    test_circuit_breaker_states()
+    test_batched_delivery()
+    test_batched_response_formats()
+    print("\n🔗 N8N dispatch tests completed!")
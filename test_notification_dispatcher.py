@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script to verify queued team notifications against a local aiosmtpd
+server: one SMTP transaction for all recipients over a reused connection,
+retries with backoff while the server is down, and digest mode coalescing
+non-urgent events
+"""
+
+import os
+import socket
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from aiosmtpd.controller import Controller
+
+from audit_log import AuditLog
+from consultation_logger import ConsultationLogger
+from notification_dispatcher import NotificationDispatcher, SMTPSession
+from storage import Database, NotificationOutbox
+
+class _RecordingHandler:
+    """aiosmtpd handler that keeps every accepted message"""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content.decode("utf-8", "replace")))
+        return "250 Message accepted for delivery"
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _dispatcher(directory, port, clock, **options):
+    outbox = NotificationOutbox(Database(os.path.join(directory, "test.db")))
+    session = SMTPSession("127.0.0.1", port, starttls=False, idle_timeout=60, timeout=5,
+                          **{"username": "", "password": "", **options.pop("credentials", {})})
+    return NotificationDispatcher(outbox, session, from_email="bot@example.com", max_attempts=3,
+                                  backoff_seconds=30, backoff_max_seconds=3600, clock=clock, **options)
+
+def test_one_transaction_per_notification():
+    """All recipients share one SMTP transaction; the connection is reused"""
+    print("📧 Testing pooled delivery")
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            dispatcher = _dispatcher(directory, controller.port, _Clock())
+            first = dispatcher.enqueue("New request", "Details", ["a@example.com", "b@example.com", "a@example.com"])
+            dispatcher.enqueue("Status update", "Confirmed", ["a@example.com"])
+            assert dispatcher.process_due() == 2
+
+            assert [(sender, recipients) for sender, recipients, _ in handler.messages] == [
+                ("bot@example.com", ["a@example.com", "b@example.com"]),
+                ("bot@example.com", ["a@example.com"])
+            ]
+            assert "Subject: New request" in handler.messages[0][2]
+            assert handler.connections == 1 and dispatcher.session.stats["connections_opened"] == 1
+            assert dispatcher.outbox.get(first)["status"] == "sent"
+            assert dispatcher.outbox.status_counts() == {"sent": 2}
+            dispatcher.session.close()
+    finally:
+        controller.stop()
+    print("✅ One transaction per notification over one connection")
+
+def test_retry_with_backoff():
+    """Sends fail while the server is down and succeed once it is back"""
+    print("📧 Testing retry with backoff")
+    port = _free_port()
+    clock = _Clock()
+    with tempfile.TemporaryDirectory() as directory:
+        dispatcher = _dispatcher(directory, port, clock)
+        notification_id = dispatcher.enqueue("New request", "Details", ["a@example.com"])
+
+        assert dispatcher.process_due() == 0
+        row = dispatcher.outbox.get(notification_id)
+        assert row["status"] == "pending" and row["attempts"] == 1 and row["next_attempt_at"] == clock.now + 30
+
+        # Not due yet, then the second attempt doubles the delay
+        assert dispatcher.process_due() == 0 and dispatcher.outbox.get(notification_id)["attempts"] == 1
+        clock.now += 30
+        assert dispatcher.process_due() == 0
+        assert dispatcher.outbox.get(notification_id)["next_attempt_at"] == clock.now + 60
+
+        handler = _RecordingHandler()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            clock.now += 60
+            assert dispatcher.process_due() == 1
+            assert dispatcher.outbox.get(notification_id)["status"] == "sent"
+            assert len(handler.messages) == 1
+            dispatcher.session.close()
+        finally:
+            controller.stop()
+
+        # Out of attempts: marked failed instead of retried forever
+        failing = dispatcher.enqueue("Lost", "Nobody listening", ["a@example.com"])
+        for _ in range(3):
+            dispatcher.process_due()
+            clock.now += 3600
+        assert dispatcher.outbox.get(failing)["status"] == "failed"
+        assert dispatcher.outbox.get(failing)["attempts"] == 3
+    print("✅ Retried with backoff")
+
+def test_digest_mode():
+    """Events in one window go out as one email; counters record what was saved"""
+    print("📧 Testing digest mode")
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    clock = _Clock()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            dispatcher = _dispatcher(directory, controller.port, clock, digest_window_seconds=600)
+            team = ["a@example.com", "b@example.com"]
+            for i in range(3):
+                dispatcher.add_to_digest(f"New Consultation Request - Client {i}", f"Client {i} details", team)
+                clock.now += 60
+
+            # Window still open: nothing sent, the worker sleeps until it closes
+            assert dispatcher.process_due() == 0 and handler.messages == []
+            assert dispatcher._next_wakeup() == min(dispatcher.poll_interval, 420)
+
+            clock.now += 420
+            assert dispatcher.process_due() == 1
+            (_, recipients, content), = handler.messages
+            assert recipients == team
+            assert "Consultation Digest - 3 updates" in content and "Client 2 details" in content
+            stats = dispatcher.get_stats()["digest"]
+            assert (stats["events_coalesced"], stats["messages_saved"], stats["pending_events"]) == (3, 4, 0)
+
+            # A lone event in a window is sent as itself
+            dispatcher.add_to_digest("Consultation Status Update - c1", "Confirmed", team)
+            clock.now += 600
+            assert dispatcher.process_due() == 1
+            assert "Subject: Consultation Status Update - c1" in handler.messages[-1][2]
+            assert dispatcher.get_stats()["digest"]["events_coalesced"] == 3
+            dispatcher.session.close()
+    finally:
+        controller.stop()
+    print("✅ Events coalesced")
+
+def test_urgent_events_bypass_digest():
+    """Cancellations and bookings for very soon are queued at once"""
+    print("📧 Testing urgent bypass")
+    with tempfile.TemporaryDirectory() as directory:
+        dispatcher = _dispatcher(directory, _free_port(), _Clock(), digest_window_seconds=600,
+                                 credentials={"username": "user", "password": "secret"})
+        logger = ConsultationLogger(
+            log_file=os.path.join(directory, "missing_logs.json"),
+            team_file=os.path.join(directory, "missing_team.json"),
+            db=dispatcher.outbox.db,
+            audit_log=AuditLog(os.path.join(directory, "audit.jsonl")),
+            dispatcher=dispatcher
+        )
+        far = (datetime.now() + timedelta(days=10)).date().isoformat()
+        soon = datetime.now().date().isoformat()
+        logger.log_consultation_action("scheduled", "c1", "Client", "client@example.com", preferred_date=far)
+        logger.log_consultation_action("confirmed", "c1", "Client", "client@example.com", preferred_date=far)
+        assert dispatcher.outbox.digest_event_count() == 2 and dispatcher.outbox.next_due() is None
+
+        logger.log_consultation_action("cancelled", "c1", "Client", "client@example.com", preferred_date=far)
+        logger.log_consultation_action("scheduled", "c2", "Client", "client@example.com", preferred_date=soon)
+        assert dispatcher.outbox.digest_event_count() == 2
+        assert dispatcher.outbox.status_counts() == {"pending": 2}
+    print("✅ Urgent events skip the digest")
+
+if __name__ == "__main__":
+    test_one_transaction_per_notification()
+    test_retry_with_backoff()
+    test_digest_mode()
+    test_urgent_events_bypass_digest()
+    print("\n📧 Notification dispatcher tests completed!")
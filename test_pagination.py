@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify opaque cursors, streamed page serialization and
+paging consultation requests by creation order
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from pagination import decode_cursor, encode_cursor, stream_page
+from storage import ConsultationRepository, Database
+
+def _read_body(response) -> bytes:
+    async def collect():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(collect())
+
+def _request(i: int):
+    return {
+        "id": f"consultation_{i}", "name": f"Client {i}", "email": f"client{i}@example.com",
+        "phone": "", "company": "", "preferred_date": "", "preferred_time": "", "timezone": "EST",
+        "message": "", "status": "pending", "created_at": datetime(2025, 10, 21, 9, i).isoformat()
+    }
+
+def test_cursors():
+    """Cursors round-trip sort keys and reject garbage"""
+    print("📄 Testing cursors")
+    for values in ([42], ["session-b"], [1761037200.123456, "log_7"]):
+        assert decode_cursor(encode_cursor(values)) == values
+    for bad in ["not a cursor", encode_cursor([1])[:-2] + "!!", "eyJhIjogMX0"]:
+        try:
+            decode_cursor(bad)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+    print("✅ Cursors round-trip")
+
+def test_stream_page():
+    """Streamed pages are valid JSON with the same shape as a plain body"""
+    print("📄 Testing streamed pages")
+    items = [{"id": i, "created_at": datetime(2025, 10, 21, 9, i)} for i in range(3)]
+    body = json.loads(_read_body(stream_page({"status": "success", "total": 3}, "items", items, "abc")))
+    assert body == {
+        "status": "success", "total": 3,
+        "items": [{"id": i, "created_at": f"2025-10-21T09:0{i}:00"} for i in range(3)],
+        "next_cursor": "abc"
+    }
+    assert json.loads(_read_body(stream_page({}, "items", [], None))) == {"items": [], "next_cursor": None}
+    print("✅ Streamed pages parse")
+
+def test_consultation_pages():
+    """Pages follow creation order and are not shifted by deletes"""
+    print("📄 Testing consultation pages")
+    with tempfile.TemporaryDirectory() as directory:
+        repository = ConsultationRepository(Database(os.path.join(directory, "test.db")))
+        for i in range(7):
+            repository.add(_request(i))
+
+        first = repository.page(0, 3)
+        assert [request["id"] for _, request in first] == [f"consultation_{i}" for i in range(3)]
+        repository.delete("consultation_1")
+        repository.delete("consultation_3")
+        second = repository.page(first[-1][0], 3)
+        assert [request["id"] for _, request in second] == ["consultation_4", "consultation_5", "consultation_6"]
+        assert repository.page(second[-1][0], 3) == []
+    print("✅ Pages are stable")
+
+def test_log_endpoints_report_totals():
+    """total_logs counts every matching log, not just the page"""
+    print("📄 Testing log page totals")
+    import main
+    from audit_log import AuditLog
+
+    with tempfile.TemporaryDirectory() as directory:
+        original = main.consultation_logger.audit_log
+        log = AuditLog(os.path.join(directory, "audit.jsonl"), window_size=10)
+        now = datetime.now()
+        for i in range(25):
+            log.append({"id": f"log_{i}", "action": "scheduled", "status": "confirmed" if i % 5 == 0 else "pending",
+                        "timestamp": now.replace(microsecond=i).isoformat(timespec="microseconds")})
+        main.consultation_logger.audit_log = log
+        try:
+            for endpoint, kwargs, total in [
+                (main.get_recent_consultation_logs, {"hours": 24}, 25),
+                (main.get_logs_by_status, {"status": "confirmed"}, 5),
+                (main.get_logs_by_date_range, {"start_date": now.replace(microsecond=0).isoformat(),
+                                               "end_date": now.replace(microsecond=9).isoformat()}, 10),
+            ]:
+                body = json.loads(_read_body(asyncio.run(endpoint(limit=3, cursor=None, **kwargs))))
+                assert body["total_logs"] == total and len(body["logs"]) == 3, (endpoint.__name__, body["total_logs"])
+        finally:
+            main.consultation_logger.audit_log = original
+    print("✅ Totals cover every page")
+
+if __name__ == "__main__":
+    test_cursors()
+    test_stream_page()
+    test_consultation_pages()
+    test_log_endpoints_report_totals()
+    print("\n📄 Pagination tests completed!")
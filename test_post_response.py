@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script to verify post-response work runs after /chat answers: the
+bounded worker sheds tasks when full, survives failing tasks, and session
+context updates land asynchronously
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import main
+from data_processor import local_data_processor
+from models import ChatRequest, ChatResponse
+from post_response import PostResponseWorker
+
+def test_submit_does_not_wait():
+    """Tasks run in the background and their time is reported as latency saved"""
+    print("⏩ Testing background tasks")
+    worker = PostResponseWorker(workers=1, queue_size=10, submit_timeout=0)
+    try:
+        done = []
+        started = time.perf_counter()
+        assert worker.submit(lambda: (time.sleep(0.2), done.append(1)))
+        assert time.perf_counter() - started < 0.05 and done == []
+        assert worker.flush(5) and done == [1]
+
+        stats = worker.get_stats()
+        assert stats["completed"] == 1 and stats["latency_saved_seconds"]["total"] >= 0.2
+        assert stats["latency_saved_seconds"]["windows"]["5m"]["count"] == 1
+    finally:
+        worker.stop()
+    print("✅ Task ran after submit returned")
+
+def test_backpressure_sheds_tasks():
+    """A full queue sheds new tasks instead of blocking the caller"""
+    print("⏩ Testing backpressure")
+    worker = PostResponseWorker(workers=1, queue_size=2, submit_timeout=0.05)
+    release = threading.Event()
+    try:
+        assert worker.submit(release.wait)
+        time.sleep(0.05)  # The worker is now busy with the blocking task
+        assert worker.submit(lambda: None) and worker.submit(lambda: None)
+        started = time.perf_counter()
+        assert not worker.submit(lambda: None)
+        assert time.perf_counter() - started < 0.5
+        release.set()
+        assert worker.flush(5)
+        stats = worker.get_stats()
+        assert (stats["submitted"], stats["completed"], stats["shed"]) == (3, 3, 1)
+    finally:
+        release.set()
+        worker.stop()
+    print("✅ Shed when full")
+
+def test_failures_are_contained():
+    """A failing task is counted and the worker keeps going"""
+    print("⏩ Testing failing tasks")
+    worker = PostResponseWorker(workers=1, queue_size=10, submit_timeout=0)
+    try:
+        results = []
+        worker.submit(lambda: 1 / 0)
+        worker.submit(results.append, "after")
+        assert worker.flush(5) and results == ["after"]
+        assert worker.get_stats()["failed"] == 1
+    finally:
+        worker.stop()
+    print("✅ Failure contained")
+
+def test_chat_returns_before_analytics():
+    """/chat answers before local analysis runs; the context update follows"""
+    print("⏩ Testing /chat critical path")
+    original_chat, original_process = main.rag_system.chat, local_data_processor.process_chat_interaction
+
+    def fake_chat(query, session_id, user_context=None):
+        return ChatResponse(response="We build custom AI agents.", sources=[], session_id=session_id,
+                            confidence=0.9, processing_time=0.01)
+
+    def slow_process(chat_request, rag_response):
+        time.sleep(0.3)
+        return original_process(chat_request, rag_response)
+
+    main.rag_system.chat = fake_chat
+    local_data_processor.process_chat_interaction = slow_process
+    try:
+        started = time.perf_counter()
+        response = asyncio.run(main.chat(ChatRequest(message="How much does an AI agent cost?", session_id="post-response-test")))
+        assert time.perf_counter() - started < 0.2
+        assert response.response == "We build custom AI agents."
+        assert "metadata" not in main.session_store.get_session("post-response-test").get("context", {})
+
+        assert main.post_response_worker.flush(5)
+        context = main.session_store.get_session("post-response-test")["context"]
+        assert "processed_at" in context["metadata"]
+        assert main.post_response_worker.get_stats()["latency_saved_seconds"]["total"] >= 0.3
+    finally:
+        main.rag_system.chat = original_chat
+        local_data_processor.process_chat_interaction = original_process
+        main.session_store.delete_session("post-response-test")
+    print("✅ Context updated after the response")
+
+if __name__ == "__main__":
+    test_submit_does_not_wait()
+    test_backpressure_sheds_tasks()
+    test_failures_are_contained()
+    test_chat_returns_before_analytics()
+    print("\n⏩ Post-response tests completed!")
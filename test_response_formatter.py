@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the single-pass response formatter matches the
+original regex cascade, for whole responses and for streamed chunks
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from response_formatter import ResponseFormatter, format_response
+from response_formatter_reference import GOLDEN_CORPUS, legacy_format_response
+
+def _format_in_chunks(text: str, rng: random.Random) -> str:
+    formatter = ResponseFormatter()
+    output = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 6)
+        output.append(formatter.feed(text[position:position + size]))
+        position += size
+    output.append(formatter.finish())
+    return "".join(output)
+
+def test_golden_corpus():
+    """Formatter output is identical to the regex cascade on the golden corpus"""
+    print("🎨 Testing golden corpus")
+    for sample in GOLDEN_CORPUS:
+        assert format_response(sample) == legacy_format_response(sample), repr(sample)
+    print(f"✅ {len(GOLDEN_CORPUS)} samples identical")
+
+def test_streamed_chunks():
+    """Feeding text in small chunks gives the same output as a single call"""
+    print("🎨 Testing streamed chunks")
+    rng = random.Random(26)
+    for sample in GOLDEN_CORPUS:
+        for _ in range(20):
+            assert _format_in_chunks(sample, rng) == legacy_format_response(sample), repr(sample)
+    print("✅ Streamed output identical")
+
+def test_random_inputs():
+    """Random strings built from the characters the rules care about"""
+    print("🎨 Testing random inputs")
+    alphabet = ["*", "1", "2", ".", "-", "•", "·", " ", "\t", "\n", "\n", "\r", "A", "a", "x", "٣"]
+    rng = random.Random(2026)
+    for _ in range(20000):
+        sample = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        expected = legacy_format_response(sample)
+        assert format_response(sample) == expected, repr(sample)
+        assert _format_in_chunks(sample, rng) == expected, repr(sample)
+    print("✅ 20000 random inputs identical")
+
+if __name__ == "__main__":
+    test_golden_corpus()
+    test_streamed_chunks()
+    test_random_inputs()
+    print("\n🎨 Response formatter tests completed!")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script to verify lazy service initialization: services are built once
+on first use and forward to the real object, importing main stays free of
+langchain and chromadb, and /ready reports the warm-up
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import services
+from services import LazyService
+
+class Counter:
+    builds = 0
+
+    def __init__(self):
+        Counter.builds += 1
+        time.sleep(0.05)  # Long enough for concurrent first uses to overlap
+        self.value = 1
+
+    def increment(self):
+        self.value += 1
+        return self.value
+
+def test_built_once_and_forwarded():
+    """The first use builds the service once, even from many threads; reads and writes reach it"""
+    print("💤 Testing lazy construction")
+    Counter.builds = 0
+    service = LazyService("counter", Counter, register=False)
+    assert Counter.builds == 0 and not services.initialized(service)
+    assert services.readiness([service], eager=True)["status"] == "starting"
+
+    threads = [threading.Thread(target=service.increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Counter.builds == 1 and service.value == 9
+    service.value = 42  # Writes go to the service, as tests that patch singletons expect
+    assert service.increment() == 43
+    assert services.initialized(service) and services.initialized(object())
+    print("✅ Built once, attributes forwarded")
+
+def test_failures_and_warm_up():
+    """A failed build is reported and retried on next use; warm-up hooks run once"""
+    print("💤 Testing failures and warm-up")
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("vector store unavailable")
+        return Counter()
+
+    warmed = []
+    service = LazyService("flaky", flaky, warm_up=lambda target: warmed.append(target) or {"index_loaded": True},
+                          register=False)
+    services.warm_up([service])
+    report = services.readiness([service])
+    assert report["status"] == "failed" and not report["ready"]
+    assert "vector store unavailable" in report["services"]["flaky"]["error"]
+
+    services.warm_up([service])
+    services.warm_up([service])
+    report = services.readiness([service])
+    assert report["ready"] and len(attempts) == 2 and len(warmed) == 1
+    assert report["services"]["flaky"]["warm_up_result"] == {"index_loaded": True}
+    assert report["services"]["flaky"]["init_seconds"] >= 0.05
+    print("✅ Failure reported, retry succeeded, warmed once")
+
+def test_on_demand_readiness():
+    """Without start-up warm-up, unused services do not hold /ready back, first use warms, and a
+    failed warm-up is reported but retried instead of blocking readiness"""
+    print("💤 Testing readiness with start-up warm-up disabled")
+    hook_calls = []
+
+    def hook(target):
+        hook_calls.append(target)
+        if len(hook_calls) == 1:
+            raise TimeoutError("index load timed out")
+        return {"index_loaded": True}
+
+    plain = LazyService("plain", Counter, register=False)
+    warmed = LazyService("warmed", Counter, warm_up=hook, register=False)
+    assert services.readiness([plain, warmed], eager=False)["ready"]
+
+    warmed.increment()  # First use builds and runs the warm-up hook
+    report = services.readiness([plain, warmed], eager=False)
+    assert report["ready"] and len(hook_calls) == 1
+    assert report["services"]["warmed"]["state"] == "ready" and not report["services"]["warmed"]["warmed"]
+    assert "index load timed out" in report["services"]["warmed"]["warm_up_error"]
+
+    services._warm_up_until_done([plain, warmed], retry_delay=0.01, max_retry_delay=0.01)
+    report = services.readiness([plain, warmed], eager=False)
+    assert report["ready"] and len(hook_calls) == 2
+    assert report["services"]["warmed"]["warmed"] and report["services"]["warmed"]["warm_up_error"] is None
+    print("✅ Ready on demand, warm-up retried")
+
+def test_warm_up_retries_builds():
+    """The start-up warm-up keeps retrying a service whose build failed until it is built"""
+    print("💤 Testing warm-up retries")
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("vector store unavailable")
+        return Counter()
+
+    service = LazyService("flaky", flaky, register=False)
+    services._warm_up_until_done([service], retry_delay=0.01, max_retry_delay=0.02)
+    assert len(attempts) == 3 and services.readiness([service], eager=True)["ready"]
+    print("✅ Build retried until it succeeded")
+
+def test_import_is_light():
+    """Importing main builds nothing and leaves langchain and chromadb unimported"""
+    print("💤 Testing import of main")
+    code = (
+        "import sys, main, services\n"
+        "heavy = [m for m in ('langchain', 'langchain_core', 'langchain_openai', 'chromadb', 'openai') if m in sys.modules]\n"
+        "built = [s._lazy_name for s in services._registry if services.initialized(s)]\n"
+        "print(heavy, built)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent, capture_output=True, text=True,
+                            env={**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-test"})
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip().splitlines()[-1] == "[] []", result.stdout
+    print("✅ Nothing heavy imported or built")
+
+def test_ready_endpoint():
+    """/ready answers 503 while services are pending and 200 once warm-up loaded the index"""
+    print("💤 Testing /ready")
+    import main
+
+    gate = threading.Event()
+    blocked = LazyService("blocked", lambda: gate.wait(60) and Counter(), register=False)
+    services._registry.append(blocked)
+    try:
+        thread = services.start_warm_up()
+        response = asyncio.run(main.readiness_check())
+        assert response.status_code == 503
+        gate.set()
+        thread.join(120)
+        response = asyncio.run(main.readiness_check())
+        assert response.status_code == 200, response.body
+    finally:
+        gate.set()
+        services._registry.remove(blocked)
+    report = services.readiness()
+    assert set(report["services"]) >= {"knowledge_base", "rag_system", "n8n_integration",
+                                       "consultation_logger", "consultation_scheduler"}
+    assert report["services"]["knowledge_base"]["warm_up_result"]["index_loaded"]
+    print("✅ Ready after warm-up")
+
+if __name__ == "__main__":
+    test_built_once_and_forwarded()
+    test_failures_and_warm_up()
+    test_on_demand_readiness()
+    test_warm_up_retries_builds()
+    test_import_is_light()
+    test_ready_endpoint()
+    print("\n💤 Lazy service tests completed!")
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the bounded session stores evict idle and least
+recently used sessions, cap messages per session, and that the Redis
+backend shares sessions between workers (against an in-process fake), and
+that both backends page sessions and messages with stable cursors
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from langchain.memory import ConversationBufferWindowMemory
+from session_store import BaseSessionStore, RedisSessionStore, SessionStore
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _new_memory():
+    return ConversationBufferWindowMemory(k=10, memory_key="chat_history", return_messages=True)
+
+def test_ttl_eviction():
+    """Idle sessions expire on access and in the sweeper"""
+    print("🗂️ Testing idle TTL eviction")
+    clock = _Clock()
+    store = SessionStore(ttl_seconds=60, max_sessions=10, max_messages=5, clock=clock)
+    store.get_session("a")
+    store.get_session("b")
+    clock.now = 30
+    store.get_session("b")
+    clock.now = 61
+
+    assert store.sweep() == 1
+    assert [session_id for session_id, _ in store.list_sessions()] == ["b"]
+    clock.now = 200
+    assert store.get_session("b", create=False) is None
+    assert store.get_metrics()["evictions"]["ttl"] == 2
+    print("✅ Idle sessions evicted")
+
+def test_lru_eviction():
+    """The least recently used session is evicted when the store is full"""
+    print("🗂️ Testing LRU eviction")
+    store = SessionStore(ttl_seconds=60, max_sessions=2, max_messages=5, clock=_Clock())
+    store.get_session("a")
+    store.get_session("b")
+    store.get_memory("a", _new_memory)  # touches "a"
+    store.get_session("c")
+
+    assert [session_id for session_id, _ in store.list_sessions()] == ["a", "c"]
+    assert store.memory_session_ids() == ["a"]
+    assert store.get_metrics()["evictions"]["lru"] == 1
+    print("✅ Least recently used session evicted")
+
+def test_message_cap():
+    """Sessions and memories keep only the newest messages"""
+    print("🗂️ Testing per-session message cap")
+    store = SessionStore(ttl_seconds=60, max_sessions=2, max_messages=3, clock=_Clock())
+    for i in range(5):
+        store.add_message("a", {"role": "user", "content": f"message {i}"})
+    assert [m["content"] for m in store.get_session("a")["messages"]] == ["message 2", "message 3", "message 4"]
+
+    memory = store.get_memory("a", _new_memory)
+    for i in range(2):
+        store.record_exchange("a", memory, f"question {i}", f"answer {i}")
+    assert [m.content for m in memory.chat_memory.messages] == ["answer 0", "question 1", "answer 1"]
+
+    metrics = store.get_metrics()
+    assert metrics["messages"] == 3 and metrics["memory_messages"] == 3
+    assert metrics["approx_message_bytes"] > 0
+
+    assert store.clear_memory("a")
+    assert store.get_session("a", create=False) is not None
+    assert store.delete_session("a")
+    assert not store.delete_session("a")
+    print("✅ Message cap enforced")
+
+class FakeRedis:
+    """In-process stand-in for the Redis commands used by RedisSessionStore"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= self.clock():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def set(self, key, value, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        return True
+
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                deleted += 1
+            self.expires.pop(key, None)
+        return deleted
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self.expires[key] = self.clock() + seconds
+        return True
+
+    def rpush(self, key, *values):
+        if not self._alive(key):
+            self.data[key] = []
+        self.data[key].extend(values)
+        return len(self.data[key])
+
+    def _slice(self, items, start, end):
+        end = len(items) if end == -1 else end + 1
+        return items[start:end] if start >= 0 else items[max(len(items) + start, 0):end]
+
+    def lrange(self, key, start, end):
+        return list(self._slice(self.data[key], start, end)) if self._alive(key) else []
+
+    def ltrim(self, key, start, end):
+        if self._alive(key):
+            self.data[key] = self._slice(self.data[key], start, end)
+        return True
+
+    def llen(self, key):
+        return len(self.data[key]) if self._alive(key) else 0
+
+    def lindex(self, key, index):
+        items = self.data[key] if self._alive(key) else []
+        return items[index] if -len(items) <= index < len(items) else None
+
+    def incr(self, key):
+        self.data[key] = (self.data[key] if self._alive(key) else 0) + 1
+        return self.data[key]
+
+    def _zset(self, key):
+        return self.data.setdefault(key, {})
+
+    def zadd(self, key, mapping):
+        self._zset(key).update(mapping)
+
+    def zrem(self, key, *members):
+        zset = self._zset(key)
+        return sum(1 for member in members if zset.pop(member, None) is not None)
+
+    def zcard(self, key):
+        return len(self._zset(key))
+
+    def zrange(self, key, start, end):
+        members = sorted(self._zset(key), key=lambda member: self._zset(key)[member])
+        return self._slice(members, start, end)
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member in self.zrange(key, 0, -1) if self._zset(key)[member] <= high]
+
+    def zrangebylex(self, key, low, high, start=0, num=None):
+        members = sorted(self._zset(key))
+        if low != "-":
+            members = [member for member in members if member > low[1:]]
+        return members[start:None if num is None else start + num]
+
+    def zpopmin(self, key, count=1):
+        popped = [(member, self._zset(key)[member]) for member in self.zrange(key, 0, count - 1)]
+        for member, _ in popped:
+            del self._zset(key)[member]
+        return popped
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+        return queue
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+def _redis_workers(count, clock, **limits):
+    """Several stores (one per worker) sharing one fake Redis server"""
+    server = FakeRedis(clock)
+    limits = {"ttl_seconds": 60, "max_sessions": 10, "max_messages": 4, **limits}
+    return [RedisSessionStore(server, cache_ttl=0, clock=clock, **limits) for _ in range(count)]
+
+def test_redis_shared_between_workers():
+    """A conversation started on one worker continues on another"""
+    print("🗂️ Testing Redis session backend across workers")
+    clock = _Clock()
+    first, second = _redis_workers(2, clock)
+
+    first.add_message("a", {"role": "user", "content": "What is agentic AI?"})
+    first.update_context("a", {"lead_score": 0.7})
+    memory = first.get_memory("a", _new_memory)
+    first.record_exchange("a", memory, "What is agentic AI?", "Autonomous AI agents.")
+
+    session = second.get_session("a", create=False)
+    assert [m["content"] for m in session["messages"]] == ["What is agentic AI?"]
+    assert session["context"] == {"lead_score": 0.7}
+    shared_memory = second.get_memory("a", _new_memory)
+    assert [m.content for m in shared_memory.chat_memory.messages] == ["What is agentic AI?", "Autonomous AI agents."]
+    assert second.memory_session_ids() == ["a"]
+
+    for i in range(3):
+        second.record_exchange("a", shared_memory, f"question {i}", f"answer {i}")
+    memory = first.get_memory("a", _new_memory)
+    assert [m.content for m in memory.chat_memory.messages] == ["question 1", "answer 1", "question 2", "answer 2"]
+
+    assert second.clear_memory("a")
+    assert first.get_memory("a", _new_memory, create=False) is None
+    assert first.delete_session("a")
+    assert second.get_session("a", create=False) is None
+    print("✅ Sessions shared")
+
+def test_redis_eviction():
+    """Redis backend applies the same TTL and LRU limits"""
+    print("🗂️ Testing Redis session eviction")
+    clock = _Clock()
+    store, = _redis_workers(1, clock, max_sessions=2)
+    store.get_session("a")
+    clock.now = 1
+    store.get_session("b")
+    clock.now = 2
+    store.add_message("a", {"role": "user", "content": "hi"})
+    clock.now = 3
+    store.get_session("c")
+    assert [session_id for session_id, _ in store.list_sessions()] == ["a", "c"]
+
+    clock.now = 100
+    assert store.sweep() == 2
+    assert store.list_sessions() == []
+    assert store.get_metrics()["evictions"] == {"ttl": 2, "lru": 1}
+    print("✅ Idle and least recently used sessions evicted")
+
+def test_redis_read_through_cache():
+    """Repeated reads within the cache TTL are served in process"""
+    print("🗂️ Testing read-through cache")
+    clock = _Clock()
+    store = RedisSessionStore(FakeRedis(clock), ttl_seconds=60, max_sessions=10, max_messages=4, cache_ttl=2, clock=clock)
+    store.add_message("a", {"role": "user", "content": "hi"})
+    store.get_session("a")
+    store.get_session("a")
+    clock.now = 5
+    store.get_session("a")
+    cache = store.get_metrics()["cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 3)
+    print("✅ Cache hits counted")
+
+def test_paging():
+    """Sessions page in id order and messages by seq, in both backends"""
+    print("🗂️ Testing paged listings")
+    for store in [SessionStore(ttl_seconds=60, max_sessions=50, max_messages=4, clock=_Clock())] + _redis_workers(1, _Clock(), max_sessions=50):
+        for session_id in ["d", "a", "c", "e", "b"]:
+            store.get_session(session_id)
+        store.get_memory("c", _new_memory)
+        store.record_exchange("c", store.get_memory("c", _new_memory), "hi", "hello")
+        for i in range(6):
+            store.add_message("a", {"role": "user", "content": f"message {i}"})
+
+        first = store.page_sessions(None, 2)
+        assert [s["session_id"] for s in first] == ["a", "b"] and first[0]["message_count"] == 4
+        store.delete_session("c")  # Removing items does not shift later pages
+        assert [s["session_id"] for s in store.page_sessions("b", 2)] == ["d", "e"]
+        assert store.page_sessions("e", 2) == []
+        store.record_exchange("d", store.get_memory("d", _new_memory), "hi", "hello")
+        assert [s["session_id"] for s in store.page_sessions(None, 5, with_memory=True)] == ["d"]
+        assert store.count_sessions() == 4 and store.count_sessions(with_memory=True) == 1
+
+        # Only the newest 4 messages (seq 3-6) are kept
+        page = store.page_messages("a", 0, 3)
+        assert [m["seq"] for m in page] == [3, 4, 5]
+        assert [m["content"] for m in store.page_messages("a", page[-1]["seq"], 3)] == ["message 5"]
+        assert store.page_messages("missing", 0, 3) is None
+    print("✅ Pages are stable")
+
+def test_incomplete_backend():
+    """A backend missing part of the interface cannot be constructed"""
+    print("🗂️ Testing the backend interface")
+
+    class PartialStore(BaseSessionStore):
+        def get_session(self, session_id, create=True):
+            return None
+
+    try:
+        PartialStore(ttl_seconds=60, max_sessions=2, max_messages=3, sweep_interval=60)
+        raise AssertionError("incomplete backend constructed")
+    except TypeError as e:
+        assert "count_sessions" in str(e)
+    print("✅ Incomplete backend rejected")
+
+if __name__ == "__main__":
+    test_ttl_eviction()
+    test_lru_eviction()
+    test_message_cap()
+    test_redis_shared_between_workers()
+    test_redis_eviction()
+    test_redis_read_through_cache()
+    test_paging()
+    test_incomplete_backend()
+    print("\n🗂️ Session store tests completed!")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the incremental booked-slot index stays in sync with
+the stored requests and that concurrent bookings never double-book a slot
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from scheduling_system import BOOKED_STATUSES, ConsultationScheduler
+from storage import Database
+
+def _scheduler(directory: str) -> ConsultationScheduler:
+    return ConsultationScheduler(
+        data_file=os.path.join(directory, "consultation_requests.json"),
+        db=Database(os.path.join(directory, "chatbot.db"))
+    )
+
+def _expected_booked(scheduler: ConsultationScheduler):
+    """Booked slots recomputed from every stored request"""
+    booked = {}
+    for request in scheduler.get_all_requests():
+        if request["status"] in BOOKED_STATUSES and request["preferred_date"] and request["preferred_time"]:
+            booked.setdefault(request["preferred_date"], set()).add(request["preferred_time"])
+    return booked
+
+def test_index_matches_requests():
+    """Random creates, updates and deletes keep the index equal to a full rebuild"""
+    print("📅 Testing incremental slot index")
+    rng = random.Random(32)
+    with tempfile.TemporaryDirectory() as directory:
+        scheduler = _scheduler(directory)
+        days = scheduler.available_days[:3]
+        ids = []
+        for _ in range(300):
+            operation = rng.random()
+            if operation < 0.5 or not ids:
+                result = scheduler.schedule_consultation(
+                    name="Test", email="test@example.com",
+                    preferred_date=rng.choice(days + [""]), preferred_time=rng.choice(scheduler.available_slots)
+                )
+                if result["success"]:
+                    ids.append(result["consultation_id"])
+            elif operation < 0.85:
+                scheduler.update_consultation_status(rng.choice(ids), rng.choice(["pending", "confirmed", "completed", "cancelled"]))
+            else:
+                consultation_id = rng.choice(ids)
+                scheduler.delete_consultation(consultation_id)
+                ids.remove(consultation_id)
+
+            booked = {date: set(times) for date, times in scheduler._get_booked_slots().items()}
+            assert booked == _expected_booked(scheduler)
+            holders = [(request["preferred_date"], request["preferred_time"]) for request in scheduler.get_all_requests()
+                       if request["status"] in BOOKED_STATUSES and request["preferred_date"]]
+            assert len(holders) == len(set(holders))  # No slot is ever held twice
+            # Writes by this scheduler never force a rebuild
+            assert scheduler._slots.generation == scheduler.repository.generation()
+    print("✅ Index in sync")
+
+def test_reopen_taken_slot():
+    """A cancelled request cannot be reopened onto a slot someone else booked meanwhile"""
+    print("📅 Testing reopening a cancelled request")
+    with tempfile.TemporaryDirectory() as directory:
+        scheduler = _scheduler(directory)
+        date, time = scheduler.available_days[0], scheduler.available_slots[0]
+        first = scheduler.schedule_consultation(name="First", email="first@example.com", preferred_date=date, preferred_time=time)
+        assert scheduler.update_consultation_status(first["consultation_id"], "cancelled")["success"]
+        second = scheduler.schedule_consultation(name="Second", email="second@example.com", preferred_date=date, preferred_time=time)
+        assert second["success"]
+
+        for status in ("pending", "confirmed"):
+            result = scheduler.update_consultation_status(first["consultation_id"], status)
+            assert not result["success"] and result["conflict"]
+        assert scheduler.get_consultation_status(first["consultation_id"])["status"] == "cancelled"
+        assert {date: {time}} == {d: set(t) for d, t in scheduler._get_booked_slots().items()} == _expected_booked(scheduler)
+
+        # Once the slot is free again the request can be reopened
+        assert scheduler.update_consultation_status(second["consultation_id"], "cancelled")["success"]
+        assert scheduler.update_consultation_status(first["consultation_id"], "confirmed")["success"]
+        assert not scheduler.is_time_slot_available(date, time)
+    print("✅ Reopening refused while the slot is taken")
+
+def test_concurrent_threads_single_winner():
+    """Threads racing for one slot: exactly one booking succeeds"""
+    print("📅 Testing concurrent bookings (threads)")
+    with tempfile.TemporaryDirectory() as directory:
+        scheduler = _scheduler(directory)
+        date, time = scheduler.available_days[0], scheduler.available_slots[0]
+        results = []
+
+        def book(i):
+            results.append(scheduler.schedule_consultation(
+                name=f"User {i}", email=f"user{i}@example.com", preferred_date=date, preferred_time=time
+            )["success"])
+
+        threads = [threading.Thread(target=book, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 1
+        assert not scheduler.is_time_slot_available(date, time)
+    print("✅ One winner")
+
+def _book_in_process(directory: str, date: str, time: str, barrier, results):
+    scheduler = _scheduler(directory)
+    scheduler.is_time_slot_available(date, time)  # Sync the index before racing
+    barrier.wait()
+    results.put(scheduler.schedule_consultation(
+        name="Racer", email="racer@example.com", preferred_date=date, preferred_time=time
+    )["success"])
+
+def test_concurrent_processes_single_winner():
+    """Worker processes racing for one slot: exactly one booking succeeds"""
+    print("📅 Testing concurrent bookings (processes)")
+    with tempfile.TemporaryDirectory() as directory:
+        scheduler = _scheduler(directory)
+        date, time = scheduler.available_days[0], scheduler.available_slots[-1]
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(4)
+        results = context.Queue()
+        workers = [
+            context.Process(target=_book_in_process, args=(directory, date, time, barrier, results))
+            for _ in range(4)
+        ]
+        for process in workers:
+            process.start()
+        outcomes = [results.get(timeout=60) for _ in workers]
+        for process in workers:
+            process.join()
+        assert outcomes.count(True) == 1
+        # This process's index picks up the other processes' booking
+        assert not scheduler.is_time_slot_available(date, time)
+    print("✅ One winner")
+
+if __name__ == "__main__":
+    test_index_matches_requests()
+    test_reopen_taken_slot()
+    test_concurrent_threads_single_winner()
+    test_concurrent_processes_single_winner()
+    print("\n📅 Slot reservation tests completed!")
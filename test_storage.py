@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the SQLite storage layer: one-shot JSON migration,
+indexed lookups, and safe writes from several processes
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from storage import ConsultationRepository, Database, TeamMemberRepository
+
+REQUEST = {
+    "id": "0cdde489", "name": "Jane", "email": "jane@example.com", "phone": "", "company": "Acme",
+    "preferred_date": "2025-10-28", "preferred_time": "9:00 AM", "timezone": "EST", "message": "",
+    "status": "confirmed", "created_at": "2025-10-21T18:09:54.040139", "confirmed_at": None
+}
+
+def test_json_migration_runs_once():
+    """JSON files are imported on first use and never again"""
+    print("🗄️ Testing one-shot JSON migration")
+    with tempfile.TemporaryDirectory() as directory:
+        requests_file = os.path.join(directory, "consultation_requests.json")
+        team_file = os.path.join(directory, "team_members.json")
+        with open(requests_file, "w") as f:
+            json.dump([REQUEST], f)
+        with open(team_file, "w") as f:
+            json.dump([{"name": "Sales", "email": "sales@example.com", "role": "Sales"}], f)
+
+        db = Database(os.path.join(directory, "chatbot.db"))
+        consultations = ConsultationRepository(db)
+        team = TeamMemberRepository(db)
+        assert consultations.migrate_from_json(requests_file) == 1
+        assert team.migrate_from_json(team_file) == 1
+        assert consultations.all() == [REQUEST]
+        assert team.all() == [{"name": "Sales", "email": "sales@example.com", "role": "Sales", "phone": ""}]
+
+        # A second start (even in a new process) does not import again
+        assert ConsultationRepository(Database(db.path)).migrate_from_json(requests_file) == 0
+        assert consultations.count() == 1
+    print("✅ Migration applied once")
+
+def test_queries_use_indexes():
+    """Id, slot, status and email lookups are served by indexes"""
+    print("🗄️ Testing index usage")
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(os.path.join(directory, "chatbot.db"))
+        queries = [
+            ("SELECT 1 FROM consultations WHERE preferred_date = ? AND preferred_time = ?", ("d", "t"), "idx_consultations_slot"),
+            ("SELECT 1 FROM consultations WHERE id = ?", ("x",), "sqlite_autoindex_consultations"),
+            ("SELECT 1 FROM consultations WHERE status = ?", ("pending",), "idx_consultations_status"),
+            ("SELECT 1 FROM team_members WHERE email = ?", ("x",), "idx_team_members_email"),
+        ]
+        for sql, parameters, index in queries:
+            plan = " ".join(row[-1] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", parameters))
+            assert index in plan, (sql, plan)
+    print("✅ Indexes used")
+
+def _write_requests(path: str, worker: int, count: int):
+    consultations = ConsultationRepository(Database(path))
+    for i in range(count):
+        consultations.add({**REQUEST, "id": f"{worker}-{i}", "status": "pending"})
+
+def test_concurrent_processes():
+    """Several processes appending at once lose no writes"""
+    print("🗄️ Testing writes from several processes")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "chatbot.db")
+        Database(path)
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=_write_requests, args=(path, worker, 50)) for worker in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+            assert process.exitcode == 0
+
+        consultations = ConsultationRepository(Database(path))
+        assert consultations.count() == 200
+        assert consultations.generation() == 200
+        assert Database(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    print("✅ No writes lost")
+
+if __name__ == "__main__":
+    test_json_migration_runs_once()
+    test_queries_use_indexes()
+    test_concurrent_processes()
+    print("\n🗄️ Storage tests completed!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the constant-memory processing statistics: running
+mean and variance, histogram percentiles and sliding time windows
+"""
+
+import random
+import statistics
+import sys
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from data_processor import LocalDataProcessor
+from models import ChatRequest, ChatResponse
+from streaming_stats import LogHistogram, RunningStats, StreamingMetric
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+def test_running_stats():
+    """Welford mean and variance match the exact values, also when merged"""
+    print("📈 Testing running mean and variance")
+    rng = random.Random(7)
+    values = [rng.lognormvariate(0, 0.8) for _ in range(5000)]
+    stats, left, right = RunningStats(), RunningStats(), RunningStats()
+    for i, value in enumerate(values):
+        stats.add(value)
+        (left if i % 3 else right).add(value)
+    left.merge(right)
+    for aggregate in (stats, left):
+        assert aggregate.count == len(values)
+        assert abs(aggregate.mean - statistics.fmean(values)) < 1e-9
+        assert abs(aggregate.variance - statistics.variance(values)) < 1e-9
+        assert (aggregate.min, aggregate.max) == (min(values), max(values))
+    print("✅ Mean and variance exact")
+
+def test_histogram_percentiles():
+    """Percentiles stay within the configured relative error in bounded memory"""
+    print("📈 Testing histogram percentiles")
+    rng = random.Random(11)
+    values = sorted(rng.lognormvariate(-1, 1.0) for _ in range(100_000))
+    histogram = LogHistogram(precision=0.01)
+    for value in values:
+        histogram.add(value)
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(histogram.percentile(q) - exact) / exact <= 0.011, q
+    assert len(histogram.buckets) < 1000  # Bounded by the value range, not the count
+    assert LogHistogram().percentile(0.5) is None
+    print("✅ Percentiles within 1%")
+
+def test_sliding_windows():
+    """Windows only cover their recent slots and reuse slots as time moves on"""
+    print("📈 Testing sliding windows")
+    clock = _Clock()
+    metric = StreamingMetric(clock=clock)
+    for _ in range(10):
+        metric.add(2.0)
+    clock.now += 600  # Past the 5 minute window
+    metric.add(4.0)
+
+    snapshot = metric.snapshot()
+    assert snapshot["count"] == 11 and snapshot["max"] == 4.0
+    assert snapshot["windows"]["5m"]["count"] == 1 and snapshot["windows"]["5m"]["mean"] == 4.0
+    assert snapshot["windows"]["1h"]["count"] == 11
+
+    clock.now += 2 * 86400
+    snapshot = metric.snapshot()
+    assert snapshot["count"] == 11
+    assert all(window["count"] == 0 and window["p95"] is None for window in snapshot["windows"].values())
+    assert all(len(window.slots) == 60 for window in metric.windows.values())
+    print("✅ Windows slide")
+
+def test_processor_statistics():
+    """get_processing_statistics reports averages and latency percentiles"""
+    print("📈 Testing processor statistics")
+    processor = LocalDataProcessor()
+    for i in range(20):
+        request = ChatRequest(message="How much does an AI agent cost?", session_id="s1")
+        response = ChatResponse(response="It depends.", sources=[], session_id="s1",
+                                confidence=0.5 + i / 100, processing_time=0.1 * (i + 1))
+        processor.process_chat_interaction(request, response)
+
+    stats = processor.get_processing_statistics()
+    assert stats["total_requests"] == 20
+    assert abs(stats["average_processing_time"] - 1.05) < 1e-9
+    assert abs(stats["average_engagement_score"] - 0.595) < 1e-9
+    latency = stats["processing_time"]
+    assert latency["count"] == 20 and abs(latency["p50"] - 1.0) < 0.02 and abs(latency["p99"] - 1.9) < 0.03
+    assert latency["windows"]["5m"]["count"] == 20
+    print("✅ Processor statistics streamed")
+
+if __name__ == "__main__":
+    test_running_stats()
+    test_histogram_percentiles()
+    test_sliding_windows()
+    test_processor_statistics()
+    print("\n📈 Streaming statistics tests completed!")
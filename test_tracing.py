@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script to verify request tracing: head sampling, parent/child spans
+across the chat pipeline's threads, and the JSONL and OTLP exporters
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import main
+import tracing
+from models import ChatRequest
+from tracing import JSONLSpanExporter, OTLPSpanExporter, Tracer
+
+class MemoryExporter:
+    """Keeps exported spans in a list"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans, resource):
+        self.spans.extend(spans)
+
+def test_head_sampling():
+    """The root decides; every span of an unsampled trace is a no-op"""
+    print("🔎 Testing head sampling")
+    exporter = MemoryExporter()
+    tracer = Tracer(sample_rate=1.0, exporter=exporter, flush_interval=0.05)
+    try:
+        with tracer.span("root", k=5) as root:
+            with tracer.span("child") as child:
+                child.set_attribute("tokens", 42)
+        with tracer.span("skipped", sampled=False) as skipped:
+            with tracer.span("skipped.child") as skipped_child:
+                assert not skipped.sampled and not skipped_child.sampled
+        assert tracer.flush(5)
+
+        spans = {span.name: span for span in exporter.spans}
+        assert set(spans) == {"root", "child"}
+        assert spans["child"].parent_id == root.span_id and spans["child"].trace_id == root.trace_id
+        assert spans["root"].parent_id is None and spans["root"].attributes == {"k": 5}
+        assert spans["child"].attributes == {"tokens": 42}
+        assert spans["root"].start_ns <= spans["child"].start_ns <= spans["child"].end_ns <= spans["root"].end_ns
+        assert tracer.get_stats()["traces_sampled"] == 1 and tracer.get_stats()["traces_started"] == 2
+
+        unsampled = Tracer(sample_rate=0.0, exporter=exporter)
+        with unsampled.span("root") as span:
+            assert span is tracing.NOOP_SPAN
+    finally:
+        tracer.stop()
+    print("✅ Sampling decided once per trace")
+
+def test_errors_are_recorded():
+    """An exception marks the span as an error and still propagates"""
+    print("🔎 Testing error spans")
+    exporter = MemoryExporter()
+    tracer = Tracer(sample_rate=1.0, exporter=exporter, flush_interval=0.05)
+    try:
+        try:
+            with tracer.span("failing"):
+                raise TimeoutError("upstream timed out")
+        except TimeoutError:
+            pass
+        assert tracer.flush(5)
+        span = exporter.spans[0]
+        assert span.status == "error" and span.attributes["error.type"] == "TimeoutError"
+    finally:
+        tracer.stop()
+    print("✅ Error recorded on the span")
+
+def test_chat_trace():
+    """One /chat produces a single trace from main.chat down to the LLM call and local processing"""
+    print("🔎 Testing the /chat trace")
+
+    class FakeLLM:
+        def invoke(self, messages):
+            reply = type("Reply", (), {})()
+            reply.content = "We build custom AI agents."
+            reply.usage_metadata = {"input_tokens": 120, "output_tokens": 8, "total_tokens": 128}
+            return reply
+
+    exporter = MemoryExporter()
+    original = (main.rag_system.llm, tracing.tracer.exporter, tracing.tracer.sample_rate)
+    original_search = main.knowledge_base.search
+    main.rag_system.llm = FakeLLM()
+    main.knowledge_base.search = lambda query, k=5: [
+        {"content": "We build AI agents.", "score": 0.2, "metadata": {}, "source": "services"}
+    ]
+    tracing.tracer.exporter, tracing.tracer.sample_rate = exporter, 1.0
+    try:
+        response = asyncio.run(main.chat(ChatRequest(message="What services do you offer?", session_id="tracing-test")))
+        assert main.post_response_worker.flush(5)
+        assert tracing.tracer.flush(5)
+
+        spans = [span for span in exporter.spans if span.trace_id == response.trace_id]
+        by_name = {span.name: span for span in spans}
+        assert {"chat", "rag.chat", "rag.retrieve", "rag.history", "rag.generate", "llm",
+                "format_response", "n8n.local_processing"} <= set(by_name)
+
+        def parent(name):
+            return next(span.name for span in spans if span.span_id == by_name[name].parent_id)
+
+        assert by_name["chat"].parent_id is None
+        assert parent("rag.chat") == "chat"
+        assert parent("rag.retrieve") == "rag.chat"  # Ran on the retrieval thread
+        assert parent("llm") == "rag.generate" and parent("rag.generate") == "rag.chat"
+        assert parent("n8n.local_processing") == "chat"  # Ran after the response, on the post-response worker
+        assert by_name["rag.retrieve"].attributes == {"k": 5, "results": 1, "min_distance": 0.2}
+        assert by_name["llm"].attributes["total_tokens"] == 128
+        assert by_name["chat"].attributes["pipeline_path"] == "rag"
+    finally:
+        main.rag_system.llm, tracing.tracer.exporter, tracing.tracer.sample_rate = original
+        main.knowledge_base.search = original_search
+        main.session_store.delete_session("tracing-test")
+    print("✅ Pipeline spans linked into one trace")
+
+def test_exporters():
+    """JSONL writes one line per span; OTLP encodes the OTLP/JSON layout"""
+    print("🔎 Testing exporters")
+    tracer = Tracer(sample_rate=1.0, exporter=MemoryExporter())
+    with tracer.span("root", k=5, cached=True, model="gpt-4o-mini", score=0.5) as root:
+        pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traces", "spans.jsonl")
+        JSONLSpanExporter(path).export([root], tracer.resource)
+        with open(path) as f:
+            line = json.loads(f.read())
+        assert line["trace_id"] == root.trace_id and line["attributes"]["k"] == 5
+        assert line["resource"]["service.name"] == tracer.resource["service.name"]
+
+    encoded = OTLPSpanExporter("http://collector/v1/traces").encode([root], tracer.resource)
+    span = encoded["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16 and span["parentSpanId"] == ""
+    attributes = {attribute["key"]: attribute["value"] for attribute in span["attributes"]}
+    assert attributes["k"] == {"intValue": "5"} and attributes["cached"] == {"boolValue": True}
+    assert attributes["score"] == {"doubleValue": 0.5} and span["status"] == {"code": 1}
+    tracer.stop()
+    print("✅ Exporters write JSONL and OTLP/JSON")
+
+def test_unsampled_overhead():
+    """Spans in unsampled traces cost a couple of microseconds at most"""
+    print("🔎 Testing unsampled overhead")
+    tracer = Tracer(sample_rate=0.0001, exporter=MemoryExporter())
+    iterations = 50000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with tracer.span("root", sampled=False):
+            with tracer.span("child", k=5):
+                pass
+    per_trace = (time.perf_counter() - started) / iterations
+    print(f"   {per_trace * 1e6:.2f} µs per unsampled two-span trace")
+    assert per_trace < 20e-6
+    print("✅ Unsampled traces are cheap")
+
+if __name__ == "__main__":
+    test_head_sampling()
+    test_errors_are_recorded()
+    test_chat_trace()
+    test_exporters()
+    test_unsampled_overhead()
+    print("\n🔎 Tracing tests completed!")
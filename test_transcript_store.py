@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the chat transcript store: cheap appends, day
+partitions of zstd frames, time-ordered streaming reads across segments,
+recovery from a torn frame and feeding the batch analytics job
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from batch_analytics import load_transcripts, score_interactions
+from transcript_store import TranscriptStore
+
+def _store(directory: str, **options) -> TranscriptStore:
+    settings = {"enabled": True, "batch_size": 64, "flush_interval": 0.05,
+                "segment_max_bytes": 1 << 20, "queue_size": 10000, "compression_level": 3}
+    settings.update(options)
+    return TranscriptStore(directory=directory, **settings)
+
+def _exchange(store: TranscriptStore, session_id: str, at: datetime, question: str, answer: str):
+    store.append_message(session_id, {"role": "user", "content": question, "timestamp": at})
+    store.append_message(session_id, {"role": "assistant", "content": answer, "timestamp": at + timedelta(seconds=1)},
+                         confidence=0.9, processing_time=1.2, source_count=2)
+
+def test_round_trip_by_day():
+    """Messages land in day partitions and stream back in time order"""
+    print("🗄️ Testing day partitions")
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        day_one, day_two = datetime(2025, 10, 20, 23, 59, 59, 500000), datetime(2025, 10, 21, 9, 0, 0)
+        _exchange(store, "a", day_one, "What is agentic AI?", "Autonomous agents.")
+        _exchange(store, "b", day_two, "How much does it cost?", "It depends on scope.")
+        store.stop()
+
+        assert store.days() == ["2025-10-20", "2025-10-21"]
+        assert all(path.endswith(".jsonl.zst") for day in store.days() for path in store.segment_paths(day))
+        records = list(store.iter_messages())
+        assert [record["role"] for record in records] == ["user", "assistant"] * 2
+        # The reply to day one's late question falls on day two
+        assert records[1]["ts"].startswith("2025-10-21") and records[1]["confidence"] == 0.9
+        assert [record["content"] for record in store.iter_messages(session_id="b")] == [
+            "How much does it cost?", "It depends on scope."
+        ]
+        assert len(list(store.iter_messages(start="2025-10-21", end="2025-10-21"))) == 3
+    print("✅ Round trip by day")
+
+def test_merge_across_segments():
+    """Segments from several writer processes are merged by timestamp"""
+    print("🗄️ Testing segment merge")
+    with tempfile.TemporaryDirectory() as directory:
+        base = datetime(2025, 10, 21, 9, 0, 0)
+        first, second = _store(directory), _store(directory)
+        for i in range(0, 20, 2):
+            first.append({"ts": (base + timedelta(seconds=i)).isoformat(timespec="microseconds"), "session_id": "a", "role": "user", "content": str(i)})
+            second.append({"ts": (base + timedelta(seconds=i + 1)).isoformat(timespec="microseconds"), "session_id": "b", "role": "user", "content": str(i + 1)})
+        first.stop()
+        second.stop()
+        assert len(first.segment_paths("2025-10-21")) == 2
+        assert [record["content"] for record in first.iter_messages()] == [str(i) for i in range(20)]
+    print("✅ Segments merged")
+
+def test_cheap_appends_and_compression():
+    """Appends cost microseconds; batched frames compress chat text well"""
+    print("🗄️ Testing write cost")
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory, batch_size=256)
+        answer = "Soft Techniques builds custom AI agents that automate workflows, integrate with your CRM and scale with demand. "
+        started = time.perf_counter()
+        for i in range(5000):
+            store.append_message(f"session-{i % 50}", {"role": "assistant", "content": answer * 3, "timestamp": datetime.now()})
+        per_append = (time.perf_counter() - started) / 5000
+        assert store.flush(10)
+        stats = store.get_stats()
+        store.stop()
+        print(f"   {per_append * 1e6:.1f} µs per append, compression {stats['compression_ratio']:.1f}x")
+        assert per_append < 200e-6
+        assert stats["messages_written"] == 5000 and stats["compression_ratio"] > 5
+    print("✅ Cheap, compact writes")
+
+def test_torn_frame():
+    """A frame cut short by a crash only loses that frame"""
+    print("🗄️ Testing torn frame")
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        at = datetime(2025, 10, 21, 9, 0, 0)
+        _exchange(store, "a", at, "First question", "First answer")
+        assert store.flush(5)
+        _exchange(store, "a", at + timedelta(minutes=1), "Second question", "Second answer")
+        store.stop()
+        segment, = store.segment_paths("2025-10-21")
+        with open(segment, "r+b") as f:
+            f.truncate(os.path.getsize(segment) - 5)
+        assert [record["content"] for record in store.iter_messages()] == ["First question", "First answer"]
+    print("✅ Earlier frames survive")
+
+def test_feeds_batch_analytics():
+    """Question/answer pairs stream into the batch analytics job"""
+    print("🗄️ Testing analytics input")
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        at = datetime(2025, 10, 21, 9, 0, 0)
+        _exchange(store, "a", at, "What is agentic AI?", "Autonomous agents.")
+        _exchange(store, "b", at + timedelta(seconds=5), "Send me a price quote", "Sure.")
+        store.stop()
+        pairs = list(store.iter_interactions())
+        assert [(pair["session_id"], pair["query"], pair["source_count"]) for pair in pairs] == [
+            ("a", "What is agentic AI?", 2), ("b", "Send me a price quote", 2)
+        ]
+        scored = score_interactions(load_transcripts(directory))
+        assert scored["query_type"].tolist() == ["definition", "pricing"]
+    print("✅ Transcripts scored")
+
+if __name__ == "__main__":
+    test_round_trip_by_day()
+    test_merge_across_segments()
+    test_cheap_appends_and_compression()
+    test_torn_frame()
+    test_feeds_batch_analytics()
+    print("\n🗄️ Transcript store tests completed!")
@@ -0,0 +1,356 @@
+"""
+Request Tracing
+Lightweight spans that show where one slow chat spent its time, from
+main.chat through retrieval, the LLM call and formatting to the n8n
+delivery. Each span has parent/child timing and attributes such as k,
+token counts and cache use.
+
+Sampling is decided once, at the root span: only a TRACE_SAMPLE_RATE share
+of requests are traced. Spans in an unsampled trace are a shared no-op
+object, so untraced requests pay a context variable lookup per span. Ended
+spans are queued and exported by a background thread to a local JSONL file
+or an OTLP/HTTP (JSON) collector. The request path never touches the disk
+or the network.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from config import Config
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "_start")
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._start = time.perf_counter_ns()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def record_exception(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)[:500]
+
+    def end(self):
+        # Duration from the monotonic clock; the wall clock only anchors the start
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or self.start_ns) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+class _NoopSpan:
+    """Stands in for every span of an unsampled trace"""
+
+    __slots__ = ()
+    sampled = False
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+# The span the calling code runs under (None outside any trace)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+def current_span():
+    """The active span (NOOP_SPAN inside an unsampled trace, None outside any trace)"""
+    return _current_span.get()
+
+class _SpanScope:
+    """Context manager that makes a span current for the duration of a block"""
+
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if self.span.sampled:
+            if exc is not None:
+                self.span.record_exception(exc)
+            self.span.end()
+            self.tracer._on_end(self.span)
+        return False
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_SCOPE = _NoopScope()
+
+# Exporters
+
+class JSONLSpanExporter:
+    """Appends one JSON line per span to a local file, rotating it to <path>.1 when it gets large"""
+
+    def __init__(self, path: str = Config.TRACE_FILE, max_bytes: int = Config.TRACE_FILE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def export(self, spans: List[Span], resource: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, f"{self.path}.1")
+        lines = "".join(
+            json.dumps({**span.to_dict(), "resource": resource}, ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+class OTLPSpanExporter:
+    """Posts spans to an OpenTelemetry collector over OTLP/HTTP with the JSON encoding"""
+
+    STATUS_CODES = {"ok": 1, "error": 2}
+
+    def __init__(self, endpoint: str = Config.TRACE_OTLP_ENDPOINT, headers: Optional[Dict[str, str]] = None):
+        self.endpoint = endpoint
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        if isinstance(value, (list, tuple)):
+            return {"arrayValue": {"values": [OTLPSpanExporter._value(item) for item in value]}}
+        return {"stringValue": str(value)}
+
+    @classmethod
+    def _attributes(cls, attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"key": key, "value": cls._value(value)} for key, value in attributes.items() if value is not None]
+
+    def encode(self, spans: List[Span], resource: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": self._attributes(resource)},
+                "scopeSpans": [{
+                    "scope": {"name": "chatbot.tracing"},
+                    "spans": [
+                        {
+                            "traceId": span.trace_id,
+                            "spanId": span.span_id,
+                            "parentSpanId": span.parent_id or "",
+                            "name": span.name,
+                            "kind": 1,  # SPAN_KIND_INTERNAL
+                            "startTimeUnixNano": str(span.start_ns),
+                            "endTimeUnixNano": str(span.end_ns),
+                            "attributes": self._attributes(span.attributes),
+                            "status": {"code": self.STATUS_CODES[span.status]}
+                        }
+                        for span in spans
+                    ]
+                }]
+            }]
+        }
+
+    def export(self, spans: List[Span], resource: Dict[str, Any]):
+        from http_clients import http_clients  # Only needed when spans go to a collector
+        response = http_clients.sync.post(self.endpoint, json=self.encode(spans, resource), headers=self.headers)
+        response.raise_for_status()
+
+def build_exporter(name: str = Config.TRACE_EXPORTER):
+    """Exporter for the TRACE_EXPORTER setting: jsonl, otlp or none"""
+    if name == "jsonl":
+        return JSONLSpanExporter()
+    if name == "otlp":
+        return OTLPSpanExporter()
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown trace exporter: {name}")
+
+class Tracer:
+    """Head-sampled tracer with a batching background exporter"""
+
+    def __init__(
+        self,
+        sample_rate: float = Config.TRACE_SAMPLE_RATE,
+        exporter: Any = None,
+        service_name: str = Config.TRACE_SERVICE_NAME,
+        queue_size: int = Config.TRACE_QUEUE_SIZE,
+        batch_size: int = Config.TRACE_BATCH_SIZE,
+        flush_interval: float = Config.TRACE_FLUSH_INTERVAL_SECONDS
+    ):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.resource = {"service.name": service_name, "process.pid": os.getpid()}
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Deque[Span] = deque()
+        self._condition = threading.Condition()
+        self._exporter_thread: Optional[threading.Thread] = None
+        self._stop = False
+        self._in_flight = 0
+        self.stats = {
+            "traces_started": 0, "traces_sampled": 0, "spans_exported": 0,
+            "spans_dropped": 0, "export_errors": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def span(self, name: str, parent: Any = None, sampled: Optional[bool] = None, **attributes: Any):
+        """
+        Context manager for a span under `parent` (default: the current span).
+        A span with no parent starts a trace and makes the sampling decision,
+        unless `sampled` forces it. Use parent= to continue a trace in work
+        handed to another thread or event loop.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if parent is None:
+            # Root span: head sampling
+            if not self.enabled:
+                return _NOOP_SCOPE
+            self.stats["traces_started"] += 1
+            if sampled is None:
+                sampled = random.random() < self.sample_rate
+            if not sampled:
+                return _SpanScope(self, NOOP_SPAN)
+            self.stats["traces_sampled"] += 1
+            return _SpanScope(self, Span(name, os.urandom(16).hex(), None, attributes))
+        if not parent.sampled:
+            return _NOOP_SCOPE
+        return _SpanScope(self, Span(name, parent.trace_id, parent.span_id, attributes))
+
+    # Export
+
+    def _on_end(self, span: Span):
+        with self._condition:
+            if len(self._pending) >= self.queue_size:
+                self.stats["spans_dropped"] += 1
+                return
+            self._pending.append(span)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        if self._exporter_thread is None or not self._exporter_thread.is_alive():
+            self.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._pending and not self._stop:
+                    self._condition.wait(self.flush_interval)
+                if not self._pending:
+                    if self._stop:
+                        return
+                    continue
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                self._in_flight = len(batch)
+            try:
+                self.exporter.export(batch, self.resource)
+                self.stats["spans_exported"] += len(batch)
+            except Exception as e:
+                self.stats["export_errors"] += 1
+                logging.warning(f"Span export failed ({len(batch)} spans lost): {e}")
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def start(self):
+        """Start the background exporter (idempotent; ending a sampled span also starts it)"""
+        if self.exporter is None:
+            return
+        with self._condition:
+            if self._exporter_thread and self._exporter_thread.is_alive():
+                return
+            self._stop = False
+            self._exporter_thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._exporter_thread.start()
+
+    def flush(self, timeout: float = 10) -> bool:
+        """Export everything ended so far; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.notify_all()
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def stop(self, timeout: float = 10):
+        """Export what is queued, then stop the exporter"""
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        if self._exporter_thread:
+            self._exporter_thread.join(timeout)
+        self._exporter_thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "pending": pending,
+            **self.stats
+        }
+
+# Shared tracer
+tracer = Tracer(exporter=build_exporter())
@@ -0,0 +1,285 @@
+"""
+Chat Transcript Store
+Durable, append-only record of every chat message, kept outside the
+session store so transcripts survive restarts and session eviction.
+
+Messages are handed to a background writer. The write path only appends
+to an in-memory queue. The writer batches messages and appends each batch
+to the current segment as one zstd frame. Segments are partitioned by day
+(<dir>/<YYYY-MM-DD>/segment-<time>-<pid>.jsonl.zst), and every process
+writes its own segment, so no file locking is needed. A segment is closed
+when the day changes or it reaches a size limit.
+
+Readers stream the segments frame by frame in time order, for analytics
+and replay. A frame torn by a crash ends the read of that segment.
+"""
+
+import glob
+import heapq
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import zstandard
+
+from config import Config
+from metrics import timed
+
+class TranscriptStore:
+    """Day-partitioned, zstd-compressed JSONL transcripts written by a background thread"""
+
+    def __init__(
+        self,
+        directory: str = Config.TRANSCRIPT_DIR,
+        enabled: bool = Config.TRANSCRIPT_ENABLED,
+        batch_size: int = Config.TRANSCRIPT_BATCH_SIZE,
+        flush_interval: float = Config.TRANSCRIPT_FLUSH_INTERVAL_SECONDS,
+        segment_max_bytes: int = Config.TRANSCRIPT_SEGMENT_MAX_BYTES,
+        queue_size: int = Config.TRANSCRIPT_QUEUE_SIZE,
+        compression_level: int = Config.TRANSCRIPT_COMPRESSION_LEVEL
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_bytes = segment_max_bytes
+        self.queue_size = queue_size
+        self._compressor = zstandard.ZstdCompressor(level=compression_level)
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._writer: Optional[threading.Thread] = None
+        self._stop = False
+        self._in_flight = 0
+        self._segment: Optional[str] = None
+        self._segment_day: Optional[str] = None
+        self.stats = {
+            "messages_written": 0, "messages_dropped": 0, "frames_written": 0,
+            "raw_bytes": 0, "compressed_bytes": 0, "write_errors": 0
+        }
+
+    # Write path
+
+    def append(self, record: Dict[str, Any]):
+        """Queue one record for writing; never blocks on disk"""
+        if not self.enabled:
+            return
+        record.setdefault("ts", datetime.now().isoformat(timespec="microseconds"))
+        with self._condition:
+            if len(self._pending) >= self.queue_size:
+                # The writer is far behind (disk trouble); keep the newest messages
+                self._pending.popleft()
+                self.stats["messages_dropped"] += 1
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        if self._writer is None or not self._writer.is_alive():
+            self.start()
+
+    def append_message(self, session_id: str, message: Dict[str, Any], **extra):
+        """Record a chat message (role, content, timestamp) with optional metadata"""
+        timestamp = message.get("timestamp")
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat(timespec="microseconds")
+        record = {
+            "ts": timestamp or datetime.now().isoformat(timespec="microseconds"),
+            "session_id": session_id,
+            "role": message.get("role"),
+            "content": message.get("content", "")
+        }
+        record.update({key: value for key, value in extra.items() if value is not None})
+        self.append(record)
+
+    def _segment_for(self, day: str) -> str:
+        if self._segment_day != day or self._segment is None or (
+            os.path.exists(self._segment) and os.path.getsize(self._segment) >= self.segment_max_bytes
+        ):
+            day_directory = os.path.join(self.directory, day)
+            os.makedirs(day_directory, exist_ok=True)
+            name = f"segment-{datetime.now().strftime('%H%M%S%f')}-{os.getpid()}.jsonl.zst"
+            self._segment, self._segment_day = os.path.join(day_directory, name), day
+        return self._segment
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Append the batch as one frame per day it spans"""
+        by_day: Dict[str, List[bytes]] = {}
+        for record in batch:
+            line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            by_day.setdefault(record["ts"][:10], []).append(line)
+        for day, lines in by_day.items():
+            raw = b"".join(lines)
+            frame = self._compressor.compress(raw)
+            with open(self._segment_for(day), "ab") as f:
+                f.write(frame)
+            self.stats["messages_written"] += len(lines)
+            self.stats["frames_written"] += 1
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["compressed_bytes"] += len(frame)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._pending and not self._stop:
+                    self._condition.wait(self.flush_interval)
+                if not self._pending:
+                    if self._stop:
+                        return
+                    continue
+                # Wait briefly for a fuller batch unless one is ready or we are stopping
+                if len(self._pending) < self.batch_size and not self._stop:
+                    self._condition.wait(self.flush_interval)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                self._in_flight = len(batch)
+            try:
+                with timed("json_write"):
+                    self._write_batch(batch)
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                logging.error(f"Transcript write failed ({len(batch)} messages lost): {e}")
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+    def start(self):
+        """Start the background writer (idempotent; append also starts it)"""
+        with self._condition:
+            if self._writer and self._writer.is_alive():
+                return
+            self._stop = False
+            self._writer = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+            self._writer.start()
+
+    def flush(self, timeout: float = 10) -> bool:
+        """Write everything queued so far; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.notify_all()
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def stop(self, timeout: float = 10):
+        """Write what is queued, then stop the writer"""
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        if self._writer:
+            self._writer.join(timeout)
+        self._writer = None
+        self._segment = None
+
+    # Read path
+
+    def days(self) -> List[str]:
+        """Days that have transcripts, oldest first"""
+        return sorted(
+            os.path.basename(path) for path in glob.glob(os.path.join(glob.escape(self.directory), "????-??-??"))
+        )
+
+    def segment_paths(self, day: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(glob.escape(self.directory), day, "segment-*.jsonl.zst")))
+
+    def _read_segment(self, path: str) -> Iterator[Dict[str, Any]]:
+        decompressor = zstandard.ZstdDecompressor()
+        try:
+            with open(path, "rb") as f:
+                reader = decompressor.stream_reader(f, read_across_frames=True)
+                for line in io.TextIOWrapper(reader, encoding="utf-8"):
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+        except zstandard.ZstdError as e:
+            logging.warning(f"Stopped reading {path} at a damaged frame: {e}")
+        except FileNotFoundError:
+            return
+
+    def iter_messages(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream records between two ISO timestamps (inclusive), oldest first.
+        Only the day partitions in range are opened, one segment frame at a time.
+        """
+        if end and len(end) == 10:
+            end += "T23:59:59.999999"  # A bare end date includes that whole day
+        start_day, end_day = (start or "")[:10], (end or "")[:10]
+        for day in self.days():
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            # Each segment is in time order; merge the per-process segments of the day
+            segments = [self._read_segment(path) for path in self.segment_paths(day)]
+            for record in heapq.merge(*segments, key=lambda record: record["ts"]):
+                if start and record["ts"] < start:
+                    continue
+                if end and record["ts"] > end:
+                    continue
+                if session_id is None or record.get("session_id") == session_id:
+                    yield record
+
+    def iter_interactions(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Pair each user message with the assistant reply that follows it in the
+        same session, as flat interaction rows (the batch analytics input format)
+        """
+        open_queries: Dict[str, Dict[str, Any]] = {}
+        for record in self.iter_messages(start, end):
+            if record.get("role") == "user":
+                open_queries[record["session_id"]] = record
+            elif record.get("role") == "assistant" and record["session_id"] in open_queries:
+                query = open_queries.pop(record["session_id"])
+                yield {
+                    "session_id": record["session_id"],
+                    "timestamp": query["ts"],
+                    "query": query.get("content", ""),
+                    "response": record.get("content", ""),
+                    "confidence": record.get("confidence"),
+                    "processing_time": record.get("processing_time"),
+                    "source_count": record.get("source_count", 0)
+                }
+
+    def prune(self, keep_days: int) -> int:
+        """Delete day partitions older than keep_days; returns partitions removed"""
+        cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+        removed = 0
+        for day in self.days():
+            if day < cutoff:
+                for path in glob.glob(os.path.join(glob.escape(self.directory), day, "*")):
+                    os.remove(path)
+                os.rmdir(os.path.join(self.directory, day))
+                removed += 1
+        return removed
+
+    def pending_count(self) -> int:
+        """Messages queued but not yet written"""
+        with self._condition:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        days = self.days()
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "pending": self.pending_count(),
+            "days": len(days),
+            "segments": sum(len(self.segment_paths(day)) for day in days),
+            "disk_bytes": sum(os.path.getsize(path) for day in days for path in self.segment_paths(day)),
+            "compression_ratio": (
+                self.stats["raw_bytes"] / self.stats["compressed_bytes"] if self.stats["compressed_bytes"] else None
+            ),
+            **self.stats
+        }
+
+# Shared transcript store
+transcript_store = TranscriptStore()